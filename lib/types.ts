@@ -303,6 +303,7 @@ export interface Database {
                     gbif_id: number | null
                     created_at: string | null
                     updated_at: string | null
+                    search_text: string | null
                 }
                 Insert: {
                     id?: string
@@ -491,7 +492,10 @@ export interface Database {
             [_ in never]: never
         }
         Functions: {
-            [_ in never]: never
+            search_species: {
+                Args: { query: string; max_results?: number }
+                Returns: Database['public']['Tables']['species_registry']['Row'][]
+            }
         }
         Enums: {
             [_ in never]: never
@@ -1,24 +1,27 @@
 import csv
-
-# --- Fichiers de référence (ceux déjà dans votre DB) ---
-FRESHWATER_FILE = "scripts/eau-douce-france-metropole/poissons_france_enrichi.csv"
-MED_FILE = "scripts/mediterranee/poissons_mediterranee_deduplicate_enrichi.csv"
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.csv_stream import AtomicCsvWriter, AtomicWriter
+from common.known_species import KnownSpeciesRegistry
+from common.metrics import instrument
+from common.regions import ATLANTIQUE, FRESHWATER, MEDITERRANEE
+from common.sql import pg_array_literal
+from common.sql import BulkRegistryUpdate
+
+# --- Fichiers de référence (ceux déjà dans votre DB), lus seulement si le registre
+# des espèces connues ne contient pas encore leur région ---
+FRESHWATER_FILE = "../eau-douce-france-metropole/poissons_france_enrichi.csv"
+MED_FILE = "../mediterranee/poissons_mediterranee_deduplicate_enrichi.csv"
+REFERENCE_FILES = [(FRESHWATER, FRESHWATER_FILE), (MEDITERRANEE, MED_FILE)]
 
 # --- Fichier d'entrée pour l'Atlantique ---
-ATLANTIC_INPUT_FILE = "scripts/atlantique/poissons_atlantique.csv"
+ATLANTIC_INPUT_FILE = "poissons_atlantique.csv"
 
 # --- Fichiers de sortie ---
-ATLANTIC_OUTPUT_CSV = "scripts/atlantique/poissons_atlantique_deduplique_enrichi.csv"
-SQL_UPDATE_OUTPUT = "scripts/atlantique/update_atlantic_duplicates.sql"
-
-# --- Données à ajouter ---
-# Liste non exhaustive mais représentative des pays bordant l'Atlantique
-ATLANTIC_COUNTRIES = [
-    "US", "CA", "MX", "BR", "AR", "PT", "ES", "FR", "IE", "GB", "IS", "NO",
-    "MA", "SN", "NG", "ZA", "GH", "CI", "LR", "SL", "GN", "GW", "GM", "EH",
-    "MR", "CV", "GL", "SR", "GY", "VE", "CO", "PA", "CR", "NI", "HN", "GT",
-    "BZ", "BS", "HT", "DO", "JM", "CU"
-]
+ATLANTIC_OUTPUT_CSV = "poissons_atlantique_deduplique_enrichi.csv"
+SQL_UPDATE_OUTPUT = "update_atlantic_duplicates.sql"
 
 def list_to_postgres_array_string(py_list):
     """Formate une liste Python en une chaîne de tableau {a,b,c}."""
@@ -30,86 +33,77 @@ def list_to_postgres_array_string(py_list):
 def main():
     """
     Sépare les poissons de l'Atlantique, génère un CSV pour les nouveaux et un SQL pour les doublons.
+    Le fichier est parcouru une seule fois, ligne par ligne.
     """
-    # 1. Lire tous les noms scientifiques des poissons déjà existants
-    existing_scientific_names = set()
-    try:
-        print(f"Lecture du fichier de référence : {FRESHWATER_FILE}")
-        with open(FRESHWATER_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            for row in reader:
-                existing_scientific_names.add(row['scientific_name'])
-
-        print(f"Lecture du fichier de référence : {MED_FILE}")
-        with open(MED_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            for row in reader:
-                existing_scientific_names.add(row['scientific_name'])
-
-        print(f"-> {len(existing_scientific_names)} poissons uniques trouvés dans les fichiers existants.")
-    except FileNotFoundError as e:
-        print(f"Erreur : Un fichier de référence est manquant. {e}")
-        return
-
-    # 2. Lire le fichier Atlantique et séparer les nouveaux des doublons
+    # 1. Ouvrir le fichier Atlantique
     print(f"Analyse du fichier des poissons de l'Atlantique : {ATLANTIC_INPUT_FILE}")
     try:
-        with open(ATLANTIC_INPUT_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            atlantic_data = list(reader)
-            fieldnames = reader.fieldnames
+        infile = open(ATLANTIC_INPUT_FILE, 'r', encoding='utf-8')
     except FileNotFoundError:
         print(f"Erreur : Le fichier '{ATLANTIC_INPUT_FILE}' n'a pas été trouvé.")
-        return
-
-    new_fish_rows = []
-    duplicate_fish_names = []
-
-    for row in atlantic_data:
-        if row['scientific_name'] in existing_scientific_names:
-            duplicate_fish_names.append(row['scientific_name'])
-        else:
-            # C'est un nouveau poisson, on l'enrichit et on l'ajoute à la liste
-            row['water_types'] = '{"salt"}'
-            row['countries'] = list_to_postgres_array_string(ATLANTIC_COUNTRIES)
-            new_fish_rows.append(row)
-            # On l'ajoute aussi aux noms existants pour gérer les doublons internes au fichier Atlantique
-            existing_scientific_names.add(row['scientific_name'])
-
-    print(f"Analyse terminée : {len(new_fish_rows)} nouveaux poissons et {len(duplicate_fish_names)} doublons trouvés.")
-
-    # 3. Écrire le nouveau fichier CSV dédupliqué et enrichi
-    if new_fish_rows:
-        print(f"Génération du fichier CSV dédupliqué : {ATLANTIC_OUTPUT_CSV}")
+        sys.exit(1)
+
+    countries_value = list_to_postgres_array_string(ATLANTIQUE.countries)
+
+    # 2. Comparer chaque poisson au registre des espèces connues et écrire au fil de l'eau
+    with infile, KnownSpeciesRegistry() as registry:
+        for region, reference_file in REFERENCE_FILES:
+            try:
+                seeded = registry.ensure_region(region.name, reference_file)
+            except FileNotFoundError as e:
+                print(f"Erreur : Un fichier de référence est manquant. {e}")
+                sys.exit(1)
+            if seeded:
+                print(f"-> Registre amorcé avec {seeded} poissons de {reference_file}.")
+
+        # Relance : les poissons enregistrés par le passage précédent sont réévalués
+        registry.forget_region(ATLANTIQUE.name)
+        print(f"-> {registry.count()} poissons déjà connus dans le registre.")
+
+        reader = csv.DictReader(infile)
         try:
-            with open(ATLANTIC_OUTPUT_CSV, 'w', newline='', encoding='utf-8') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(new_fish_rows)
-            print(f"-> Succès ! {len(new_fish_rows)} lignes écrites.")
+            with AtomicCsvWriter(ATLANTIC_OUTPUT_CSV, reader.fieldnames) as csv_out, \
+                    AtomicWriter(SQL_UPDATE_OUTPUT) as sql_out:
+                duplicates = BulkRegistryUpdate(
+                    sql_out, ATLANTIQUE.water_types[0], ATLANTIQUE.countries,
+                    "Script pour mettre à jour les poissons existants avec les données de l'Atlantique",
+                )
+
+                for row in reader:
+                    # Un nouveau poisson est enregistré tout de suite : les doublons internes
+                    # au fichier Atlantique sont aussi détectés
+                    known = registry.check_and_add(row['scientific_name'], ATLANTIQUE.name, row.get('gbif_id'))
+                    if known:
+                        # On met à jour la ligne existante, sous le nom avec lequel elle a été enregistrée
+                        duplicates.add(known.scientific_name)
+                    else:
+                        # C'est un nouveau poisson, on l'enrichit et on l'écrit
+                        row['water_types'] = pg_array_literal(ATLANTIQUE.water_types)
+                        row['countries'] = countries_value
+                        csv_out.writerow(row)
+
+                duplicates.finish()
+
+                # Un fichier vide n'est pas écrit (le précédent est conservé)
+                if not csv_out.count:
+                    csv_out.discard()
+                if not duplicates.count:
+                    sql_out.discard()
         except IOError as e:
-            print(f"Erreur lors de l'écriture du fichier CSV : {e}")
+            print(f"Erreur lors de l'écriture des fichiers : {e}")
+            sys.exit(1)
+        registry.commit()
 
-    # 4. Générer le fichier SQL de mise à jour pour les doublons
-    if duplicate_fish_names:
-        print(f"Génération du script SQL de mise à jour : {SQL_UPDATE_OUTPUT}")
-        countries_sql_array = "ARRAY[" + ",".join([f"'{c}'" for c in ATLANTIC_COUNTRIES]) + "]"
+    print(f"Analyse terminée : {csv_out.count} nouveaux poissons et {duplicates.count} doublons trouvés.")
 
-        try:
-            with open(SQL_UPDATE_OUTPUT, 'w', encoding='utf-8') as outfile:
-                outfile.write("-- Script pour mettre à jour les poissons existants avec les données de l'Atlantique\n\n")
-                for name in duplicate_fish_names:
-                    safe_name = name.replace("'", "''")
-
-                    update_water_types = f"UPDATE public.species_registry SET water_types = ARRAY(SELECT DISTINCT unnest(water_types || '{{salt}}')) WHERE scientific_name = '{safe_name}';"
-                    update_countries = f"UPDATE public.species_registry SET countries = ARRAY(SELECT DISTINCT unnest(countries || {countries_sql_array})) WHERE scientific_name = '{safe_name}';"
-
-                    outfile.write(f"-- Mise à jour pour : {name}\n")
-                    outfile.write(update_water_types + "\n")
-                    outfile.write(update_countries + "\n\n")
-            print(f"-> Succès ! {len(duplicate_fish_names)} poissons à mettre à jour dans le fichier SQL.")
-        except IOError as e:
-            print(f"Erreur lors de l'écriture du fichier SQL : {e}")
+    # 3. Nouveau fichier CSV dédupliqué et enrichi
+    if csv_out.count:
+        print(f"-> Succès ! {csv_out.count} lignes écrites dans {ATLANTIC_OUTPUT_CSV}.")
+
+    # 4. Fichier SQL de mise à jour pour les doublons
+    if duplicates.count:
+        print(f"-> Succès ! {duplicates.count} poissons à mettre à jour dans le fichier SQL {SQL_UPDATE_OUTPUT}.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with instrument("atlantique:dedupe"):
+        main()
\ No newline at end of file
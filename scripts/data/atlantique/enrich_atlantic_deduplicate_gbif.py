@@ -1,13 +1,24 @@
-import requests
 import csv
+import os
+import sys
 from tqdm import tqdm
-import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.csv_stream import AtomicCsvWriter, chunked
+from common.gbif import GbifSession
+from common.journal import ResultJournal, journal_file_for
+from common.metrics import instrument
+from common.sql import json_field
 
 # Fichier à enrichir (entrée et sortie)
-CSV_FILE = "scripts/atlantique/poissons_atlantique_deduplique_enrichi.csv"
+CSV_FILE = "poissons_atlantique_deduplique_enrichi.csv"
+
+# Espèces interrogées en parallèle et débit maximal (requêtes / seconde)
+GBIF_CONCURRENCY = 8
+GBIF_RATE_LIMIT = 10
 
-# URL de l'API GBIF
-GBIF_API_URL = "https://api.gbif.org/v1"
+# Lignes lues, enrichies puis écrites par lot (la mémoire ne dépend pas de la taille du fichier)
+CHUNK_SIZE = 500
 
 def list_to_postgres_array_string(py_list):
     """Formate une liste Python en une chaîne de tableau {a,b,c}."""
@@ -16,80 +27,67 @@ def list_to_postgres_array_string(py_list):
     clean_items = [str(item).replace(',', ' ').replace('{', '').replace('}', '') for item in py_list]
     return "{" + ",".join(clean_items) + "}"
 
-def get_gbif_data(scientific_name):
-    """Interroge GBIF pour les données de base."""
-    data = {'gbif_id': None, 'name_en': None, 'countries': []}
-    try:
-        match_params = {'name': scientific_name, 'rank': 'SPECIES'}
-        response = requests.get(f"{GBIF_API_URL}/species/match", params=match_params, timeout=10)
-        response.raise_for_status()
-        match_data = response.json()
-
-        if 'usageKey' not in match_data or not match_data.get('usageKey'):
-            return data
-
-        species_key = match_data.get('usageKey')
-        data['gbif_id'] = species_key
-
-        # Noms vernaculaires
-        response_names = requests.get(f"{GBIF_API_URL}/species/{species_key}/vernacularNames", timeout=10)
-        if response_names.ok:
-            for name_info in response_names.json().get('results', []):
-                if name_info.get('language') == 'eng' and 'vernacularName' in name_info:
-                    data['name_en'] = name_info['vernacularName']
-                    break
-
-        # Pays
-        response_dist = requests.get(f"{GBIF_API_URL}/species/{species_key}/distributions", timeout=10)
-        if response_dist.ok:
-            data['countries'] = sorted([dist.get('countryCode') for dist in response_dist.json().get('results', []) if 'countryCode' in dist])
-
-    except Exception:
-        pass
-    return data
+def get_gbif_data(gbif, scientific_names):
+    """Interroge GBIF pour les données de base de chaque nom scientifique."""
+    return {
+        name: {'gbif_id': info['gbif_id'], 'name_en': info['name_en'], 'countries': info['countries'],
+               'common_names': json_field(info.get('common_names'))}
+        for name, info in gbif.fetch(scientific_names).items()
+    }
+
+def enrich_rows(rows, gbif):
+    """Enrichit les lignes par lots de CHUNK_SIZE et les rend une à une."""
+    for chunk in chunked(rows, CHUNK_SIZE):
+        # On enrichit seulement les lignes dont l'ID n'est pas déjà là
+        gbif_results = get_gbif_data(gbif, [row['scientific_name'] for row in chunk if not row.get('gbif_id')])
+        for row in chunk:
+            if not row.get('gbif_id') and row['scientific_name'] in gbif_results:
+                row.update(gbif_results[row['scientific_name']])
+
+            # Formatage de la liste des pays pour le CSV
+            # Si GBIF a fourni une liste de pays, on l'utilise, sinon on garde l'ancienne
+            if 'countries' in row and isinstance(row['countries'], list):
+                row['countries'] = list_to_postgres_array_string(row['countries'])
+            yield row
 
 def main():
-    """Script principal pour enrichir le CSV avec les données GBIF."""
+    """Script principal pour enrichir le CSV avec les données GBIF, ligne par ligne."""
     try:
-        with open(CSV_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            original_data = list(reader)
-            fieldnames = reader.fieldnames
+        infile = open(CSV_FILE, 'r', encoding='utf-8')
     except FileNotFoundError:
         print(f"Erreur : Le fichier '{CSV_FILE}' n'a pas été trouvé.")
-        return
-
-    # S'assurer que les colonnes nécessaires existent
-    if 'gbif_id' not in fieldnames: fieldnames.append('gbif_id')
-    if 'name_en' not in fieldnames: fieldnames.append('name_en')
-
-    enriched_data = []
-    print(f"Enrichissement des données GBIF pour {len(original_data)} poissons...")
-
-    for row in tqdm(original_data, desc="Progression"):
-        time.sleep(0.1)
-
-        # On enrichit seulement si l'ID n'est pas déjà là
-        if not row.get('gbif_id'):
-            gbif_data = get_gbif_data(row['scientific_name'])
-            row.update(gbif_data)
-
-        # Formatage de la liste des pays pour le CSV
-        # Si GBIF a fourni une liste de pays, on l'utilise, sinon on garde l'ancienne
-        if 'countries' in row and isinstance(row['countries'], list):
-            row['countries'] = list_to_postgres_array_string(row['countries'])
-
-        enriched_data.append(row)
-
-    print(f"Sauvegarde des données enrichies dans {CSV_FILE}...")
-    try:
-        with open(CSV_FILE, 'w', newline='', encoding='utf-8') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(enriched_data)
-        print(f"-> Succès ! Fichier {CSV_FILE} mis à jour.")
-    except IOError as e:
-        print(f"Erreur lors de l'écriture du fichier CSV : {e}")
+        sys.exit(1)
+
+    with infile:
+        reader = csv.DictReader(infile)
+        fieldnames = list(reader.fieldnames)
+
+        # S'assurer que les colonnes nécessaires existent
+        if 'gbif_id' not in fieldnames: fieldnames.append('gbif_id')
+        if 'name_en' not in fieldnames: fieldnames.append('name_en')
+
+        print(f"Enrichissement des données GBIF par lots de {CHUNK_SIZE} poissons...")
+        print(f"Sauvegarde des données enrichies dans {CSV_FILE}...")
+        journal_file = journal_file_for(CSV_FILE)
+        try:
+            with ResultJournal(journal_file) as journal:
+                if journal.resumed:
+                    print(f"Reprise : {journal.resumed} espèces déjà interrogées lues dans {journal_file}.")
+                with GbifSession(concurrency=GBIF_CONCURRENCY, rate_limit=GBIF_RATE_LIMIT, progress=False,
+                                 journal=journal) as gbif, \
+                        AtomicCsvWriter(CSV_FILE, fieldnames, extrasaction='ignore') as writer:
+                    for row in tqdm(enrich_rows(reader, gbif), desc="Progression", unit=" lignes"):
+                        writer.writerow(row)
+                # Fichier final en place : le journal n'est plus utile
+                journal.remove()
+            print(f"-> Succès ! Fichier {CSV_FILE} mis à jour ({writer.count} lignes).")
+        except KeyboardInterrupt:
+            print(f"\nInterrompu : résultats conservés dans {journal_file}, relancez le script pour reprendre.")
+            sys.exit(1)
+        except IOError as e:
+            print(f"Erreur lors de l'écriture du fichier CSV : {e}")
+            sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with instrument("atlantique:enrich"):
+        main()
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Mesure sur un Postgres local : mise à jour des doublons ligne par ligne
+(deux UPDATE par poisson, l'ancien format) contre l'instruction ensembliste
+`UPDATE ... FROM (VALUES ...)` générée par `common.sql.BulkRegistryUpdate`.
+
+Une copie de `species_registry` (colonnes utiles seulement, index sur
+scientific_name) est créée dans un schéma dédié et remplie de lignes
+synthétiques ; les deux scripts y sont appliqués avec `psql` et le contenu
+final de la table est comparé. Le schéma est supprimé à la fin. La version
+du serveur et la machine sont affichées avec les mesures : un chiffre cité
+doit être accompagné de cette sortie complète.
+
+Usage :
+    python benchmarks/bench_bulk_sql.py --dsn postgresql://postgres@localhost/postgres
+    python benchmarks/bench_bulk_sql.py --rows 100000 --duplicates 2000
+(la connexion peut aussi venir de DATABASE_URL)
+"""
+import argparse
+import io
+import os
+import platform
+import subprocess
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+from common.sql import REGISTRY_TABLE, BulkRegistryUpdate, sql_literal, sql_text_array
+
+SCHEMA = "bench_bulk_sql"
+BENCH_TABLE = f"{SCHEMA}.species_registry"
+COUNTRIES = ["US", "CA", "PT", "ES", "FR", "IE", "GB", "NO", "MA", "SN"]
+
+
+def setup_sql(rows):
+    return f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {BENCH_TABLE} (
+    id serial PRIMARY KEY,
+    scientific_name text NOT NULL,
+    water_types text[],
+    countries text[]
+);
+INSERT INTO {BENCH_TABLE} (scientific_name, water_types, countries)
+SELECT 'Species ' || i, ARRAY['fresh'], ARRAY['FR']
+FROM generate_series(1, {rows}) AS i;
+CREATE INDEX ON {BENCH_TABLE} (scientific_name);
+ANALYZE {BENCH_TABLE};
+"""
+
+
+def per_row_sql(names):
+    """Ancien format : deux UPDATE par poisson, chacun dans sa propre transaction."""
+    countries_sql_array = sql_text_array(COUNTRIES)
+    lines = []
+    for name in names:
+        lines.append(f"UPDATE {REGISTRY_TABLE} SET water_types = ARRAY(SELECT DISTINCT unnest(water_types || '{{salt}}')) "
+                     f"WHERE scientific_name = {sql_literal(name)};")
+        lines.append(f"UPDATE {REGISTRY_TABLE} SET countries = ARRAY(SELECT DISTINCT unnest(countries || {countries_sql_array})) "
+                     f"WHERE scientific_name = {sql_literal(name)};")
+    return "\n".join(lines) + "\n"
+
+
+def bulk_sql(names):
+    out = io.StringIO()
+    update = BulkRegistryUpdate(out, 'salt', COUNTRIES, "Benchmark")
+    for name in names:
+        update.add(name)
+    update.finish()
+    return out.getvalue()
+
+
+def psql(dsn, script, capture=False):
+    process = subprocess.run(
+        ['psql', dsn, '-X', '-q', '-A', '-t', '-v', 'ON_ERROR_STOP=1'],
+        input=script, text=True, check=True, stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+        env=dict(os.environ, PGOPTIONS='-c client_min_messages=warning'),
+    )
+    return process.stdout.strip() if capture else None
+
+
+def run(dsn, rows, script):
+    """Recrée la table, applique le script ; renvoie (durée, empreinte du contenu final)."""
+    psql(dsn, setup_sql(rows))
+    start = time.perf_counter()
+    psql(dsn, script.replace(REGISTRY_TABLE, BENCH_TABLE))
+    elapsed = time.perf_counter() - start
+    checksum = psql(dsn, f"SELECT md5(string_agg(scientific_name || array_to_string(ARRAY(SELECT unnest(water_types) ORDER BY 1), ',') "
+                         f"|| array_to_string(ARRAY(SELECT unnest(countries) ORDER BY 1), ','), '|' ORDER BY id)) "
+                         f"FROM {BENCH_TABLE};", capture=True)
+    return elapsed, checksum
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help="chaîne de connexion Postgres")
+    parser.add_argument('--rows', type=int, default=50_000, help="taille de la table")
+    parser.add_argument('--duplicates', type=int, default=500, help="poissons à mettre à jour")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("indiquez --dsn ou la variable DATABASE_URL")
+
+    step = max(args.rows // args.duplicates, 1)
+    names = [f"Species {i}" for i in range(1, args.rows + 1, step)][:args.duplicates]
+    print(f"Serveur : {psql(args.dsn, 'SELECT version();', capture=True)}")
+    print(f"Client : {platform.platform()}, {os.cpu_count()} cœurs, Python {platform.python_version()}")
+    print(f"Table de {args.rows} lignes, {len(names)} poissons à mettre à jour.")
+
+    try:
+        per_row_time, per_row_checksum = run(args.dsn, args.rows, per_row_sql(names))
+        bulk_time, bulk_checksum = run(args.dsn, args.rows, bulk_sql(names))
+    finally:
+        psql(args.dsn, f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;")
+
+    print(f"{'format':<14} {'instructions':>13} {'temps (s)':>10}")
+    print(f"{'ligne à ligne':<14} {2 * len(names):>13} {per_row_time:>10.3f}")
+    print(f"{'ensembliste':<14} {1:>13} {bulk_time:>10.3f}")
+    print(f"-> x{per_row_time / bulk_time:.1f} plus rapide ; résultats identiques : "
+          f"{'oui' if per_row_checksum == bulk_checksum else 'NON'}")
+
+
+if __name__ == "__main__":
+    main()
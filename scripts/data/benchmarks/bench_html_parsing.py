@@ -0,0 +1,172 @@
+"""
+Micro-benchmark : analyse complète BeautifulSoup ('html.parser') contre
+l'analyse ciblée de `common.html_parsing`, sur des pages enregistrées.
+
+Les pages sont lues dans `benchmarks/pages/` (list_*.html et detail_*.html).
+`--download` enregistre d'abord les pages de liste des trois régions et
+quelques pages de détail ; sans pages enregistrées, des pages synthétiques de
+taille comparable sont générées à partir des CSV.
+
+Chaque approche est mesurée dans un processus séparé : temps d'analyse et
+pic de mémoire résidente (RSS) au-delà de la mémoire de départ.
+
+Usage : python benchmarks/bench_html_parsing.py [--download] [--repeat N]
+"""
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+PAGES_DIR = os.path.join(DATA_DIR, 'benchmarks', 'pages')
+
+LIST_URLS = {
+    'eau_douce': "https://fr.wikipedia.org/wiki/Liste_des_poissons_d%27eau_douce_en_France_m%C3%A9tropolitaine",
+    'mediterranee': "https://fr.wikipedia.org/wiki/Liste_des_poissons_de_la_mer_M%C3%A9diterran%C3%A9e",
+    'atlantique': "https://fr.wikipedia.org/wiki/Liste_des_poissons_de_l%27oc%C3%A9an_Atlantique",
+}
+DETAIL_PAGES_PER_LIST = 10
+
+HEADERS = {'User-Agent': 'fishable-benchmark/1.0'}
+
+
+def download_pages():
+    """Enregistre les pages de liste et quelques pages de détail."""
+    import requests
+    from common.html_parsing import parse_list_tables
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    for region, url in LIST_URLS.items():
+        content = session.get(url, timeout=30).content
+        with open(os.path.join(PAGES_DIR, f"list_{region}.html"), 'wb') as outfile:
+            outfile.write(content)
+        links = [a['href'] for a in parse_list_tables(content).select('td i a[href^="/wiki/"]')]
+        for index, href in enumerate(links[:DETAIL_PAGES_PER_LIST]):
+            detail = session.get("https://fr.wikipedia.org" + href, timeout=30).content
+            with open(os.path.join(PAGES_DIR, f"detail_{region}_{index}.html"), 'wb') as outfile:
+                outfile.write(detail)
+        print(f"{region} : page de liste et {min(len(links), DETAIL_PAGES_PER_LIST)} pages de détail enregistrées.")
+
+
+def synthetic_pages():
+    """Pages de taille réaliste construites à partir des CSV régionaux."""
+    padding = "".join(
+        f'<div class="navbox"><table><tr><td><a href="/wiki/X{i}">Lien {i}</a> '
+        f'<span class="reference">[{i}]</span></td></tr></table></div>'
+        for i in range(1500)
+    )
+    pages = {}
+    for csv_file in glob.glob(os.path.join(DATA_DIR, '*', 'poissons_*[!i].csv')):
+        with open(csv_file, 'r', encoding='utf-8') as infile:
+            rows = list(csv.DictReader(infile))
+        table_rows = "".join(
+            f'<tr><td>{i}</td><td>{row["family"]}</td><td>{row["name"]}</td>'
+            f'<td><i><a href="/wiki/{row["scientific_name"].replace(" ", "_")}">{row["scientific_name"]}</a></i></td>'
+            f'<td><img src="//upload.wikimedia.org/{i}.jpg"></td></tr>'
+            for i, row in enumerate(rows)
+        )
+        name = os.path.splitext(os.path.basename(csv_file))[0]
+        pages[f"list_{name}"] = (
+            '<html><body><div class="mw-parser-output"><h4>Famille : Exemple</h4>'
+            f'<table class="wikitable sortable"><tbody><tr><th>#</th></tr>{table_rows}</tbody></table>'
+            f'{padding}</div></body></html>'
+        ).encode('utf-8')
+        for i, row in enumerate(rows[:DETAIL_PAGES_PER_LIST]):
+            pages[f"detail_{name}_{i}"] = (
+                '<html><body><div class="mw-parser-output">'
+                '<table class="infobox_v2 infobox-biologie"><tr><td><img src="//upload.wikimedia.org/a.jpg"></td></tr>'
+                '<tr><th>Taille max</th><td>120 cm</td></tr><tr><th>Poids</th><td>30 kg</td></tr></table>'
+                f'<p>{row["description"] or row["name"]}</p>'
+                + "<p>Paragraphe. </p>" * 200 + padding +
+                '</div></body></html>'
+            ).encode('utf-8')
+    return pages
+
+
+def load_pages():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, '*.html'))):
+        with open(path, 'rb') as infile:
+            pages[os.path.splitext(os.path.basename(path))[0]] = infile.read()
+    return pages or synthetic_pages()
+
+
+def parse_full(name, content):
+    """Approche d'origine : arbre BeautifulSoup complet puis recherche."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    if name.startswith('list_'):
+        return sum(len(t.find_all('tr')) for t in soup.find_all('table', class_='wikitable'))
+    parser_output = soup.find('div', class_='mw-parser-output')
+    first_p = parser_output.find('p', recursive=False) if parser_output else None
+    infobox = soup.select_one('table.infobox_v2.infobox-biologie')
+    return (first_p.get_text() if first_p else None, len(infobox.find_all('tr')) if infobox else 0)
+
+
+def parse_targeted(name, content):
+    """Nouvelle approche : SoupStrainer pour les listes, lxml + XPath pour les détails."""
+    from common.html_parsing import parse_detail_page, parse_list_tables
+    if name.startswith('list_'):
+        soup = parse_list_tables(content)
+        return sum(len(t.find_all('tr')) for t in soup.find_all('table', class_='wikitable'))
+    description, infobox = parse_detail_page(content, skip_empty=False)
+    return (description, len(infobox['rows']) if infobox else 0)
+
+
+def run_approach(approach, pages, repeat, queue):
+    """Exécuté dans un processus dédié pour isoler la mesure mémoire."""
+    parse = parse_full if approach == 'full' else parse_targeted
+    parse(*next(iter(pages.items())))  # imports et échauffement
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = {'list': 0.0, 'detail': 0.0}
+    for _ in range(repeat):
+        for name, content in pages.items():
+            start = time.perf_counter()
+            parse(name, content)
+            timings['list' if name.startswith('list_') else 'detail'] += time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    queue.put((timings, peak))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--download', action='store_true', help="enregistre les pages Wikipedia avant la mesure")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.download:
+        download_pages()
+    pages = load_pages()
+    counts = {kind: sum(1 for n in pages if n.startswith(kind)) for kind in ('list_', 'detail_')}
+    total_bytes = sum(len(c) for c in pages.values())
+    print(f"{counts['list_']} pages de liste, {counts['detail_']} pages de détail ({total_bytes / 1e6:.1f} Mo), "
+          f"{args.repeat} passes.")
+
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for approach in ('full', 'targeted'):
+        queue = context.Queue()
+        process = context.Process(target=run_approach, args=(approach, pages, args.repeat, queue))
+        process.start()
+        results[approach] = queue.get()
+        process.join()
+
+    print(f"{'approche':<10} {'listes (s)':>11} {'détails (s)':>12} {'pic RSS (Mo)':>13}")
+    for approach, (timings, peak_kb) in results.items():
+        print(f"{approach:<10} {timings['list']:>11.3f} {timings['detail']:>12.3f} {peak_kb / 1024:>13.1f}")
+    full, targeted = results['full'][0], results['targeted'][0]
+    for kind in ('list', 'detail'):
+        if targeted[kind]:
+            print(f"-> {kind} : x{full[kind] / targeted[kind]:.1f} plus rapide")
+
+
+if __name__ == "__main__":
+    main()
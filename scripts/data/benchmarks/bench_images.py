@@ -0,0 +1,107 @@
+"""
+Ingestion des images d'espèces (common/images.py) contre le serveur local
+offline/stub_images.py, qui simule la latence d'un serveur distant.
+
+Les URL reproduisent la répartition de l'export species_registry_rows.csv :
+chaque URL distincte y devient une image générée (800x600) ; les URL
+répétées restent répétées, une image « par défaut » est servie sous
+plusieurs dossiers (mêmes octets, URL différentes) et quelques URL sont en
+erreur (404, page HTML).
+
+Pour chaque nombre de threads : durée, téléchargements, images converties,
+octets téléchargés puis écrits ; un second passage sur le même dossier ne
+doit plus rien télécharger (manifeste). Le poids de la variante icon est
+comparé à celui de l'image que l'application téléchargeait pour l'afficher.
+
+Usage : python benchmarks/bench_images.py [--workers 1 8] [--latency 0.05] [--copies 1]
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+from common.fetcher import PageFetcher
+from common.images import ImageStore
+from offline.stub_images import render_path, start_server
+
+DEFAULT_WORKERS = [1, 8]
+DEFAULT_LATENCY = 0.05
+SOURCE_SIZE = "800x600"
+# Dossiers sous lesquels l'image par défaut est servie
+PLACEHOLDER_DIRS = 4
+BROKEN_URLS = ["missing-photo-800x600.jpg", "page-800x600.html"]
+
+
+def registry_urls(base, copies):
+    """URL de l'export réel transposées sur le serveur local, `copies` fois."""
+    with open(os.path.join(DATA_DIR, 'species_registry_rows.csv'), 'r', encoding='utf-8') as infile:
+        references = [row['photo_url'] for row in csv.DictReader(infile) if row['photo_url']]
+    distinct = list(dict.fromkeys(references))
+    urls = []
+    for copy in range(copies):
+        for url in references:
+            urls.append(f"{base}/c{copy}/species{distinct.index(url)}-{SOURCE_SIZE}.jpg")
+    urls += [f"{base}/p{index}/defaut-{SOURCE_SIZE}.png" for index in range(PLACEHOLDER_DIRS)]
+    urls += [f"{base}/broken/{name}" for name in BROKEN_URLS]
+    return urls
+
+
+def ingest(urls, image_dir, workers):
+    fetcher = PageFetcher(workers=workers, rate_limit=0)
+    start = time.perf_counter()
+    try:
+        with ImageStore(image_dir, fetcher) as store:
+            digests = store.ingest_all(urls, desc=f"{workers} threads")
+    finally:
+        fetcher.close()
+    return store, digests, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=DEFAULT_WORKERS)
+    parser.add_argument('--latency', type=float, default=DEFAULT_LATENCY, help="latence simulée (s)")
+    parser.add_argument('--copies', type=int, default=1, help="copies de l'export (images distinctes)")
+    args = parser.parse_args()
+
+    server = start_server(latency=args.latency)
+    base = f"http://127.0.0.1:{server.server_port}"
+    urls = registry_urls(base, args.copies)
+    # Images générées d'avance : le serveur partage le processus (et le GIL) avec les threads mesurés
+    for url in set(urls):
+        render_path(url)
+    print(f"{len(urls)} références, {len(set(urls))} URL distinctes, latence simulée {args.latency * 1000:.0f} ms.")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as root:
+        for workers in args.workers:
+            image_dir = os.path.join(root, f'images_{workers}')
+            store, digests, elapsed = ingest(urls, image_dir, workers)
+            _, _, rerun = ingest(urls, image_dir, workers)
+            unique = len({digest for digest in digests.values() if digest})
+            rows.append((workers, elapsed, store, unique, rerun))
+
+        sample = next(digest for digest in digests.values() if digest)
+        icon_size = os.path.getsize(store.variant_path('icon', sample))
+        card_size = os.path.getsize(store.variant_path('card', sample))
+    server.shutdown()
+
+    print(f"\n{'threads':>7} | {'durée (s)':>9} {'img/s':>7} | {'télécharg.':>10} {'Ko reçus':>9} | "
+          f"{'distinctes':>10} {'converties':>10} {'Ko WebP':>8} {'échecs':>6} | {'2e passage (s)':>14}")
+    for workers, elapsed, store, unique, rerun in rows:
+        print(f"{workers:>7} | {elapsed:>9.2f} {store.downloads / elapsed:>7.1f} | {store.downloads:>10} "
+              f"{store.downloaded_bytes / 1024:>9.0f} | {unique:>10} {store.rendered:>10} "
+              f"{store.written_bytes / 1024:>8.0f} {store.failures:>6} | {rerun:>14.3f}")
+
+    source_size = store.downloaded_bytes / store.downloads
+    print(f"\nPoids moyen de l'image source : {source_size / 1024:.1f} Ko ; "
+          f"variante icon : {icon_size / 1024:.1f} Ko, card : {card_size / 1024:.1f} Ko.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Suite de benchmarks hors ligne de la chaîne de collecte, sans accès réseau.
+
+Un corpus d'espèces (offline/corpus.py : les poissons des CSV existants,
+démultipliés jusqu'à la taille demandée) est servi par deux serveurs locaux,
+offline/stub_wikipedia.py et offline/stub_gbif.py. Chaque étape est lancée
+dans un processus neuf, sur le code réel des modules `common` :
+  - get_fish_list : téléchargement et lecture des trois pages de liste ;
+  - details       : pages de détail (HTML) téléchargées et analysées ;
+  - gbif          : enrichissement GBIF (match, nom anglais, pays, habitats) ;
+  - dedupe        : vérification des régions dans le registre des espèces connues ;
+  - sql           : génération des scripts de mise à jour des doublons.
+Pour chaque étape : éléments traités, durée, débit, pic RSS et requêtes
+reçues par les serveurs. Les étapes se passent leurs résultats par des
+fichiers JSON (écrits hors mesure) dans un dossier temporaire.
+
+Avec --baseline, chaque étape est comparée à une mesure de référence sur
+des signaux qui ne dépendent pas de la machine : le script échoue (code 1)
+si elle traite moins d'éléments, envoie plus de requêtes, ou dépasse le pic
+mémoire de référence au-delà de --tolerance. Les débits ne sont comparés
+qu'avec --throughput, pour une référence mesurée sur la même machine (une
+référence prise ailleurs, sur un autre nombre de cœurs, n'est pas comparable).
+
+Usage :
+    python benchmarks/bench_offline.py                      # 10 000 espèces
+    python benchmarks/bench_offline.py --species 10000 100000
+    python benchmarks/bench_offline.py --species 0          # corpus réel seulement
+    python benchmarks/bench_offline.py --output mesures.json --baseline benchmarks/baseline_offline.json
+    python benchmarks/bench_offline.py --output avant.json     # puis, après modification :
+    python benchmarks/bench_offline.py --baseline avant.json --throughput
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+STAGES = ['get_fish_list', 'details', 'gbif', 'dedupe', 'sql']
+DEFAULT_SPECIES = [10_000]
+DEFAULT_TOLERANCE = 0.5
+# En dessous de cette durée de référence, le débit mesuré est trop bruité pour être comparé
+MIN_COMPARED_SECONDS = 0.1
+
+
+def read_json(workdir, name):
+    with open(os.path.join(workdir, name), 'r', encoding='utf-8') as infile:
+        return json.load(infile)
+
+
+def write_json(workdir, name, data):
+    with open(os.path.join(workdir, name), 'w', encoding='utf-8') as outfile:
+        json.dump(data, outfile, ensure_ascii=False)
+
+
+# --- Étapes, exécutées dans le processus enfant : renvoient (éléments, durée) ---
+
+def stage_get_fish_list(workdir):
+    from common.regions import REGIONS
+    from common.scraping import get_fish_list
+
+    start = time.perf_counter()
+    lists = {name: get_fish_list(region, region.list_url) for name, region in REGIONS.items()}
+    elapsed = time.perf_counter() - start
+    write_json(workdir, 'lists.json', lists)
+    return sum(len(fish_list) for fish_list in lists.values()), elapsed
+
+
+def stage_details(workdir):
+    from common.fetcher import PageFetcher
+    from common.regions import REGIONS
+    from common.scraping import DETAIL_STRATEGIES, HEADERS, SCRAPER_WORKERS, fetch_details
+
+    lists = read_json(workdir, 'lists.json')
+    # Pas de limite de débit : c'est le téléchargement et l'analyse qui sont mesurés
+    fetcher = PageFetcher(HEADERS, workers=SCRAPER_WORKERS, rate_limit=0)
+    start = time.perf_counter()
+    try:
+        details = {name: [fish for fish, received in fetch_details(DETAIL_STRATEGIES[REGIONS[name].details], 'html',
+                                                                   fish_list, fetcher) if received]
+                   for name, fish_list in lists.items()}
+    finally:
+        fetcher.close()
+    elapsed = time.perf_counter() - start
+    write_json(workdir, 'details.json', details)
+    return sum(len(fish_list) for fish_list in details.values()), elapsed
+
+
+def stage_gbif(workdir):
+    from common.gbif import GbifSession
+
+    details = read_json(workdir, 'details.json')
+    names = list(dict.fromkeys(fish['scientific_name'] for fish_list in details.values() for fish in fish_list))
+    start = time.perf_counter()
+    with GbifSession(rate_limit=0, with_habitats=True, cache_file=None, progress=False) as gbif:
+        results = gbif.fetch(names)
+    elapsed = time.perf_counter() - start
+    write_json(workdir, 'gbif.json', {name: info['gbif_id'] for name, info in results.items()})
+    return len(names), elapsed
+
+
+def stage_dedupe(workdir):
+    from common.known_species import KnownSpeciesRegistry
+    from common.regions import FRESHWATER
+
+    details = read_json(workdir, 'details.json')
+    gbif_ids = read_json(workdir, 'gbif.json')
+    duplicates = {}
+    start = time.perf_counter()
+    with KnownSpeciesRegistry(os.path.join(workdir, 'known_species.sqlite'), gbif_cache_file=None) as registry:
+        # Comme la chaîne réelle : l'eau douce amorce le registre, les mers sont vérifiées ensuite
+        for fish in details[FRESHWATER.name]:
+            registry.add(fish['scientific_name'], FRESHWATER.name, gbif_ids.get(fish['scientific_name']))
+        for name, fish_list in details.items():
+            if name == FRESHWATER.name:
+                continue
+            duplicates[name] = []
+            for fish in fish_list:
+                known = registry.check_and_add(fish['scientific_name'], name, gbif_ids.get(fish['scientific_name']))
+                if known:
+                    duplicates[name].append(known.scientific_name)
+        registry.commit()
+    elapsed = time.perf_counter() - start
+    write_json(workdir, 'duplicates.json', duplicates)
+    return sum(len(fish_list) for fish_list in details.values()), elapsed
+
+
+def stage_sql(workdir):
+    from common.csv_stream import AtomicWriter
+    from common.regions import REGIONS
+    from common.sql import BulkRegistryUpdate
+
+    duplicates = read_json(workdir, 'duplicates.json')
+    start = time.perf_counter()
+    for name, names in duplicates.items():
+        region = REGIONS[name]
+        with AtomicWriter(os.path.join(workdir, f'update_{name}.sql')) as out:
+            update = BulkRegistryUpdate(out, region.water_types[0], region.countries, f"Doublons {name}")
+            for scientific_name in names:
+                update.add(scientific_name)
+            update.finish()
+    elapsed = time.perf_counter() - start
+    return sum(len(names) for names in duplicates.values()), elapsed
+
+
+STAGE_FUNCTIONS = {
+    'get_fish_list': stage_get_fish_list,
+    'details': stage_details,
+    'gbif': stage_gbif,
+    'dedupe': stage_dedupe,
+    'sql': stage_sql,
+}
+
+
+def run_stage(stage, workdir):
+    """Exécuté dans un processus neuf : lance l'étape et affiche éléments, durée et pic RSS."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        count, elapsed = STAGE_FUNCTIONS[stage](workdir)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{count} {elapsed} {peak_kb}")
+
+
+def measure(stage, workdir, env):
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--stage', stage, workdir],
+        env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"étape {stage} en échec :\n{process.stderr}")
+    count, elapsed, peak_kb = process.stdout.split()[-3:]
+    return int(count), float(elapsed), int(peak_kb) / 1024
+
+
+def run_suite(corpus, species_label):
+    """Lance toutes les étapes sur un corpus ; renvoie {étape: mesures}."""
+    from offline import stub_gbif, stub_wikipedia
+
+    wikipedia = stub_wikipedia.start_server(corpus)
+    gbif = stub_gbif.start_server(corpus)
+    wikipedia_url = f"http://127.0.0.1:{wikipedia.server_port}"
+    env = dict(os.environ, WIKIPEDIA_BASE_URL=wikipedia_url, MEDIAWIKI_API_URL=f"{wikipedia_url}/w/api.php",
+               GBIF_API_URL=f"http://127.0.0.1:{gbif.server_port}/v1")
+    handlers = [wikipedia.RequestHandlerClass, gbif.RequestHandlerClass]
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for stage in STAGES:
+                requests_before = sum(handler.request_count for handler in handlers)
+                count, elapsed, peak_mb = measure(stage, workdir, env)
+                requests = sum(handler.request_count for handler in handlers) - requests_before
+                results[stage] = {
+                    'items': count, 'seconds': round(elapsed, 4),
+                    'per_second': round(count / elapsed, 1) if elapsed else 0.0,
+                    'peak_rss_mb': round(peak_mb, 1), 'requests': requests,
+                }
+                print(f"{species_label:>8} {stage:<14} {count:>9} {elapsed:>9.2f} "
+                      f"{results[stage]['per_second']:>10.0f} {peak_mb:>9.1f} {requests:>9}")
+    finally:
+        wikipedia.shutdown()
+        gbif.shutdown()
+    return results
+
+
+def compare(results, baseline, tolerance, throughput=False):
+    """
+    Liste des régressions par rapport à la référence (mêmes tailles de corpus
+    seulement) ; débits comparés seulement si `throughput`.
+    """
+    regressions = []
+    for size, stages in results.items():
+        for stage, measures in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if not reference:
+                continue
+            if measures['items'] < reference['items']:
+                regressions.append(f"{size} {stage} : {measures['items']} éléments "
+                                   f"contre {reference['items']}")
+            if measures['requests'] > reference['requests']:
+                regressions.append(f"{size} {stage} : {measures['requests']} requêtes "
+                                   f"contre {reference['requests']}")
+            if throughput and reference['seconds'] >= MIN_COMPARED_SECONDS and \
+                    measures['per_second'] < reference['per_second'] * (1 - tolerance):
+                regressions.append(f"{size} {stage} : {measures['per_second']:.0f}/s "
+                                   f"contre {reference['per_second']:.0f}/s")
+            if measures['peak_rss_mb'] > reference['peak_rss_mb'] * (1 + tolerance):
+                regressions.append(f"{size} {stage} : {measures['peak_rss_mb']:.0f} Mo "
+                                   f"contre {reference['peak_rss_mb']:.0f} Mo")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--species', type=int, nargs='+', default=DEFAULT_SPECIES,
+                        help="tailles du corpus synthétique (0 : poissons des CSV existants)")
+    parser.add_argument('--output', help="fichier JSON où écrire les mesures")
+    parser.add_argument('--baseline', help="mesures de référence (JSON) à comparer")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="écart toléré par rapport à la référence (0,5 = 50 %%)")
+    parser.add_argument('--throughput', action='store_true',
+                        help="compare aussi les débits (référence mesurée sur la même machine)")
+    parser.add_argument('--stage', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stage(*args.stage)
+        return
+
+    from offline.corpus import real_corpus, synthetic_corpus
+
+    print(f"{'espèces':>8} {'étape':<14} {'éléments':>9} {'durée (s)':>9} {'éléments/s':>10} "
+          f"{'RSS (Mo)':>9} {'requêtes':>9}")
+    results = {}
+    for size in args.species:
+        corpus = synthetic_corpus(size) if size else real_corpus()
+        label = str(size) if size else 'réel'
+        results[label] = run_suite(corpus, label)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as outfile:
+            json.dump(results, outfile, indent=2, ensure_ascii=False)
+        print(f"\n-> Mesures écrites dans {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as infile:
+            regressions = compare(results, json.load(infile), args.tolerance, args.throughput)
+        if regressions:
+            print(f"\nRégressions au-delà de {args.tolerance:.0%} :")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\n-> Aucune régression au-delà de {args.tolerance:.0%} par rapport à {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Lecture de l'export species_registry : CSV reparsé en dictionnaires (avec
+découpage des tableaux à la main) contre l'instantané Arrow mappé en mémoire
+(`common.snapshot`), pour les deux colonnes dont un outil de déduplication a
+besoin (scientific_name, countries).
+
+Des exports synthétiques (copies des lignes réelles aux noms uniques) sont
+générés dans un dossier temporaire ; chaque lecture est mesurée à froid dans
+un processus neuf (temps et pic RSS), de même que la conversion.
+
+Usage : python benchmarks/bench_snapshot.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import csv
+import itertools
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+COLUMNS = ['scientific_name', 'countries']
+
+
+def write_synthetic_export(path, count):
+    """Écrit `count` lignes copiées de l'export réel, aux noms uniques."""
+    with open(os.path.join(DATA_DIR, 'species_registry_rows.csv'), 'r', encoding='utf-8') as infile:
+        reader = csv.DictReader(infile)
+        fieldnames, template_rows = reader.fieldnames, list(reader)
+    with open(path, 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for index, row in zip(range(count), itertools.cycle(template_rows)):
+            row = dict(row)
+            row['scientific_name'] = f"{row['scientific_name']} {index}"
+            writer.writerow(row)
+
+
+def read_csv(path):
+    from common.sql import parse_array_field
+    with open(path, 'r', encoding='utf-8') as infile:
+        return [(row['scientific_name'], parse_array_field(row['countries'])) for row in csv.DictReader(infile)]
+
+
+def read_snapshot(path):
+    from common.snapshot import open_snapshot
+    table = open_snapshot(path, columns=COLUMNS)
+    # On touche réellement les colonnes (longueurs des listes de pays)
+    countries = table.column('countries')
+    return table.num_rows, sum(len(chunk.values) for chunk in countries.chunks)
+
+
+def write_snapshot(csv_path, snapshot_path):
+    from common.snapshot import write_snapshot
+    write_snapshot(csv_path, snapshot_path)
+
+
+# Fonction mesurée pour chaque type de mesure
+READERS = {'csv': read_csv, 'arrow': read_snapshot, 'export': write_snapshot}
+
+
+def run_reader(kind, paths):
+    """Exécuté dans un processus neuf : lance la mesure et affiche temps et pic RSS."""
+    if kind != 'csv':
+        # L'import de pyarrow (~0,1 s) n'est pas compté : seule l'ouverture l'est
+        import common.snapshot  # noqa: F401
+    start = time.perf_counter()
+    READERS[kind](*paths)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed:.4f} {peak_kb}")
+
+
+def measure(kind, *paths):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--reader', kind, *paths],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(output[0]), int(output[1]) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--reader', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.reader:
+        run_reader(args.reader[0], args.reader[1:])
+        return
+
+    print(f"{'lignes':>10} | {'CSV (s)':>8} {'RSS Mo':>7} | {'export (s)':>10} | {'Arrow (ms)':>10} {'RSS Mo':>7}")
+    with tempfile.TemporaryDirectory() as root:
+        for count in args.rows:
+            csv_path = os.path.join(root, f'registry_{count}.csv')
+            snapshot_path = os.path.join(root, f'registry_{count}.arrow')
+            write_synthetic_export(csv_path, count)
+
+            export_time, _ = measure('export', csv_path, snapshot_path)
+            csv_time, csv_rss = measure('csv', csv_path)
+            arrow_time, arrow_rss = measure('arrow', snapshot_path)
+            print(f"{count:>10} | {csv_time:>8.2f} {csv_rss:>7.0f} | {export_time:>10.2f} | "
+                  f"{arrow_time * 1000:>10.1f} {arrow_rss:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Mesure sur un Postgres local : recherche actuelle de l'application
+(`name ILIKE '%q%'`, sans index utilisable) contre `search_species`
+(unaccent + index GIN trigrammes, voir common/species_search.py).
+
+Une copie de `species_registry` est créée dans un schéma dédié. Le mélange
+de requêtes reproduit une saisie réelle : début de nom, mot sans accent, nom
+anglais, genre scientifique, faute de frappe.
+  1. Pertinence, sur les poissons réels de species_registry_rows.csv :
+     requêtes dont l'espèce visée figure dans les résultats.
+  2. Latence (médiane, p95), après ajout par COPY de lignes synthétiques :
+     les mêmes poissons démultipliés avec un suffixe par variante
+     (« Brochet aquitain 12 »).
+Le schéma est supprimé à la fin.
+
+Nécessite psycopg 3 et les extensions unaccent / pg_trgm sur le serveur.
+
+Usage :
+    python benchmarks/bench_species_search.py --dsn postgresql://postgres@localhost/postgres
+    python benchmarks/bench_species_search.py --rows 500000 --queries 100
+(la connexion peut aussi venir de DATABASE_URL)
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import unicodedata
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+from common.species_search import extension_schema_of, search_setup_sql
+
+SCHEMA = "bench_species_search"
+BENCH_TABLE = f"{SCHEMA}.species_registry"
+DEFAULT_ROWS = 100_000
+DEFAULT_QUERIES = 50  # par type de requête
+RESULTS_LIMIT = 10
+
+
+
+def setup_sql():
+    return f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+CREATE TABLE {BENCH_TABLE} (
+    id serial PRIMARY KEY,
+    name text NOT NULL,
+    name_en text,
+    scientific_name text NOT NULL,
+    common_names jsonb,
+    family text,
+    description text
+);
+"""
+
+
+def strip_accents(text):
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def variant_suffix(index):
+    """Suffixe de la variante : numéro (aucun trigramme de lettres en commun avec les requêtes)."""
+    return str(index) if index else ''
+
+
+def load_templates():
+    with open(os.path.join(DATA_DIR, 'species_registry_rows.csv'), 'r', encoding='utf-8') as infile:
+        return [row for row in csv.DictReader(infile) if row['name'] and row['scientific_name']]
+
+
+def synthetic_rows(templates, count):
+    for index in range(count):
+        row = templates[index % len(templates)]
+        suffix = variant_suffix(index // len(templates))
+        name = f"{row['name']} {suffix}".strip()
+        name_en = f"{row['name_en']} {suffix}".strip() if row['name_en'] else None
+        common_names = {'fra': [name]}
+        if name_en:
+            common_names['eng'] = [name_en]
+        yield (name, name_en, f"{row['scientific_name']} {suffix}".strip(),
+               json.dumps(common_names, ensure_ascii=False), row['family'] or None, row['description'] or None)
+
+
+def typo(word, rng):
+    """Supprime une lettre au milieu du mot."""
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + word[position + 1:]
+
+
+def query_mix(templates, per_kind, seed=42):
+    """[(type, requête, nom scientifique visé)] : saisies plausibles d'un utilisateur."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(per_kind):
+        row = rng.choice(templates)
+        queries.append(('début de nom', row['name'][:rng.randint(3, 6)].lower(), row['scientific_name']))
+
+        row = rng.choice(templates)
+        words = [w for w in strip_accents(row['name']).lower().split() if len(w) >= 4] or [row['name'].lower()]
+        queries.append(('mot sans accent', rng.choice(words), row['scientific_name']))
+
+        row = rng.choice([t for t in templates if t['name_en']])
+        queries.append(('nom anglais', row['name_en'].split()[-1].lower(), row['scientific_name']))
+
+        row = rng.choice(templates)
+        queries.append(('genre', row['scientific_name'].split()[0], row['scientific_name']))
+
+        row = rng.choice(templates)
+        words = [w for w in strip_accents(row['name']).lower().split() if len(w) >= 6]
+        if words:
+            queries.append(('faute de frappe', typo(rng.choice(words), rng), row['scientific_name']))
+    return queries
+
+
+def run_queries(cursor, sql, queries, make_param):
+    """Renvoie [(type, durée, nombre de résultats, espèce visée trouvée)] pour chaque requête."""
+    measures = []
+    for kind, query, target in queries:
+        start = time.perf_counter()
+        cursor.execute(sql, (make_param(query),))
+        rows = cursor.fetchall()
+        elapsed = time.perf_counter() - start
+        measures.append((kind, elapsed, len(rows), any(name == target for (name,) in rows)))
+    return measures
+
+
+def latency(measures):
+    """(médiane, p95) en millisecondes."""
+    times = sorted(m[1] for m in measures)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    return statistics.median(times) * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help="chaîne de connexion Postgres")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES, help="requêtes par type")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("indiquez --dsn ou la variable DATABASE_URL")
+    try:
+        import psycopg
+    except ImportError:
+        print("Erreur : psycopg n'est pas installé (pip install \"psycopg[binary]\").")
+        sys.exit(1)
+
+    templates = load_templates()
+    queries = query_mix(templates, args.queries)
+    baseline_sql = f"SELECT scientific_name FROM {BENCH_TABLE} WHERE name ILIKE %s LIMIT {RESULTS_LIMIT}"
+    search_sql = f"SELECT scientific_name FROM {SCHEMA}.search_species(%s, {RESULTS_LIMIT})"
+
+    copy_sql = f"COPY {BENCH_TABLE} (name, name_en, scientific_name, common_names, family, description) FROM STDIN"
+    methods = [
+        ("ILIKE '%q%' sur name", baseline_sql, lambda q: f"%{q}%"),
+        ("search_species", search_sql, lambda q: q),
+    ]
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn, conn.cursor() as cursor:
+        try:
+            cursor.execute(setup_sql())
+            rows = list(synthetic_rows(templates, max(args.rows, len(templates))))
+            with cursor.copy(copy_sql) as copy:
+                for values in rows[:len(templates)]:
+                    copy.write_row(values)
+            for statement in search_setup_sql(BENCH_TABLE, extension_schema_of(cursor)):
+                cursor.execute(statement)
+
+            # 1. Pertinence sur le registre réel
+            relevance = [(label, run_queries(cursor, sql, queries, make_param)) for label, sql, make_param in methods]
+
+            # 2. Latence sur le registre démultiplié (colonne générée calculée à l'insertion)
+            print(f"Ajout de {len(rows) - len(templates)} lignes synthétiques ({len(templates)} espèces modèles)...")
+            start = time.perf_counter()
+            with cursor.copy(copy_sql) as copy:
+                for values in rows[len(templates):]:
+                    copy.write_row(values)
+            # Comme l'autovacuum sur la table en service : fusionne la liste d'attente de l'index GIN
+            cursor.execute(f"VACUUM ANALYZE {BENCH_TABLE}")
+            print(f"-> Chargées et indexées en {time.perf_counter() - start:.2f} s.")
+
+            # Un premier passage met les pages en cache, le second est mesuré
+            timings = []
+            for label, sql, make_param in methods:
+                run_queries(cursor, sql, queries, make_param)
+                timings.append((label, run_queries(cursor, sql, queries, make_param)))
+        finally:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+    kinds = list(dict.fromkeys(kind for kind, _, _ in queries))
+    print(f"\nPertinence ({len(queries)} requêtes, {len(templates)} poissons réels) : espèce visée trouvée")
+    print(f"{'type de requête':<18} " + " ".join(f"{label:>22}" for label, _ in relevance))
+    for kind in kinds + [None]:
+        cells = []
+        for _, measures in relevance:
+            selected = [m for m in measures if kind is None or m[0] == kind]
+            cells.append(f"{sum(1 for m in selected if m[3])}/{len(selected)}")
+        print(f"{kind or 'total':<18} " + " ".join(f"{cell:>22}" for cell in cells))
+
+    print(f"\nLatence ({len(queries)} requêtes, {len(rows)} lignes) :")
+    print(f"{'méthode':<22} {'médiane':>9} {'p95':>9}")
+    for label, measures in timings:
+        median, p95 = latency(measures)
+        print(f"{label:<22} {median:>7.2f}ms {p95:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
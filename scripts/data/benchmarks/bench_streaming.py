@@ -0,0 +1,141 @@
+"""
+Benchmark des étapes CSV en flux : temps et pic de mémoire en fonction du
+nombre de lignes.
+
+Des CSV synthétiques (copies des lignes régionales réelles, aux noms
+scientifiques et clés GBIF distincts comme dans offline/corpus.py) sont
+générés dans un dossier temporaire qui reproduit l'arborescence des régions, puis chaque
+étape est lancée dans un processus neuf depuis ce dossier. Toutes les lignes
+ont déjà un gbif_id : l'enrichissement GBIF ne fait aucune requête et mesure
+uniquement la lecture/écriture.
+
+Avec un traitement ligne à ligne, le pic RSS doit rester quasi constant
+quelle que soit la taille de l'entrée.
+
+Usage : python benchmarks/bench_streaming.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import csv
+import os
+import resource
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DATA_DIR)
+
+from offline.corpus import KEY_STRIDE, letters
+
+FRESHWATER = "eau-douce-france-metropole"
+MED = "mediterranee"
+
+# (dossier, script, entrée synthétique à générer ou None si produite par l'étape précédente)
+STAGES = [
+    (MED, 'add_med_data.py', 'poissons_mediterranee.csv'),
+    (MED, 'deduplicate_and_update.py', None),
+    (MED, 'enrich_med_gbif.py', None),
+    (FRESHWATER, 'add_water_type.py', 'poissons_france_enrichi.csv'),
+]
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+# Taille du fichier de référence eau douce (amorce le registre des espèces connues de la déduplication)
+REFERENCE_ROWS = 100
+
+
+def load_template_rows():
+    """Lignes réelles servant de modèle aux CSV synthétiques."""
+    with open(os.path.join(DATA_DIR, MED, 'poissons_mediterranee_deduplicate_enrichi.csv'), 'r', encoding='utf-8') as infile:
+        reader = csv.DictReader(infile)
+        return reader.fieldnames, list(reader)
+
+
+def write_synthetic_csv(path, fieldnames, template_rows, count):
+    """
+    Écrit `count` lignes aux noms uniques, sans garder le fichier en mémoire.
+    La n-ième copie d'une ligne modèle prend un suffixe en lettres accolé à
+    l'épithète et une clé GBIF décalée de n * KEY_STRIDE : un suffixe
+    numérique serait pris pour un auteur par `normalize_scientific_name` et
+    la déduplication replierait toutes les copies sur le modèle.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for index in range(count):
+            copy, template = divmod(index, len(template_rows))
+            row = dict(template_rows[template])
+            if copy:
+                row['name'] = f"{row['name']} {copy}"
+                row['scientific_name'] += letters(copy)
+            # Clé présente partout : l'enrichissement GBIF n'envoie aucune requête
+            key = int(row['gbif_id']) if row.get('gbif_id') else KEY_STRIDE - 1 - template
+            row['gbif_id'] = str(key + copy * KEY_STRIDE)
+            writer.writerow(row)
+
+
+def prepare_tree(root, fieldnames, template_rows):
+    """Copie les scripts et le module `common` dans le dossier temporaire."""
+    shutil.copytree(os.path.join(DATA_DIR, 'common'), os.path.join(root, 'common'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    for directory in {MED, FRESHWATER}:
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+    for directory, script, _ in STAGES:
+        shutil.copy(os.path.join(DATA_DIR, directory, script), os.path.join(root, directory, script))
+    # Référence eau douce de la déduplication (amorce le registre des espèces connues) : on la garde petite
+    write_synthetic_csv(os.path.join(root, FRESHWATER, 'poissons_france_enrichi.csv'),
+                        fieldnames, template_rows, REFERENCE_ROWS)
+
+
+def run_stage(script):
+    """Exécuté dans un processus neuf : lance le script et affiche temps et pic RSS."""
+    start = time.perf_counter()
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        runpy.run_path(script, run_name='__main__')
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {peak}")
+
+
+def measure(root, directory, script):
+    process = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--stage', script],
+        cwd=os.path.join(root, directory), capture_output=True, text=True, check=True,
+    )
+    elapsed, peak = process.stdout.split()[-2:]
+    return float(elapsed), int(peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--stage', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stage(args.stage)
+        return
+
+    fieldnames, template_rows = load_template_rows()
+    if 'gbif_id' not in fieldnames:
+        fieldnames.append('gbif_id')
+
+    print(f"{'lignes':>10} {'étape':<28} {'temps (s)':>10} {'lignes/s':>10} {'pic RSS (Mo)':>13}")
+    for count in args.rows:
+        with tempfile.TemporaryDirectory() as root:
+            prepare_tree(root, fieldnames, template_rows)
+            for directory, script, input_file in STAGES:
+                if input_file:
+                    write_synthetic_csv(os.path.join(root, directory, input_file), fieldnames, template_rows, count)
+                elapsed, peak = measure(root, directory, script)
+                print(f"{count:>10} {script:<28} {elapsed:>10.2f} {count / elapsed:>10.0f} {peak / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
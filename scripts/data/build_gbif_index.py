@@ -0,0 +1,64 @@
+"""
+Construit l'index GBIF local à partir d'une archive Darwin Core (DwC-A)
+téléchargée : le GBIF Backbone Taxonomy
+(https://hosted-datasets.gbif.org/datasets/backbone/current/backbone.zip)
+ou tout checklist exporté au format DwC-A, en .zip ou décompressé.
+
+L'archive est lue une seule fois, en flux ; l'index SQLite obtenu répond
+ensuite aux enrichissements GBIF sans réseau. GBIF_INDEX est absolu ou
+relatif à scripts/data (pas au dossier de la région, d'où le script est lancé) :
+
+    python build_gbif_index.py backbone.zip
+    cd mediterranee && GBIF_INDEX=.cache/gbif_index.sqlite python enrich_med_gbif.py
+
+Comme l'API (match avec rank=SPECIES), un nom infraspécifique tel que
+« Salmo trutta fario » reçoit la clé de l'espèce « Salmo trutta » si elle
+figure dans l'archive ; celle de la sous-espèce seulement sinon.
+
+Usage :
+    python build_gbif_index.py ARCHIVE [--output .cache/gbif_index.sqlite]
+    python build_gbif_index.py offline/fixtures/gbif_checklist --check "Esox lucius"
+"""
+import argparse
+import os
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.gbif_index import DEFAULT_INDEX_FILE, GbifIndex, build_index
+from common.metrics import instrument
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('archive', help="archive DwC-A (.zip ou dossier décompressé)")
+    parser.add_argument('--output', default=DEFAULT_INDEX_FILE, help="index SQLite à écrire")
+    parser.add_argument('--check', nargs='+', metavar='NOM', help="noms scientifiques à chercher dans l'index construit")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        print(f"Erreur : L'archive '{args.archive}' n'a pas été trouvée.")
+        sys.exit(1)
+
+    print(f"Lecture de {args.archive}...")
+    start = time.perf_counter()
+    counts = build_index(args.archive, args.output)
+    elapsed = time.perf_counter() - start
+    for table, count in counts.items():
+        print(f"  - {table} : {count} lignes")
+    print(f"-> Index écrit dans {args.output} ({os.path.getsize(args.output) / 1024:.0f} Ko) en {elapsed:.2f} s.")
+
+    if args.check:
+        index = GbifIndex(args.output)
+        try:
+            for name, info in index.fetch(args.check, with_habitats=True).items():
+                print(f"  {name} : {info}")
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    with instrument("build_gbif_index"):
+        main()
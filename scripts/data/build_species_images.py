@@ -0,0 +1,123 @@
+"""
+Remplace les images Wikimedia liées en direct par des variantes WebP
+pré-dimensionnées (voir common/images.py).
+
+Les URL `photo_url` / `icon_url` des CSV finaux sont téléchargées en
+parallèle, dédupliquées par contenu et converties dans `images/icon/` et
+`images/card/`. Les CSV sont ensuite réécrits sur place : `icon_url` pointe
+vers la variante icon (128 px) et `photo_url` vers la variante card
+(480 px), sous `--base-url`, à l'endroit où le dossier `images/` est publié
+(par exemple un bucket public Supabase Storage). Une image qui n'a pas pu
+être récupérée garde son URL d'origine.
+
+À lancer après l'enrichissement des régions et avant load_species_registry.py.
+Nécessite Pillow (pip install pillow).
+
+Usage :
+    python build_species_images.py --base-url https://<projet>.supabase.co/storage/v1/object/public/species-images
+    python build_species_images.py mediterranee/poissons_mediterranee_deduplicate_enrichi.csv
+(l'URL publique peut aussi venir de SPECIES_IMAGES_BASE_URL)
+
+Pour tester hors ligne : python -m offline.stub_images, ou
+benchmarks/bench_images.py qui l'utilise.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.csv_stream import AtomicCsvWriter
+from common.fetcher import PageFetcher
+from common.metrics import instrument
+from common.scraping import HEADERS
+from load_species_registry import DEFAULT_INPUTS
+
+# Téléchargements simultanés et requêtes par seconde
+IMAGE_WORKERS = 8
+IMAGE_RATE_LIMIT = 20
+
+
+def source_url(row, base_url):
+    """Image d'origine de la ligne, ou None si elle est absente ou déjà publiée."""
+    url = (row.get('photo_url') or row.get('icon_url') or '').strip()
+    if not url or url.startswith(base_url):
+        return None
+    return url
+
+
+def read_source_urls(path, base_url):
+    with open(path, 'r', encoding='utf-8') as infile:
+        return [url for url in (source_url(row, base_url) for row in csv.DictReader(infile)) if url]
+
+
+def rewrite_csv(path, store, digests, base_url):
+    """Réécrit les URL d'image du CSV ; renvoie le nombre de lignes modifiées."""
+    updated = 0
+    with open(path, 'r', encoding='utf-8') as infile:
+        reader = csv.DictReader(infile)
+        with AtomicCsvWriter(path, reader.fieldnames) as writer:
+            for row in reader:
+                digest = digests.get(source_url(row, base_url))
+                if digest:
+                    urls = store.public_urls(base_url, digest)
+                    row['icon_url'] = urls['icon']
+                    row['photo_url'] = urls['card']
+                    updated += 1
+                writer.writerow(row)
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', default=DEFAULT_INPUTS, help="CSV à traiter (relatifs à scripts/data)")
+    parser.add_argument('--base-url', default=os.environ.get('SPECIES_IMAGES_BASE_URL'),
+                        help="URL publique du dossier d'images")
+    parser.add_argument('--image-dir', help="dossier des variantes (par défaut : scripts/data/images)")
+    parser.add_argument('--workers', type=int, default=IMAGE_WORKERS)
+    parser.add_argument('--rate-limit', type=float, default=IMAGE_RATE_LIMIT, help="requêtes par seconde")
+    args = parser.parse_args()
+
+    if not args.base_url:
+        parser.error("indiquez --base-url ou la variable SPECIES_IMAGES_BASE_URL")
+    try:
+        from common.images import IMAGE_DIR, ImageStore
+    except ImportError:
+        print("Erreur : Pillow n'est pas installé (pip install pillow).")
+        sys.exit(1)
+
+    paths = [os.path.join(DATA_DIR, path) for path in args.inputs]
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Erreur : Le fichier '{path}' n'a pas été trouvé.")
+            sys.exit(1)
+
+    urls = [url for path in paths for url in read_source_urls(path, args.base_url)]
+    distinct = len(set(urls))
+    print(f"{len(urls)} images référencées, {distinct} URL distinctes.")
+
+    fetcher = PageFetcher(HEADERS, workers=args.workers, rate_limit=args.rate_limit)
+    start = time.perf_counter()
+    try:
+        with ImageStore(args.image_dir or IMAGE_DIR, fetcher) as store:
+            digests = store.ingest_all(urls)
+            for path in paths:
+                updated = rewrite_csv(path, store, digests, args.base_url)
+                print(f"-> {os.path.relpath(path, DATA_DIR)} : {updated} lignes mises à jour.")
+    finally:
+        fetcher.close()
+    elapsed = time.perf_counter() - start
+
+    unique = len({digest for digest in digests.values() if digest})
+    print(f"\n-> {distinct - store.failures} images récupérées ({store.downloads} téléchargements, "
+          f"{store.downloaded_bytes / 1024:.0f} Ko) en {elapsed:.2f} s, {store.failures} en échec.")
+    print(f"-> {unique} images distinctes par contenu, {store.rendered} converties "
+          f"({store.written_bytes / 1024:.0f} Ko de WebP).")
+
+
+if __name__ == "__main__":
+    with instrument("build_species_images"):
+        main()
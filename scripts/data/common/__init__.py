@@ -0,0 +1 @@
+"""Modules partagés par les scripts de collecte et d'enrichissement des données."""
@@ -0,0 +1,111 @@
+"""
+Cache persistant (SQLite) des réponses JSON des API externes.
+
+Les entrées sont indexées par endpoint + paramètres, expirent après une durée
+de vie (TTL) et les plus anciennement utilisées sont supprimées quand le cache
+dépasse sa taille maximale.
+"""
+import json
+import os
+import sqlite3
+import time
+
+from .metrics import record_cache
+
+# Emplacement par défaut : scripts/data/.cache/
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache')
+
+# Réponses de l'API GBIF (common.gbif), relues aussi hors ligne par common.known_species
+GBIF_CACHE_FILE = os.path.join(CACHE_DIR, "gbif_responses.sqlite")
+
+DEFAULT_TTL = 30 * 24 * 3600           # 30 jours
+DEFAULT_NEGATIVE_TTL = 7 * 24 * 3600   # 7 jours pour les réponses "non trouvé"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 Mo
+
+# Nombre d'écritures entre deux vérifications de la taille du cache
+EVICTION_CHECK_INTERVAL = 500
+
+
+def make_key(endpoint, params=None):
+    """Construit une clé stable à partir de l'endpoint et des paramètres."""
+    if not params:
+        return endpoint
+    return endpoint + "?" + json.dumps(params, sort_keys=True, separators=(',', ':'))
+
+
+class ResponseCache:
+    """Cache clé/valeur JSON avec TTL, cache négatif et éviction par taille."""
+
+    def __init__(self, path, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+
+    def get(self, endpoint, params=None):
+        """Renvoie la réponse en cache, ou None si absente ou expirée."""
+        key = make_key(endpoint, params)
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at >= ?", (key, now)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            record_cache(self.name, False)
+            return None
+        self.hits += 1
+        record_cache(self.name, True)
+        self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, endpoint, params, value, negative=False):
+        """Enregistre une réponse ; `negative` applique la durée de vie courte."""
+        key = make_key(endpoint, params)
+        now = time.time()
+        text = json.dumps(value, separators=(',', ':'))
+        ttl = self.negative_ttl if negative else self.ttl
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+            (key, text, now + ttl, now, len(key) + len(text)),
+        )
+        self.writes += 1
+        if self.writes % EVICTION_CHECK_INTERVAL == 0:
+            self.evict()
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de `max_bytes`."""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # On redescend à 90 % de la limite pour ne pas évincer à chaque écriture
+        to_free = total - int(self.max_bytes * 0.9)
+        stale_keys = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            stale_keys.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+    def close(self):
+        self.evict()
+        self.conn.close()
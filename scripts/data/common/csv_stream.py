@@ -0,0 +1,78 @@
+"""
+Outils de lecture / écriture CSV ligne à ligne pour les étapes du pipeline.
+
+Les étapes lisent, transforment et écrivent une ligne à la fois : la mémoire
+utilisée ne dépend pas de la taille du fichier. Les sorties sont écrites dans
+un fichier temporaire renommé à la fin, ce qui permet aussi de réécrire un
+fichier qui sert d'entrée.
+"""
+import csv
+import os
+from itertools import islice
+
+
+def chunked(iterable, size):
+    """Découpe un itérable en listes de `size` éléments au plus."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class AtomicWriter:
+    """
+    Fichier texte (ou binaire avec `binary=True`) écrit dans `<chemin>.tmp`
+    puis renommé à la sortie du bloc `with`. En cas d'exception (ou si
+    `discard()` est appelé), le fichier de destination n'est pas modifié.
+    """
+
+    def __init__(self, path, binary=False):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.binary = binary
+        self.file = None
+        self.discarded = False
+
+    def __enter__(self):
+        if self.binary:
+            self.file = open(self.tmp_path, 'wb')
+        else:
+            self.file = open(self.tmp_path, 'w', newline='', encoding='utf-8')
+        return self
+
+    def write(self, text):
+        self.file.write(text)
+
+    def discard(self):
+        self.discarded = True
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.file.close()
+        if exc_type is None and not self.discarded:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+        return False
+
+
+class AtomicCsvWriter(AtomicWriter):
+    """`csv.DictWriter` sur un AtomicWriter ; `count` donne le nombre de lignes écrites."""
+
+    def __init__(self, path, fieldnames, **writer_options):
+        super().__init__(path)
+        self.fieldnames = fieldnames
+        self.writer_options = writer_options
+        self.writer = None
+        self.count = 0
+
+    def __enter__(self):
+        super().__enter__()
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, **self.writer_options)
+        self.writer.writeheader()
+        return self
+
+    def writerow(self, row):
+        self.writer.writerow(row)
+        self.count += 1
@@ -0,0 +1,91 @@
+"""
+Récupération concurrente des pages de détail Wikipedia pour les scrapers.
+
+Une session `requests` unique garde les connexions ouvertes (keep-alive), un
+pool de threads traite plusieurs pages à la fois et un limiteur adaptatif par
+hôte (common.ratelimit), partagé avec les autres processus, espace les
+requêtes pour rester poli envers le serveur : une réponse 429 / 503 ralentit
+l'hôte et la requête est retentée après le délai `Retry-After`. Les en-têtes
+ETag / Last-Modified reçus sont conservés pour envoyer des requêtes
+conditionnelles.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+
+from .metrics import observed_get
+from .ratelimit import MAX_RETRIES, RATE_LIMIT_FILE, THROTTLE_STATUSES, AdaptiveRateLimiter, parse_retry_after
+
+# Valeurs par défaut : threads simultanés et requêtes par seconde (débit de départ, par hôte)
+DEFAULT_WORKERS = 8
+DEFAULT_RATE_LIMIT = 10
+
+REQUEST_TIMEOUT = 10
+
+
+class PageFetcher:
+    """Session HTTP partagée, limitée en débit, utilisable depuis plusieurs threads."""
+
+    def __init__(self, headers=None, workers=DEFAULT_WORKERS, rate_limit=DEFAULT_RATE_LIMIT, timeout=REQUEST_TIMEOUT,
+                 rate_limit_file=RATE_LIMIT_FILE):
+        self.workers = workers
+        self.timeout = timeout
+        # rate_limit=0 : aucune limite (serveurs locaux, benchmarks)
+        self.limiter = AdaptiveRateLimiter(rate_limit, rate_limit_file) if rate_limit else None
+        # {url: (etag, last_modified)} des réponses déjà reçues
+        self.validators = {}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url, **kwargs):
+        """
+        GET limité en débit ; lève `requests.RequestException` comme `requests.get`.
+        Pour une page (sans `params`) dont les validateurs sont connus, la
+        requête est conditionnelle et peut renvoyer 304 (page inchangée).
+        Une réponse 429 / 503 est retentée jusqu'à MAX_RETRIES fois.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        is_page = 'params' not in kwargs
+        etag, last_modified = self.validators.get(url, (None, None)) if is_page else (None, None)
+        if etag or last_modified:
+            headers = dict(kwargs.pop('headers', None) or {})
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+            kwargs['headers'] = headers
+        response = self._get(url, **kwargs)
+        if is_page and response.status_code == 200 and ('ETag' in response.headers or 'Last-Modified' in response.headers):
+            self.validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response
+
+    def _get(self, url, **kwargs):
+        if self.limiter is None:
+            return observed_get(self.session.get, url, **kwargs)
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.wait(url)
+            response = observed_get(self.session.get, url, **kwargs)
+            self.limiter.report(url, response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+            if response.status_code not in THROTTLE_STATUSES or attempt == MAX_RETRIES:
+                return response
+            response.close()
+
+    def map(self, func, items, desc="Progression"):
+        """
+        Applique `func` à chaque élément dans le pool de threads et renvoie
+        les résultats dans l'ordre d'origine.
+        """
+        items = list(items)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(tqdm(executor.map(func, items), total=len(items), desc=desc))
+
+    def close(self):
+        self.session.close()
+        if self.limiter is not None:
+            self.limiter.close()
@@ -0,0 +1,314 @@
+"""
+Moteur d'enrichissement GBIF asynchrone partagé par les scripts `enrich_*`.
+
+Plusieurs espèces sont interrogées en parallèle (nombre borné) sur une session
+HTTP unique (connexions réutilisées), tout en respectant le débit adaptatif
+de common.ratelimit, partagé avec les autres processus (ralenti sur 429 / 503
+et `Retry-After`, accéléré tant que GBIF répond normalement). Les réponses
+sont conservées dans un cache SQLite : une relance ne réinterroge pas GBIF
+pour les espèces déjà connues.
+
+Avec GBIF_INDEX (chemin d'un index construit par build_gbif_index.py à
+partir d'une archive Darwin Core téléchargée, absolu ou relatif à
+scripts/data), les réponses sont lues dans cet index local
+(common.gbif_index) : ni réseau, ni limite de débit.
+
+Les listes paginées (distributions, noms vernaculaires) sont lues en entier,
+par pages de PAGE_LIMIT : quand la première page annonce le total (`count`),
+les pages restantes sont demandées en parallèle ; sinon elles sont suivies
+une à une jusqu'à `endOfRecords`.
+"""
+import asyncio
+import os
+import time
+
+import aiohttp
+from tqdm import tqdm
+
+from .cache import GBIF_CACHE_FILE, ResponseCache
+from .gbif_index import UNKNOWN_LANGUAGE, GbifIndex
+from .metrics import record_request, stage
+from .ratelimit import MAX_RETRIES, RATE_LIMIT_FILE, THROTTLE_STATUSES, AdaptiveRateLimiter, parse_retry_after
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# URL de l'API GBIF (surchargeable pour les tests hors ligne, voir offline/stub_gbif.py)
+GBIF_API_URL = os.environ.get('GBIF_API_URL', "https://api.gbif.org/v1")
+
+# Valeurs par défaut : espèces traitées en parallèle et requêtes par seconde (débit de départ)
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE_LIMIT = 10
+
+REQUEST_TIMEOUT = 10
+
+# Taille de page maximale acceptée par l'API pour les listes paginées
+PAGE_LIMIT = 1000
+DEFAULT_CACHE_FILE = GBIF_CACHE_FILE
+
+# Index local construit depuis une archive Darwin Core : remplace l'API s'il est défini.
+# Un chemin relatif part de scripts/data, quel que soit le dossier du script lancé
+GBIF_INDEX_FILE = os.environ.get('GBIF_INDEX') and os.path.join(DATA_DIR, os.environ['GBIF_INDEX'])
+
+
+class GbifClient:
+    """
+    Accès aux endpoints GBIF utilisés par l'enrichissement. `failures`
+    compte les requêtes en erreur (réseau, délai, statut HTTP, 429 / 503
+    après MAX_RETRIES) : elles renvoient None comme une réponse vide.
+    """
+
+    def __init__(self, session, limiter=None, base_url=GBIF_API_URL, cache=None):
+        self.session = session
+        self.limiter = limiter
+        self.base_url = base_url
+        self.cache = cache
+        self.failures = 0
+
+    async def get_json(self, path, params=None):
+        """Renvoie la réponse JSON de `path` (depuis le cache si possible), ou None en cas d'erreur."""
+        if self.cache:
+            cached = self.cache.get(path, params)
+            if cached is not None:
+                return cached
+
+        url = f"{self.base_url}{path}"
+        for attempt in range(MAX_RETRIES + 1):
+            if self.limiter:
+                await self.limiter.wait_async(url)
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url, params=params) as response:
+                    status = response.status
+                    if self.limiter:
+                        await self.limiter.report_async(url, status,
+                                                        parse_retry_after(response.headers.get('Retry-After')))
+                    if status == 200:
+                        data = await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                # Espèce laissée sans données, mais l'erreur reste comptée par type
+                record_request(url, time.perf_counter() - start, error=type(e).__name__)
+                self.failures += 1
+                return None
+            record_request(url, time.perf_counter() - start, status=status)
+            if status == 200:
+                break
+            if status not in THROTTLE_STATUSES or not self.limiter or attempt == MAX_RETRIES:
+                self.failures += 1
+                return None
+
+        # Les erreurs ne sont pas mises en cache, les "non trouvé" le sont avec un TTL court
+        if self.cache and data is not None:
+            negative = path == "/species/match" and not data.get('usageKey')
+            self.cache.set(path, params, data, negative=negative)
+        return data
+
+    async def match(self, scientific_name):
+        """
+        Renvoie (clé du nom trouvé, clé de l'espèce acceptée), ou (None, None) ;
+        les deux clés sont égales sauf pour un synonyme (acceptedUsageKey).
+        """
+        match_data = await self.get_json("/species/match", {'name': scientific_name, 'rank': 'SPECIES'})
+        key = match_data.get('usageKey') if match_data else None
+        if not key:
+            return None, None
+        return key, match_data.get('acceptedUsageKey') or key
+
+    async def habitats(self, species_key):
+        species_data = await self.get_json(f"/species/{species_key}")
+        if not species_data or not species_data.get('habitats'):
+            return []
+        return [h.lower() for h in species_data['habitats']]
+
+    async def get_all_pages(self, path):
+        """Résultats de toutes les pages d'une liste paginée (les pages en erreur sont ignorées)."""
+        first = await self.get_json(path, {'offset': 0, 'limit': PAGE_LIMIT})
+        if not first:
+            return []
+        results = list(first.get('results', []))
+        if first.get('endOfRecords', True):
+            return results
+        limit = first.get('limit') or PAGE_LIMIT
+        if first.get('count') is not None:
+            pages = await asyncio.gather(*(self.get_json(path, {'offset': offset, 'limit': limit})
+                                           for offset in range(limit, first['count'], limit)))
+            for page in pages:
+                results.extend(page.get('results', []) if page else [])
+            return results
+        offset = limit
+        while True:
+            page = await self.get_json(path, {'offset': offset, 'limit': limit})
+            if not page:
+                return results
+            results.extend(page.get('results', []))
+            if page.get('endOfRecords', True):
+                return results
+            offset += limit
+
+    async def vernacular_names(self, species_key):
+        """Noms vernaculaires par langue (codes ISO 639-2 de GBIF), sans doublon : {'fra': [...], 'eng': [...]}."""
+        names = {}
+        for name_info in await self.get_all_pages(f"/species/{species_key}/vernacularNames"):
+            name = (name_info.get('vernacularName') or '').strip()
+            if not name:
+                continue
+            language_names = names.setdefault(name_info.get('language') or UNKNOWN_LANGUAGE, [])
+            if name not in language_names:
+                language_names.append(name)
+        return names
+
+    async def countries(self, species_key):
+        distributions = await self.get_all_pages(f"/species/{species_key}/distributions")
+        return sorted({dist['countryCode'] for dist in distributions if dist.get('countryCode')})
+
+    async def species_info(self, scientific_name, with_habitats=False):
+        """
+        Renvoie un dictionnaire {gbif_id, name_en, common_names, countries,
+        habitats} pour une espèce ; `common_names` regroupe les noms
+        vernaculaires de toutes les langues et `name_en` est le premier nom
+        anglais. gbif_id est la clé du nom trouvé ; pour un synonyme, les
+        noms, pays et habitats sont ceux de l'espèce acceptée, comme avec
+        l'index local. Les appels suivant le match sont lancés en parallèle.
+        """
+        info = {'gbif_id': None, 'name_en': None, 'common_names': {}, 'countries': [], 'habitats': []}
+        key, species_key = await self.match(scientific_name)
+        if not key:
+            return info
+        info['gbif_id'] = key
+
+        calls = [self.vernacular_names(species_key), self.countries(species_key)]
+        if with_habitats:
+            calls.append(self.habitats(species_key))
+        results = await asyncio.gather(*calls)
+        info['common_names'], info['countries'] = results[0], results[1]
+        info['name_en'] = (info['common_names'].get('eng') or [None])[0]
+        if with_habitats:
+            info['habitats'] = results[2]
+        return info
+
+
+class GbifSession:
+    """
+    Session GBIF réutilisable sur plusieurs lots de noms : la boucle asyncio,
+    les connexions HTTP et le cache restent ouverts entre les appels.
+
+        with GbifSession(with_habitats=True) as gbif:
+            for chunk in chunks:
+                results = gbif.fetch(names_of(chunk))
+
+    Avec un `journal` (common.journal.ResultJournal), chaque résultat y est
+    ajouté dès qu'il arrive et les noms déjà journalisés ne sont pas
+    réinterrogés : un enrichissement interrompu reprend là où il s'est arrêté.
+    Seules les réponses complètes sont journalisées : une espèce dont une
+    requête a échoué sera réinterrogée à la reprise.
+
+    Avec un `index_file` (GBIF_INDEX par défaut), les réponses viennent de
+    l'index local (common.gbif_index.GbifIndex) et l'API n'est pas appelée.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate_limit=DEFAULT_RATE_LIMIT, with_habitats=False,
+                 base_url=GBIF_API_URL, cache_file=DEFAULT_CACHE_FILE, progress=True, journal=None,
+                 rate_limit_file=RATE_LIMIT_FILE, index_file=GBIF_INDEX_FILE):
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.rate_limit_file = rate_limit_file
+        self.with_habitats = with_habitats
+        self.base_url = base_url
+        self.cache_file = cache_file
+        self.progress = progress
+        self.journal = journal
+        self.index_file = index_file
+        self.index = None
+        self.tasks = []
+        self.loop = None
+        self.session = None
+        self.semaphore = None
+        self.cache = None
+        self.limiter = None
+
+    def __enter__(self):
+        if self.index_file:
+            self.index = GbifIndex(self.index_file)
+            return self
+        self.loop = asyncio.new_event_loop()
+        self.cache = ResponseCache(self.cache_file) if self.cache_file else None
+        # rate_limit=0 : aucune limite (serveur local, benchmarks)
+        self.limiter = AdaptiveRateLimiter(self.rate_limit, self.rate_limit_file) if self.rate_limit else None
+        self.loop.run_until_complete(self._open())
+        return self
+
+    async def _open(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency * 3)
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def _fetch_all(self, names):
+        results = {}
+
+        async def worker(name):
+            # Un client par espèce : ses requêtes en erreur ne concernent que cette espèce
+            client = GbifClient(self.session, self.limiter, self.base_url, self.cache)
+            async with self.semaphore:
+                results[name] = await client.species_info(name, self.with_habitats)
+            # Erreur de transport : résultat vide ou partiel, non journalisé pour être redemandé à la reprise
+            if self.journal is not None and not client.failures:
+                self.journal.append(name, results[name])
+
+        self.tasks = [asyncio.ensure_future(worker(name)) for name in names]
+        completed = asyncio.as_completed(self.tasks)
+        if self.progress:
+            completed = tqdm(completed, total=len(self.tasks), desc="Progression")
+        for task in completed:
+            await task
+        return results
+
+    def fetch(self, scientific_names):
+        """Renvoie {nom: {gbif_id, name_en, common_names, countries, habitats}} pour chaque nom distinct."""
+        names = list(dict.fromkeys(n for n in scientific_names if n))
+        journal = self.journal if self.journal is not None else {}
+        missing = [name for name in names if name not in journal]
+        results = {}
+        if missing:
+            with stage('gbif'):
+                if self.index is not None:
+                    results = self.index.fetch(missing, self.with_habitats)
+                    if self.journal is not None:
+                        for name in missing:
+                            self.journal.append(name, results[name])
+                else:
+                    results = self.loop.run_until_complete(self._fetch_all(missing))
+        results.update((name, journal[name]) for name in names if name in journal)
+        return results
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.index is not None:
+            self.index.close()
+            return False
+        # Après une interruption (Ctrl-C), des requêtes peuvent rester en cours
+        tasks = set(self.tasks) | asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.run_until_complete(self.session.close())
+        self.loop.close()
+        if self.limiter:
+            self.limiter.close()
+        if self.cache:
+            print(f"Cache GBIF : {self.cache.hits} réponses réutilisées, {self.cache.misses} requêtes envoyées.")
+            self.cache.close()
+        return False
+
+
+def fetch_species_info(scientific_names, concurrency=DEFAULT_CONCURRENCY, rate_limit=DEFAULT_RATE_LIMIT,
+                       with_habitats=False, base_url=GBIF_API_URL, cache_file=DEFAULT_CACHE_FILE):
+    """
+    Interroge GBIF pour chaque nom scientifique distinct et renvoie un
+    dictionnaire {nom: {gbif_id, name_en, common_names, countries, habitats}}.
+    `cache_file=None` désactive le cache disque.
+    """
+    names = list(dict.fromkeys(n for n in scientific_names if n))
+    if not names:
+        return {}
+    with GbifSession(concurrency, rate_limit, with_habitats, base_url, cache_file) as gbif:
+        return gbif.fetch(names)
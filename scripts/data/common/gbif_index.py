@@ -0,0 +1,342 @@
+"""
+Index GBIF local construit à partir d'une archive Darwin Core (DwC-A).
+
+Une liste d'espèces GBIF (le Backbone Taxonomy ou un checklist exporté, en
+.zip ou décompressé dans un dossier) est lue une seule fois, en flux, et
+rangée dans une base SQLite indexée :
+  - taxa : clé, nom canonique normalisé (common.known_species), rang,
+    statut et clé de l'espèce acceptée ;
+  - vernacular_names, distributions, habitats : extensions VernacularName,
+    Distribution et SpeciesProfile, par clé.
+
+`GbifIndex.species_info` répond ensuite comme `GbifClient.species_info`
+(mêmes champs) sans réseau : GbifSession l'utilise dès que GBIF_INDEX
+désigne un index (voir build_gbif_index.py ; un chemin relatif part de
+scripts/data, les scripts étant lancés depuis le dossier de leur région).
+
+Les fichiers de l'archive sont décrits par meta.xml : séparateurs, lignes
+d'en-tête et position de chaque terme Darwin Core. Les termes sont repérés
+par leur nom court (`scientificName`, `countryCode`...) quel que soit leur
+espace de noms.
+"""
+import codecs
+import csv
+import io
+import os
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+import zipfile
+
+from .cache import CACHE_DIR
+from .csv_stream import chunked
+from .known_species import normalize_scientific_name
+
+DEFAULT_INDEX_FILE = os.path.join(CACHE_DIR, "gbif_index.sqlite")
+
+# Lignes insérées par transaction pendant la construction
+INSERT_BATCH = 10_000
+
+# Rangs indexés : les rangs supérieurs ne répondent jamais à un match d'espèce
+INDEXED_RANKS = {'species', 'subspecies', 'variety', 'form'}
+# Ordre de préférence des statuts lorsqu'un nom correspond à plusieurs taxons
+STATUS_ORDER = ['accepted', 'doubtful', 'homotypic synonym', 'heterotypic synonym', 'proparte synonym', 'synonym']
+
+# Les archives donnent souvent les langues en ISO 639-1 ; l'API GBIF renvoie de l'ISO 639-2
+LANGUAGE_CODES = {
+    'fr': 'fra', 'en': 'eng', 'de': 'deu', 'es': 'spa', 'it': 'ita', 'pt': 'por', 'nl': 'nld',
+    'da': 'dan', 'sv': 'swe', 'no': 'nor', 'nb': 'nob', 'fi': 'fin', 'pl': 'pol', 'cs': 'ces',
+    'hu': 'hun', 'ro': 'ron', 'el': 'ell', 'tr': 'tur', 'ru': 'rus', 'ja': 'jpn', 'zh': 'zho',
+    'ca': 'cat', 'eu': 'eus', 'br': 'bre', 'oc': 'oci', 'hr': 'hrv', 'sl': 'slv', 'ar': 'ara',
+}
+UNKNOWN_LANGUAGE = 'und'
+
+# Champs booléens de l'extension SpeciesProfile -> habitats de l'API (/species/{clé})
+PROFILE_HABITATS = {'isMarine': 'marine', 'isFreshwater': 'freshwater', 'isTerrestrial': 'terrestrial'}
+
+TAXON_ROW_TYPE = 'Taxon'
+VERNACULAR_ROW_TYPE = 'VernacularName'
+DISTRIBUTION_ROW_TYPE = 'Distribution'
+PROFILE_ROW_TYPE = 'SpeciesProfile'
+
+SCHEMA = """
+CREATE TABLE taxa (
+    key INTEGER PRIMARY KEY,
+    canonical_name TEXT NOT NULL,
+    rank TEXT,
+    status TEXT,
+    accepted_key INTEGER
+);
+CREATE TABLE vernacular_names (key INTEGER NOT NULL, name TEXT NOT NULL, language TEXT NOT NULL);
+CREATE TABLE distributions (key INTEGER NOT NULL, country TEXT NOT NULL);
+CREATE TABLE habitats (key INTEGER NOT NULL, habitat TEXT NOT NULL);
+CREATE TABLE metadata (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Index créés une fois les lignes insérées (plus rapide que de les maintenir ligne à ligne)
+INDEXES = """
+CREATE INDEX taxa_canonical_name ON taxa (canonical_name);
+CREATE INDEX vernacular_names_key ON vernacular_names (key);
+CREATE INDEX distributions_key ON distributions (key);
+CREATE INDEX habitats_key ON habitats (key);
+"""
+
+
+def local_name(term):
+    """'http://rs.tdwg.org/dwc/terms/scientificName' -> 'scientificName'."""
+    return term.rstrip('/').rsplit('/', 1)[-1].rsplit('#', 1)[-1]
+
+
+def unescape(value):
+    """Séparateurs de meta.xml, écrits avec échappements ('\\t', '\\n')."""
+    return codecs.decode(value, 'unicode_escape') if value else value
+
+
+def language_code(value):
+    value = (value or '').strip().lower()
+    if not value:
+        return UNKNOWN_LANGUAGE
+    return LANGUAGE_CODES.get(value, value)
+
+
+def parse_key(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ArchiveFile:
+    """Un fichier de données décrit par meta.xml (cœur ou extension)."""
+
+    def __init__(self, element, namespace):
+        self.row_type = local_name(element.get('rowType', ''))
+        self.encoding = element.get('encoding', 'UTF-8')
+        self.delimiter = unescape(element.get('fieldsTerminatedBy', ',')) or ','
+        self.quotechar = unescape(element.get('fieldsEnclosedBy', '"'))
+        self.header_lines = int(element.get('ignoreHeaderLines', '0'))
+        self.location = element.find(f'{namespace}files/{namespace}location').text.strip()
+        id_element = element.find(f'{namespace}id')
+        if id_element is None:
+            id_element = element.find(f'{namespace}coreid')
+        self.id_index = int(id_element.get('index')) if id_element is not None else None
+        self.fields = {local_name(field.get('term', '')): int(field.get('index'))
+                       for field in element.findall(f'{namespace}field') if field.get('index') is not None}
+
+    def rows(self, archive):
+        """Lignes du fichier sous forme de dictionnaires {terme: valeur} (+ 'id'), lues en flux."""
+        with archive.open(self.location) as raw:
+            text = io.TextIOWrapper(raw, encoding=self.encoding, newline='')
+            if self.quotechar:
+                reader = csv.reader(text, delimiter=self.delimiter, quotechar=self.quotechar)
+            else:
+                reader = csv.reader(text, delimiter=self.delimiter, quoting=csv.QUOTE_NONE)
+            for line_number, values in enumerate(reader):
+                if line_number < self.header_lines or not values:
+                    continue
+                row = {term: values[index] for term, index in self.fields.items() if index < len(values)}
+                if self.id_index is not None and self.id_index < len(values):
+                    row['id'] = values[self.id_index]
+                yield row
+
+
+class Archive:
+    """Archive DwC-A, en .zip ou décompressée dans un dossier."""
+
+    def __init__(self, path):
+        self.path = path
+        self.zip = None if os.path.isdir(path) else zipfile.ZipFile(path)
+        with self.open('meta.xml') as meta:
+            root = ElementTree.parse(meta).getroot()
+        namespace = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+        self.core = ArchiveFile(root.find(f'{namespace}core'), namespace)
+        self.extensions = {}
+        for element in root.findall(f'{namespace}extension'):
+            extension = ArchiveFile(element, namespace)
+            self.extensions[extension.row_type] = extension
+
+    def open(self, name):
+        if self.zip is None:
+            return open(os.path.join(self.path, name), 'rb')
+        # Certaines archives rangent leurs fichiers dans un dossier racine
+        names = self.zip.namelist()
+        if name not in names:
+            name = next((n for n in names if os.path.basename(n) == name), name)
+        return self.zip.open(name)
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+
+
+def taxon_rows(archive):
+    for row in archive.core.rows(archive):
+        key = parse_key(row.get('taxonID') or row.get('id'))
+        rank = (row.get('taxonRank') or '').strip().lower()
+        if key is None or rank not in INDEXED_RANKS:
+            continue
+        canonical_name = normalize_scientific_name(row.get('canonicalName') or row.get('scientificName'))
+        if not canonical_name:
+            continue
+        status = (row.get('taxonomicStatus') or '').strip().lower() or None
+        accepted_key = parse_key(row.get('acceptedNameUsageID')) or key
+        yield key, canonical_name, rank, status, accepted_key
+
+
+def vernacular_rows(extension, archive):
+    for row in extension.rows(archive):
+        key = parse_key(row.get('id'))
+        name = (row.get('vernacularName') or '').strip()
+        if key is not None and name:
+            yield key, name, language_code(row.get('language'))
+
+
+def distribution_rows(extension, archive):
+    for row in extension.rows(archive):
+        key = parse_key(row.get('id'))
+        country = (row.get('countryCode') or '').strip().upper()
+        # Sans countryCode, locationID porte parfois le code : « ISO:FR », « ISO3166:FR »
+        if not country and (row.get('locationID') or '').upper().startswith('ISO'):
+            country = row['locationID'].rsplit(':', 1)[-1].strip().upper()
+        if key is not None and len(country) == 2:
+            yield key, country
+
+
+def habitat_rows(extension, archive):
+    for row in extension.rows(archive):
+        key = parse_key(row.get('id'))
+        if key is None:
+            continue
+        for term, habitat in PROFILE_HABITATS.items():
+            if (row.get(term) or '').strip().lower() in ('true', '1', 't', 'yes'):
+                yield key, habitat
+
+
+def build_index(archive_path, index_file=DEFAULT_INDEX_FILE):
+    """
+    Construit l'index SQLite de l'archive (fichier temporaire remplacé à la
+    fin) ; renvoie {table: nombre de lignes}.
+    """
+    csv.field_size_limit(sys.maxsize)
+    directory = os.path.dirname(index_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = index_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    archive = Archive(archive_path)
+    conn = sqlite3.connect(tmp_file)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(SCHEMA)
+        sources = [('taxa', "INSERT OR REPLACE INTO taxa VALUES (?, ?, ?, ?, ?)", taxon_rows(archive))]
+        extensions = [
+            (VERNACULAR_ROW_TYPE, 'vernacular_names', "INSERT INTO vernacular_names VALUES (?, ?, ?)", vernacular_rows),
+            (DISTRIBUTION_ROW_TYPE, 'distributions', "INSERT INTO distributions VALUES (?, ?)", distribution_rows),
+            (PROFILE_ROW_TYPE, 'habitats', "INSERT INTO habitats VALUES (?, ?)", habitat_rows),
+        ]
+        for row_type, table, sql, rows in extensions:
+            if row_type in archive.extensions:
+                sources.append((table, sql, rows(archive.extensions[row_type], archive)))
+
+        counts = {}
+        for table, sql, rows in sources:
+            counts[table] = 0
+            for batch in chunked(rows, INSERT_BATCH):
+                with conn:
+                    conn.executemany(sql, batch)
+                counts[table] += len(batch)
+        conn.executescript(INDEXES)
+        with conn:
+            conn.executemany("INSERT INTO metadata VALUES (?, ?)", [
+                ('archive', os.path.abspath(archive_path)),
+                ('built_at', str(time.time())),
+            ])
+    finally:
+        conn.close()
+        archive.close()
+    os.replace(tmp_file, index_file)
+    return counts
+
+
+class GbifIndex:
+    """Réponses GBIF lues dans l'index local, au format de `GbifClient.species_info`."""
+
+    def __init__(self, index_file=DEFAULT_INDEX_FILE):
+        if not os.path.exists(index_file):
+            raise FileNotFoundError(f"index GBIF introuvable : {index_file} (voir build_gbif_index.py)")
+        self.conn = sqlite3.connect(f"file:{index_file}?mode=ro", uri=True)
+
+    def _candidates(self, canonical_name):
+        return self.conn.execute(
+            "SELECT key, rank, status, accepted_key FROM taxa WHERE canonical_name = ?", (canonical_name,)
+        ).fetchall()
+
+    def match(self, scientific_name):
+        """
+        (clé du taxon trouvé, clé de l'espèce acceptée), ou (None, None).
+        Comme l'API interrogée avec rank=SPECIES, un nom infraspécifique
+        (« Salmo trutta fario ») renvoie l'espèce (« Salmo trutta ») si elle
+        est dans l'index ; la sous-espèce seulement sinon.
+        """
+        canonical_name = normalize_scientific_name(scientific_name)
+        candidates = self._candidates(canonical_name)
+        words = canonical_name.split()
+        if len(words) > 2 and not any(rank == 'species' for _, rank, _, _ in candidates):
+            candidates = self._candidates(' '.join(words[:2])) or candidates
+        if not candidates:
+            return None, None
+
+        def preference(candidate):
+            key, rank, status, _ = candidate
+            status_rank = STATUS_ORDER.index(status) if status in STATUS_ORDER else len(STATUS_ORDER)
+            return rank != 'species', status_rank, key
+        key, _, _, accepted_key = min(candidates, key=preference)
+        return key, accepted_key
+
+    def vernacular_names(self, key):
+        names = {}
+        for name, language in self.conn.execute(
+                "SELECT name, language FROM vernacular_names WHERE key = ? ORDER BY rowid", (key,)):
+            language_names = names.setdefault(language, [])
+            if name not in language_names:
+                language_names.append(name)
+        return names
+
+    def countries(self, key):
+        return [country for country, in self.conn.execute(
+            "SELECT DISTINCT country FROM distributions WHERE key = ? ORDER BY country", (key,))]
+
+    def habitats(self, key):
+        return [habitat for habitat, in self.conn.execute(
+            "SELECT DISTINCT habitat FROM habitats WHERE key = ? ORDER BY habitat", (key,))]
+
+    def species_info(self, scientific_name, with_habitats=False):
+        """
+        Dictionnaire {gbif_id, name_en, common_names, countries, habitats},
+        comme GbifClient.species_info : gbif_id est la clé du nom trouvé ; pour
+        un synonyme, les noms, pays et habitats sont ceux de l'espèce acceptée
+        (acceptedUsageKey côté API).
+        """
+        info = {'gbif_id': None, 'name_en': None, 'common_names': {}, 'countries': [], 'habitats': []}
+        key, accepted_key = self.match(scientific_name)
+        if key is None:
+            return info
+        info['gbif_id'] = key
+        info['common_names'] = self.vernacular_names(accepted_key)
+        info['name_en'] = (info['common_names'].get('eng') or [None])[0]
+        info['countries'] = self.countries(accepted_key)
+        if with_habitats:
+            info['habitats'] = self.habitats(accepted_key)
+        return info
+
+    def fetch(self, scientific_names, with_habitats=False):
+        """{nom: species_info} pour chaque nom distinct."""
+        names = dict.fromkeys(n for n in scientific_names if n)
+        return {name: self.species_info(name, with_habitats) for name in names}
+
+    def close(self):
+        self.conn.close()
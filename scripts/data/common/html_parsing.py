@@ -0,0 +1,115 @@
+"""
+Analyse ciblée des pages Wikipedia.
+
+Les pages de liste ne sont analysées que pour leurs tableaux `wikitable` (et
+les titres h4 de familles) grâce à un `SoupStrainer` ; les pages de détail
+sont lues avec lxml et des requêtes XPath qui ne renvoient que le premier
+paragraphe et l'infobox, sans construire d'arbre BeautifulSoup.
+"""
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# Analyseur utilisé par BeautifulSoup : lxml (C) si disponible
+SOUP_PARSER = 'lxml' if HAS_LXML else 'html.parser'
+
+# Classe "wikitable" parmi d'autres (ex. "wikitable sortable")
+WIKITABLE_CLASS_RE = re.compile(r'(^|\s)wikitable(\s|$)')
+
+PARSER_OUTPUT_XPATH = "(//div[contains(concat(' ', normalize-space(@class), ' '), ' mw-parser-output ')])[1]"
+INFOBOX_XPATH = (
+    "(//table[contains(concat(' ', normalize-space(@class), ' '), ' infobox_v2 ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' infobox-biologie ')])[1]"
+)
+
+
+def parse_list_tables(content, with_headers=False):
+    """
+    Analyse une page de liste en ne gardant que les tableaux `wikitable`
+    (ou les titres h4 et tous les tableaux si `with_headers`).
+    Renvoie un objet BeautifulSoup.
+    """
+    if with_headers:
+        strainer = SoupStrainer(['h4', 'table'])
+    else:
+        strainer = SoupStrainer('table', class_=WIKITABLE_CLASS_RE)
+    return BeautifulSoup(content, SOUP_PARSER, parse_only=strainer)
+
+
+def _first_paragraph_lxml(content, skip_empty):
+    # Wikipedia sert toujours de l'UTF-8 ; sans le préciser, lxml suppose du latin-1
+    tree = lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding='utf-8'))
+    parser_output = tree.xpath(PARSER_OUTPUT_XPATH)
+    if not parser_output:
+        return None, tree
+    for paragraph in parser_output[0].xpath('./p'):
+        text = paragraph.text_content()
+        if text.strip() or not skip_empty:
+            return text, tree
+    return "", tree
+
+
+def _infobox_lxml(tree):
+    infobox = tree.xpath(INFOBOX_XPATH)
+    if not infobox:
+        return None
+    infobox = infobox[0]
+    images = infobox.xpath('.//img[@src]')
+    rows = []
+    for row in infobox.xpath('.//tr'):
+        header = row.xpath('(.//th)[1]')
+        value = row.xpath('(.//td)[1]')
+        if header and value:
+            rows.append((header[0].text_content().strip(), value[0].text_content()))
+    return {'image_src': images[0].get('src') if images else None, 'rows': rows}
+
+
+def _parse_detail_soup(content, skip_empty, with_infobox):
+    soup = BeautifulSoup(content, 'html.parser')
+    description = None
+    parser_output = soup.find('div', class_='mw-parser-output')
+    if parser_output:
+        description = ""
+        first_p = parser_output.find('p', recursive=False)
+        while skip_empty and first_p and not first_p.get_text(strip=True):
+            first_p = first_p.find_next_sibling('p')
+        if first_p:
+            description = first_p.get_text()
+
+    infobox = None
+    table = soup.select_one('table.infobox_v2.infobox-biologie') if with_infobox else None
+    if table:
+        image_tag = table.find('img')
+        rows = []
+        for row in table.find_all('tr'):
+            header = row.find('th')
+            value = row.find('td')
+            if header and value:
+                rows.append((header.get_text(strip=True), value.get_text()))
+        infobox = {'image_src': image_tag.get('src') if image_tag else None, 'rows': rows}
+    return description, infobox
+
+
+def parse_detail_page(content, skip_empty=True, with_infobox=True):
+    """
+    Renvoie (texte brut du premier paragraphe, infobox) d'une page de détail.
+
+    Le paragraphe est le premier <p> enfant direct de `mw-parser-output`
+    (le premier non vide si `skip_empty`) ; None si ce bloc est absent.
+    L'infobox vaut None ou {'image_src': ..., 'rows': [(en-tête, valeur), ...]}.
+    """
+    if not content:
+        return None, None
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    if not HAS_LXML:
+        return _parse_detail_soup(content, skip_empty, with_infobox)
+    description, tree = _first_paragraph_lxml(content, skip_empty)
+    infobox = _infobox_lxml(tree) if with_infobox else None
+    return description, infobox
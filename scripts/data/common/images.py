@@ -0,0 +1,207 @@
+"""
+Images des espèces : téléchargement concurrent, déduplication par contenu et
+variantes pré-dimensionnées en WebP.
+
+Chaque URL source est téléchargée une fois (pool de threads de
+`common.fetcher`), identifiée par le hachage SHA-256 de son contenu, puis
+réduite en deux variantes :
+  - `icon` (128 px) pour les listes et le sélecteur d'espèces ;
+  - `card` (480 px) pour les cartes `FishCard` et les fiches.
+Les fichiers sont rangés sous `<dossier>/<variante>/<hachage>.webp` : une
+image partagée par plusieurs espèces (ou servie sous plusieurs URL) n'est
+convertie et stockée qu'une fois. Le manifeste `manifest.json` garde
+{URL source: hachage} pour ne rien retélécharger au passage suivant.
+
+Les miniatures Wikimedia des scrapers (120 px) sont demandées en
+`WIKIMEDIA_SOURCE_WIDTH` px pour que la variante `card` reste nette ; si
+cette taille n'existe pas, l'URL d'origine est utilisée. Une image n'est
+jamais agrandie.
+
+    with ImageStore(fetcher=PageFetcher(HEADERS)) as store:
+        digests = store.ingest_all(urls)
+        urls = store.public_urls(base_url, digests[url])
+
+Nécessite Pillow (dépendance optionnelle : pip install pillow).
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+
+import requests
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .csv_stream import AtomicWriter
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_DIR = os.path.join(DATA_DIR, "images")
+MANIFEST_NAME = "manifest.json"
+
+# Variantes produites : côté maximal en pixels (proportions conservées)
+VARIANTS = {'icon': 128, 'card': 480}
+WEBP_QUALITY = 80
+# Effort d'encodage (0-6) : 6 ne gagne que ~3 % de taille pour 60 % de temps en plus
+WEBP_METHOD = 4
+
+# Largeur demandée aux miniatures Wikimedia (une des tailles standard du serveur)
+WIKIMEDIA_SOURCE_WIDTH = 500
+WIKIMEDIA_THUMB_RE = re.compile(r'^(https?://upload\.wikimedia\.org/.+/thumb/.+/)\d+px-([^/]+)$')
+
+# Préfixe de nom de fichier tiré du hachage (128 bits)
+DIGEST_LENGTH = 32
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()[:DIGEST_LENGTH]
+
+
+def larger_source_url(url):
+    """URL de la même miniature Wikimedia en plus grand, ou None pour une autre image."""
+    match = WIKIMEDIA_THUMB_RE.match(url)
+    if not match:
+        return None
+    return f"{match.group(1)}{WIKIMEDIA_SOURCE_WIDTH}px-{match.group(2)}"
+
+
+def has_alpha(image):
+    return image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def encode_variants(data):
+    """Décode une image et renvoie {variante: octets WebP} ; lève OSError si illisible."""
+    with Image.open(io.BytesIO(data)) as source:
+        # JPEG : décodage directement à l'échelle réduite la plus proche (1/2, 1/4, 1/8)
+        largest = max(VARIANTS.values())
+        source.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if has_alpha(image) else 'RGB')
+    encoded = {}
+    # Du plus grand au plus petit : chaque variante est réduite à partir de la précédente
+    for variant, size in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=WEBP_METHOD)
+        encoded[variant] = buffer.getvalue()
+    return encoded
+
+
+class ImageStore:
+    """Dossier de variantes WebP indexées par hachage, alimenté depuis plusieurs threads."""
+
+    def __init__(self, image_dir=IMAGE_DIR, fetcher=None):
+        self.image_dir = image_dir
+        self.fetcher = fetcher
+        self.manifest_file = os.path.join(image_dir, MANIFEST_NAME)
+        self.lock = threading.Lock()
+        # Hachages convertis (ou en cours de conversion) pendant ce passage : {hachage: Event posé une fois fini}
+        self.claimed = {}
+        self.downloads = 0
+        self.downloaded_bytes = 0
+        self.rendered = 0
+        self.written_bytes = 0
+        self.failures = 0
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as infile:
+                self.manifest = json.load(infile)
+        except (FileNotFoundError, ValueError):
+            self.manifest = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.save()
+        return False
+
+    def variant_path(self, variant, digest):
+        return os.path.join(self.image_dir, variant, f"{digest}.webp")
+
+    def has_variants(self, digest):
+        return all(os.path.exists(self.variant_path(variant, digest)) for variant in VARIANTS)
+
+    def download(self, url):
+        """Octets de l'image (version agrandie si possible), ou None."""
+        for candidate in filter(None, [larger_source_url(url), url]):
+            try:
+                response = self.fetcher.get(candidate)
+            except requests.RequestException as e:
+                print(f"Erreur lors du téléchargement de {candidate}: {e}")
+                continue
+            if response.status_code == 200 and response.content:
+                with self.lock:
+                    self.downloads += 1
+                    self.downloaded_bytes += len(response.content)
+                return response.content
+        return None
+
+    def ingest(self, url):
+        """Télécharge et convertit l'image de `url` si nécessaire ; renvoie son hachage ou None."""
+        with self.lock:
+            digest = self.manifest.get(url)
+        if digest and self.has_variants(digest):
+            return digest
+
+        data = self.download(url)
+        if data is None:
+            with self.lock:
+                self.failures += 1
+            return None
+
+        digest = content_digest(data)
+        with self.lock:
+            rendering = self.claimed.get(digest)
+            if rendering is None:
+                claim = self.claimed[digest] = threading.Event()
+        if rendering is not None:
+            # Même contenu pris en charge par un autre thread : ses variantes doivent exister avant d'être référencées
+            rendering.wait()
+            if not self.has_variants(digest):
+                with self.lock:
+                    self.failures += 1
+                return None
+        else:
+            try:
+                if not self.has_variants(digest) and not self.render(url, data, digest):
+                    return None
+            finally:
+                claim.set()
+
+        with self.lock:
+            self.manifest[url] = digest
+        return digest
+
+    def render(self, url, data, digest):
+        """Convertit et écrit les variantes de l'image ; renvoie False si elle est illisible."""
+        try:
+            encoded = encode_variants(data)
+        except (UnidentifiedImageError, OSError, ValueError) as e:
+            print(f"Image illisible ({url}): {e}")
+            with self.lock:
+                del self.claimed[digest]
+                self.failures += 1
+            return False
+        for variant, content in encoded.items():
+            path = self.variant_path(variant, digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with AtomicWriter(path, binary=True) as outfile:
+                outfile.write(content)
+        with self.lock:
+            self.rendered += 1
+            self.written_bytes += sum(len(content) for content in encoded.values())
+        return True
+
+    def ingest_all(self, urls, desc="Images"):
+        """{url: hachage ou None} pour toutes les URL distinctes, traitées en parallèle."""
+        urls = list(dict.fromkeys(urls))
+        return dict(zip(urls, self.fetcher.map(self.ingest, urls, desc=desc)))
+
+    def public_urls(self, base_url, digest):
+        """{variante: URL publique} une fois le dossier publié sous `base_url`."""
+        return {variant: f"{base_url.rstrip('/')}/{variant}/{digest}.webp" for variant in VARIANTS}
+
+    def save(self):
+        os.makedirs(self.image_dir, exist_ok=True)
+        with AtomicWriter(self.manifest_file) as outfile:
+            outfile.write(json.dumps(self.manifest, indent=1, sort_keys=True))
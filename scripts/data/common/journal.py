@@ -0,0 +1,73 @@
+"""
+Journal de reprise des enrichissements longs.
+
+Chaque résultat est ajouté au journal (une ligne JSON par clé) dès qu'il est
+obtenu. Après une interruption (plantage, Ctrl-C), la relance relit le
+journal et ne redemande que les clés manquantes. Le journal est supprimé
+une fois le fichier final écrit.
+"""
+import json
+import os
+
+
+def journal_file_for(csv_file):
+    return os.path.splitext(csv_file)[0] + '.journal.jsonl'
+
+
+class ResultJournal:
+    """Résultats {clé: valeur} déjà obtenus, complétés ligne à ligne sur disque."""
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        self.file = None
+        try:
+            with open(path, 'r', encoding='utf-8') as infile:
+                for line in infile:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par une interruption pendant l'écriture
+                        continue
+                    self.results[entry['key']] = entry['value']
+        except FileNotFoundError:
+            pass
+        self.resumed = len(self.results)
+
+    def __enter__(self):
+        self.file = open(self.path, 'a', encoding='utf-8')
+        if self.file.tell() and not self._ends_with_newline():
+            self.file.write('\n')
+        return self
+
+    def _ends_with_newline(self):
+        with open(self.path, 'rb') as infile:
+            infile.seek(-1, os.SEEK_END)
+            return infile.read(1) == b'\n'
+
+    def __contains__(self, key):
+        return key in self.results
+
+    def __getitem__(self, key):
+        return self.results[key]
+
+    def append(self, key, value):
+        """Enregistre un résultat ; la ligne est écrite sur disque immédiatement."""
+        self.results[key] = value
+        self.file.write(json.dumps({'key': key, 'value': value}, ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def remove(self):
+        """Supprime le journal : à appeler une fois la sortie finale écrite."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
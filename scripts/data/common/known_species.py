@@ -0,0 +1,272 @@
+"""
+Registre persistant (SQLite) des espèces déjà connues, partagé par les
+scripts de déduplication.
+
+Chaque espèce est indexée par son nom scientifique normalisé (sans auteur ni
+accents, en minuscules), par la clé GBIF de la colonne gbif_id des CSV
+(`usageKey` du match) et par sa clé GBIF acceptée : un synonyme ou un nom
+suivi de son auteur retombe sur l'espèce déjà enregistrée. Une région
+vérifie ses poissons et enregistre les nouveaux en une requête indexée par
+ligne, sans relire les CSV des régions précédentes.
+
+Le registre garde l'appartenance (nom, région) : une même espèce peut y
+figurer pour plusieurs régions, et en oublier une ne retire rien aux
+autres. Une région n'est comparée qu'à celles qui la précèdent dans l'ordre
+de déduplication (`precedence`, common.regions) et à elle-même : les
+régions lancées après elle, même déjà enregistrées, n'y changent rien.
+Entre plusieurs correspondances, la région la plus prioritaire l'emporte.
+
+Les clés acceptées sont lues dans le cache des réponses GBIF (common.cache),
+sans accès réseau : une espèce enregistrée avant son enrichissement reçoit
+sa clé à l'ouverture suivante du registre.
+
+Une région de référence est amorcée depuis son CSV final, puis réamorcée
+dès que l'empreinte du fichier change (modification à la main, git pull,
+autre script) : le registre ne garde pas un ensemble d'espèces périmé.
+
+    with KnownSpeciesRegistry() as registry:
+        registry.ensure_region(FRESHWATER.name, FRESHWATER_FILE)
+        registry.forget_region(MEDITERRANEE.name)
+        for row in rows:
+            known = registry.check_and_add(row['scientific_name'], MEDITERRANEE.name)
+        registry.commit()
+"""
+import csv
+import hashlib
+import os
+import re
+import sqlite3
+import unicodedata
+
+from .cache import CACHE_DIR, GBIF_CACHE_FILE, ResponseCache
+from .regions import REGIONS, regions_up_to
+
+# Surchargeable pour les vérifications hors ligne (offline/check_dedupe_order.py)
+DEFAULT_REGISTRY_FILE = os.environ.get('KNOWN_SPECIES_REGISTRY', os.path.join(CACHE_DIR, "known_species.sqlite"))
+
+# Version du schéma (PRAGMA user_version) : un registre plus ancien est recréé, puis réamorcé depuis les CSV
+SCHEMA_VERSION = 3
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS species (
+    normalized_name TEXT NOT NULL,
+    scientific_name TEXT NOT NULL,
+    gbif_key INTEGER,
+    accepted_key INTEGER,
+    region TEXT NOT NULL,
+    PRIMARY KEY (normalized_name, region)
+);
+CREATE INDEX IF NOT EXISTS species_gbif_key ON species (gbif_key);
+CREATE INDEX IF NOT EXISTS species_accepted_key ON species (accepted_key);
+CREATE INDEX IF NOT EXISTS species_region ON species (region);
+CREATE TABLE IF NOT EXISTS region_sources (
+    region TEXT PRIMARY KEY,
+    csv_file TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+);
+"""
+
+# Marqueurs de rang ou d'incertitude ignorés dans les noms (subsp., var., cf., ...)
+RANK_MARKERS = {'subsp.', 'ssp.', 'var.', 'f.', 'cf.', 'aff.', 'x', '×'}
+
+# Particules en minuscules qui ouvrent un nom d'auteur (« de Buen », « van Beneden »)
+AUTHOR_PARTICLES = {'de', 'del', 'della', 'di', 'da', 'du', 'la', 'le', 'van', 'von', 'der', 'den'}
+
+
+def normalize_scientific_name(name):
+    """
+    Réduit un nom scientifique au genre et à ses épithètes, en minuscules et
+    sans accents : « Salmo trutta fario Linnaeus, 1758 » -> « salmo trutta fario ».
+    """
+    text = unicodedata.normalize('NFKD', name or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    # Sous-genre ou auteur entre parenthèses : « Raja (Dipturus) batis (Linnaeus, 1758) »
+    text = re.sub(r'\([^)]*\)', ' ', text)
+
+    words = text.split()
+    if not words:
+        return ''
+    kept = [words[0].lower()]
+    for word in words[1:]:
+        if word.lower() in RANK_MARKERS:
+            continue
+        # L'auteur commence par une majuscule, un chiffre (année) ou une particule
+        if not word[0].islower() or word in AUTHOR_PARTICLES:
+            break
+        kept.append(word.strip('.,'))
+        # Genre + espèce + sous-espèce au plus
+        if len(kept) == 3:
+            break
+    return ' '.join(kept)
+
+
+def file_fingerprint(path):
+    """Empreinte SHA-1 du contenu d'un fichier."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_gbif_key(value):
+    """Convertit une valeur de colonne gbif_id ('2421365', '', None) en entier ou None."""
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+class KnownSpecies:
+    """Espèce trouvée dans le registre : son nom tel qu'enregistré et sa région d'origine."""
+
+    def __init__(self, scientific_name, region):
+        self.scientific_name = scientific_name
+        self.region = region
+
+
+class KnownSpeciesRegistry:
+    """
+    Registre des espèces connues, utilisable comme gestionnaire de contexte.
+    Les modifications ne sont conservées qu'après `commit()` : un script
+    interrompu laisse le registre dans son état précédent.
+    """
+
+    def __init__(self, path=DEFAULT_REGISTRY_FILE, gbif_cache_file=GBIF_CACHE_FILE):
+        self.path = path
+        self.gbif_cache_file = gbif_cache_file
+        self.conn = None
+        self.gbif_cache = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Ancien registre (une région par nom) : recréé, les régions seront réamorcées
+            self.conn.executescript("DROP TABLE IF EXISTS species; DROP TABLE IF EXISTS region_sources; "
+                                    f"PRAGMA user_version = {SCHEMA_VERSION};")
+        self.conn.executescript(SCHEMA)
+        # Le cache GBIF n'est ouvert que s'il existe déjà (pas de fichier vide créé)
+        if self.gbif_cache_file and os.path.exists(self.gbif_cache_file):
+            self.gbif_cache = ResponseCache(self.gbif_cache_file)
+        self.fill_missing_keys()
+        self.commit()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.conn.rollback()
+        self.conn.close()
+        if self.gbif_cache:
+            self.gbif_cache.close()
+        return False
+
+    def commit(self):
+        self.conn.commit()
+
+    def accepted_key(self, scientific_name):
+        """Clé GBIF acceptée du nom d'après le cache GBIF (synonyme -> espèce acceptée), ou None."""
+        if not self.gbif_cache:
+            return None
+        # Mêmes paramètres que GbifClient.match
+        match_data = self.gbif_cache.get("/species/match", {'name': scientific_name, 'rank': 'SPECIES'})
+        if not match_data:
+            return None
+        return match_data.get('acceptedUsageKey') or match_data.get('usageKey') or None
+
+    def fill_missing_keys(self):
+        """Complète les clés acceptées des espèces enregistrées avant leur enrichissement."""
+        missing = self.conn.execute("SELECT normalized_name, scientific_name FROM species WHERE accepted_key IS NULL")
+        updates = []
+        for normalized_name, scientific_name in missing.fetchall():
+            key = self.accepted_key(scientific_name)
+            if key:
+                updates.append((key, normalized_name))
+        self.conn.executemany("UPDATE species SET accepted_key = ? WHERE normalized_name = ?", updates)
+        return len(updates)
+
+    def count(self, region=None):
+        """Espèces distinctes enregistrées, pour toutes les régions ou pour `region`."""
+        if region is None:
+            return self.conn.execute("SELECT COUNT(DISTINCT normalized_name) FROM species").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM species WHERE region = ?", (region,)).fetchone()[0]
+
+    def forget_region(self, region):
+        """Retire les espèces d'une région avant de la réenregistrer (relance idempotente)."""
+        self.conn.execute("DELETE FROM species WHERE region = ?", (region,))
+
+    def _first(self, column, value, regions):
+        """
+        Espèce dont `column` vaut `value` parmi `regions` (toutes si None) :
+        celle de la région la plus prioritaire, puis la première enregistrée.
+        """
+        sql = f"SELECT scientific_name, region, rowid FROM species WHERE {column} = ?"
+        params = [value]
+        if regions is not None:
+            sql += f" AND region IN ({', '.join('?' * len(regions))})"
+            params += regions
+        rows = self.conn.execute(sql, params).fetchall()
+        if not rows:
+            return None
+        scientific_name, region, _ = min(rows, key=lambda row: (
+            REGIONS[row[1]].precedence if row[1] in REGIONS else len(REGIONS), row[2]))
+        return KnownSpecies(scientific_name, region)
+
+    def find(self, scientific_name, gbif_key=None, regions=None):
+        """
+        Renvoie l'espèce connue correspondant au nom, à défaut à sa clé
+        acceptée ou à sa clé GBIF (colonne gbif_id), ou None ; seulement
+        parmi `regions` si elles sont données.
+        """
+        known = self._first('normalized_name', normalize_scientific_name(scientific_name), regions)
+        # Chaque clé n'est comparée qu'aux clés de même sorte
+        accepted_key = None if known else self.accepted_key(scientific_name)
+        if known is None and accepted_key:
+            known = self._first('accepted_key', accepted_key, regions)
+        if known is None and gbif_key:
+            known = self._first('gbif_key', gbif_key, regions)
+        return known
+
+    def add(self, scientific_name, region, gbif_key=None):
+        """Enregistre une espèce pour `region` (une seule fois par nom normalisé et par région)."""
+        normalized_name = normalize_scientific_name(scientific_name)
+        if not normalized_name:
+            return
+        self.conn.execute(
+            "INSERT OR IGNORE INTO species (normalized_name, scientific_name, gbif_key, accepted_key, region)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (normalized_name, scientific_name, parse_gbif_key(gbif_key), self.accepted_key(scientific_name), region)
+        )
+
+    def check_and_add(self, scientific_name, region, gbif_key=None):
+        """
+        Renvoie l'espèce déjà connue d'une région qui précède `region` (ou de
+        `region` elle-même : doublon interne), ou enregistre le nom pour
+        `region` et renvoie None.
+        """
+        known = self.find(scientific_name, parse_gbif_key(gbif_key), regions_up_to(region))
+        if known is None:
+            self.add(scientific_name, region, gbif_key)
+        return known
+
+    def ensure_region(self, region, csv_file):
+        """
+        Amorce le registre avec le CSV final d'une région : au premier passage
+        et chaque fois que le fichier a changé depuis le dernier amorçage
+        (empreinte enregistrée). Renvoie le nombre de lignes lues, 0 si la
+        région était déjà à jour.
+        """
+        fingerprint = file_fingerprint(csv_file)
+        source = self.conn.execute("SELECT fingerprint FROM region_sources WHERE region = ?", (region,)).fetchone()
+        if source and source[0] == fingerprint and self.count(region):
+            return 0
+        self.forget_region(region)
+        rows = 0
+        with open(csv_file, 'r', encoding='utf-8') as infile:
+            for row in csv.DictReader(infile):
+                self.add(row['scientific_name'], region, row.get('gbif_id'))
+                rows += 1
+        self.conn.execute("INSERT OR REPLACE INTO region_sources (region, csv_file, fingerprint) VALUES (?, ?, ?)",
+                          (region, os.path.abspath(csv_file), fingerprint))
+        return rows
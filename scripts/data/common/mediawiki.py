@@ -0,0 +1,157 @@
+"""
+Récupération groupée des détails d'articles via l'API MediaWiki (Action API).
+
+Au lieu de télécharger et d'analyser la page HTML complète de chaque poisson,
+une requête `action=query` renvoie pour 50 titres à la fois l'introduction en
+texte brut, l'image principale, les propriétés de page et le wikitexte (pour
+les champs de l'infobox).
+"""
+import os
+from urllib.parse import unquote, urlparse
+
+import requests
+from tqdm import tqdm
+
+from .metrics import record_error
+from .wikitext import infobox_measures
+
+MEDIAWIKI_API_URL = os.environ.get('MEDIAWIKI_API_URL', "https://fr.wikipedia.org/w/api.php")
+
+# Nombre maximal de titres par requête autorisé par l'API
+BATCH_SIZE = 50
+THUMBNAIL_SIZE = 250
+
+QUERY_PARAMS = {
+    'action': 'query',
+    'format': 'json',
+    'formatversion': 2,
+    'redirects': 1,
+    'prop': 'extracts|pageimages|pageprops|revisions',
+    'exintro': 1,
+    'explaintext': 1,
+    'exlimit': 'max',
+    'piprop': 'thumbnail',
+    'pithumbsize': THUMBNAIL_SIZE,
+    'pilimit': 'max',
+    'ppprop': 'disambiguation',
+    'rvprop': 'content',
+    'rvslots': 'main',
+}
+
+
+def title_from_url(url):
+    """Renvoie le titre d'article d'une URL /wiki/..., ou None."""
+    if not url:
+        return None
+    path = urlparse(url).path
+    if '/wiki/' not in path:
+        return None
+    return unquote(path.split('/wiki/', 1)[1]).replace('_', ' ')
+
+
+# Identifiant de la dernière révision de chaque page
+INFO_PARAMS = {
+    'action': 'query',
+    'format': 'json',
+    'formatversion': 2,
+    'redirects': 1,
+    'prop': 'info',
+}
+
+
+def _query_batch(titles, fetcher, api_url, query_params=QUERY_PARAMS):
+    """
+    Interroge l'API pour un lot de titres en suivant les continuations
+    (les extraits sont limités à 20 par réponse).
+    Renvoie (pages par titre, correspondances titre demandé -> titre final).
+    """
+    params = dict(query_params, titles='|'.join(titles))
+    pages = {}
+    aliases = {}
+    continuation = {}
+    while True:
+        try:
+            response = fetcher.get(api_url, params=dict(params, **continuation))
+            response.raise_for_status()
+            data = response.json()
+        except requests.RequestException:
+            # Déjà comptée par le fetcher (exception ou statut HTTP)
+            break
+        except ValueError:
+            record_error(urlparse(api_url).netloc, "invalid JSON")
+            break
+
+        query = data.get('query', {})
+        for alias in query.get('normalized', []) + query.get('redirects', []):
+            aliases[alias['from']] = alias['to']
+        for page in query.get('pages', []):
+            pages.setdefault(page['title'], {}).update(page)
+
+        if 'continue' not in data:
+            break
+        continuation = data['continue']
+    return pages, aliases
+
+
+def _resolve(title, aliases):
+    """Suit normalisation et redirections jusqu'au titre final."""
+    for _ in range(5):
+        if title not in aliases:
+            break
+        title = aliases[title]
+    return title
+
+
+def _page_summary(page):
+    """Construit les champs description / photo / mesures d'une page."""
+    if page.get('missing') or 'disambiguation' in page.get('pageprops', {}):
+        return None
+
+    description = ""
+    for paragraph in (page.get('extract') or '').split('\n'):
+        if paragraph.strip():
+            description = paragraph.strip()
+            break
+
+    photo_url = page.get('thumbnail', {}).get('source', '')
+
+    wikitext = ''
+    revisions = page.get('revisions') or []
+    if revisions:
+        wikitext = revisions[0].get('slots', {}).get('main', {}).get('content', '')
+
+    summary = {'description': description, 'photo_url': photo_url}
+    summary.update(infobox_measures(wikitext))
+    return summary
+
+
+def fetch_page_summaries(titles, fetcher, api_url=MEDIAWIKI_API_URL):
+    """
+    Renvoie {titre demandé: {description, photo_url, max_size_cm, max_weight_kg}}
+    pour chaque titre trouvé, par lots de BATCH_SIZE titres.
+    """
+    titles = list(dict.fromkeys(t for t in titles if t))
+    batches = [titles[i:i + BATCH_SIZE] for i in range(0, len(titles), BATCH_SIZE)]
+    summaries = {}
+    for batch in tqdm(batches, desc="Lots API"):
+        pages, aliases = _query_batch(batch, fetcher, api_url)
+        for title in batch:
+            page = pages.get(_resolve(title, aliases))
+            summary = _page_summary(page) if page else None
+            if summary:
+                summaries[title] = summary
+    return summaries
+
+
+def fetch_revision_ids(titles, fetcher, api_url=MEDIAWIKI_API_URL):
+    """Renvoie {titre demandé: identifiant de la dernière révision} par lots de BATCH_SIZE titres."""
+    titles = list(dict.fromkeys(t for t in titles if t))
+    revision_ids = {}
+    for i in range(0, len(titles), BATCH_SIZE):
+        batch = titles[i:i + BATCH_SIZE]
+        pages, aliases = _query_batch(batch, fetcher, api_url, INFO_PARAMS)
+        for title in batch:
+            page = pages.get(_resolve(title, aliases))
+            if page and page.get('lastrevid'):
+                revision_ids[title] = page['lastrevid']
+    return revision_ids
@@ -0,0 +1,416 @@
+"""
+Métriques et profilage des scripts de la chaîne de données.
+
+Chaque script s'exécute dans `instrument(nom)` ; les modules `common`
+alimentent le registre du processus sans que les scripts aient à s'en
+occuper :
+  - durée de chaque étape (`stage(nom)`) et du script ;
+  - requêtes HTTP par hôte et endpoint : nombre, latences, statuts
+    (`PageFetcher`, `get_fish_list`, `GbifClient`) ;
+  - succès / échecs des caches (`ResponseCache`) ;
+  - attente imposée par les limiteurs de débit ;
+  - erreurs par source et par type (exception ou statut HTTP >= 400),
+    y compris celles que l'appelant absorbe pour continuer.
+
+À la sortie, les métriques sont écrites dans `.cache/metrics/<script>.json`
+et `.cache/metrics/<script>.prom` (format texte Prometheus, à faire lire par
+le collecteur textfile de node_exporter, qui lit tous les .prom du dossier ;
+dossier surchargeable par PIPELINE_METRICS_DIR).
+
+Profilage à la demande, par script ou par étape :
+    PIPELINE_PROFILE=mediterranee:enrich python enrich_med_gbif.py
+    PIPELINE_PROFILE=eau-douce:scrape/details PIPELINE_PROFILER=sample python scraper.py
+`cprofile` (par défaut) écrit un fichier .prof (pstats, snakeviz) et affiche
+les fonctions les plus coûteuses ; il ne voit que le thread courant.
+`sample` relève la pile de tous les threads toutes les 5 ms et écrit un
+fichier .folded (flamegraph.pl, speedscope) : à préférer pour les pools de
+threads et la boucle asyncio.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from .csv_stream import AtomicWriter
+
+# Par défaut : scripts/data/.cache/metrics/ (à côté des caches de common.cache, qui importe ce module)
+METRICS_DIR = os.environ.get('PIPELINE_METRICS_DIR', os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'metrics'))
+
+# Cibles à profiler (noms de script ou « script/étape », séparés par des virgules, ou « all »)
+PROFILE_TARGETS = {t.strip() for t in os.environ.get('PIPELINE_PROFILE', '').split(',') if t.strip()}
+PROFILERS = ('cprofile', 'sample')
+PROFILER = os.environ.get('PIPELINE_PROFILER', 'cprofile')
+SAMPLE_INTERVAL = 0.005
+PROFILE_TOP = 25
+
+PROMETHEUS_PREFIX = "fishable_pipeline"
+# Bornes (secondes) de l'histogramme des latences HTTP
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+NUMBER_SEGMENT_RE = re.compile(r'^\d+$')
+
+
+def endpoint_of(url):
+    """
+    (hôte, endpoint) d'une URL, sans paramètres ni identifiants : les
+    métriques restent en nombre borné quel que soit le nombre d'espèces.
+    """
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if path.startswith('/wiki/'):
+        return parts.netloc, '/wiki/{page}'
+    segments = ['{id}' if NUMBER_SEGMENT_RE.match(s) else s for s in path.strip('/').split('/')]
+    # Fichiers (images Wikimedia...) : seuls les premiers dossiers sont gardés
+    if len(segments) > 4:
+        segments = segments[:2] + ['...']
+    return parts.netloc, '/' + '/'.join(segments)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Metrics:
+    """Registre des métriques du processus, utilisable depuis plusieurs threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset(None)
+
+    def reset(self, script):
+        self.script = script
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.duration = None
+        self.stages = {}      # {étape: secondes cumulées}
+        self.latencies = {}   # {(hôte, endpoint): array des durées}
+        self.statuses = {}    # {(hôte, endpoint, statut): nombre}
+        self.errors = {}      # {(source, type): nombre}
+        self.cache = {}       # {cache: [succès, échecs]}
+        self.waits = {}       # {limiteur: [attentes, secondes]}
+        self.profiles = {}    # {cible: profileur}
+        self.profiling = None  # cible en cours de profilage
+
+    def add_stage(self, name, seconds):
+        with self.lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_request(self, url, seconds, status=None, error=None):
+        host, endpoint = endpoint_of(url)
+        label = error or str(status)
+        with self.lock:
+            self.latencies.setdefault((host, endpoint), array('d')).append(seconds)
+            self.statuses[(host, endpoint, label)] = self.statuses.get((host, endpoint, label), 0) + 1
+        if error:
+            self.add_error(host, error)
+        elif status is not None and status >= 400:
+            self.add_error(host, f"HTTP {status}")
+
+    def add_error(self, source, kind):
+        with self.lock:
+            self.errors[(source, kind)] = self.errors.get((source, kind), 0) + 1
+
+    def add_cache(self, name, hit):
+        with self.lock:
+            counts = self.cache.setdefault(name, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def add_wait(self, limiter, seconds):
+        with self.lock:
+            counts = self.waits.setdefault(limiter, [0, 0.0])
+            counts[0] += 1
+            counts[1] += seconds
+
+    def snapshot(self):
+        """Métriques sous forme de dictionnaire (contenu du fichier JSON)."""
+        with self.lock:
+            requests = []
+            for (host, endpoint), values in sorted(self.latencies.items()):
+                ordered = sorted(values)
+                statuses = {label: count for (h, e, label), count in self.statuses.items()
+                            if (h, e) == (host, endpoint)}
+                requests.append({
+                    'host': host, 'endpoint': endpoint, 'count': len(ordered),
+                    'seconds': round(sum(ordered), 4),
+                    'p50': round(percentile(ordered, 0.5), 4), 'p95': round(percentile(ordered, 0.95), 4),
+                    'max': round(ordered[-1], 4), 'statuses': dict(sorted(statuses.items())),
+                })
+            return {
+                'script': self.script,
+                'started_at': self.started_at,
+                'duration': round(self.duration if self.duration is not None else time.time() - self.started_at, 4),
+                'stages': {name: round(seconds, 4) for name, seconds in self.stages.items()},
+                'requests': requests,
+                'cache': {name: {'hits': hits, 'misses': misses,
+                                 'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None}
+                          for name, (hits, misses) in self.cache.items()},
+                'rate_limiter_waits': {name: {'count': count, 'seconds': round(seconds, 4)}
+                                       for name, (count, seconds) in self.waits.items()},
+                'errors': [{'source': source, 'type': kind, 'count': count}
+                           for (source, kind), count in sorted(self.errors.items())],
+            }
+
+
+METRICS = Metrics()
+
+
+# --- Enregistrement (appelé par les modules `common`) ---
+
+def record_request(url, seconds, status=None, error=None):
+    """Une requête HTTP terminée par un statut, ou par une exception (`error` : son type)."""
+    METRICS.add_request(url, seconds, status, error)
+
+
+def record_error(source, kind):
+    METRICS.add_error(source, kind)
+
+
+def record_cache(name, hit):
+    METRICS.add_cache(name, hit)
+
+
+def record_wait(limiter, seconds):
+    METRICS.add_wait(limiter, seconds)
+
+
+def observed_get(get, url, **kwargs):
+    """Appelle `get(url, **kwargs)` (requests) en enregistrant durée et statut ou erreur."""
+    start = time.perf_counter()
+    try:
+        response = get(url, **kwargs)
+    except Exception as e:
+        record_request(url, time.perf_counter() - start, error=type(e).__name__)
+        raise
+    record_request(url, time.perf_counter() - start, status=response.status_code)
+    return response
+
+
+# --- Profilage ---
+
+def profile_file(target, extension):
+    return os.path.join(METRICS_DIR, re.sub(r'[^\w.-]', '_', target) + extension)
+
+
+def should_profile(target):
+    return 'all' in PROFILE_TARGETS or target in PROFILE_TARGETS
+
+
+class SamplingProfiler:
+    """
+    Relève périodiquement la pile de chaque thread ; même interface que
+    `cProfile.Profile` (enable / disable, cumulables), piles agrégées au format « folded ».
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = {}
+        self.stopped = None
+        self.thread = None
+
+    def run(self, stopped):
+        own_id = threading.get_ident()
+        while not stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                key = ';'.join(reversed(stack))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def enable(self):
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(self.stopped,), daemon=True)
+        self.thread.start()
+
+    def disable(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def write(self, path):
+        with AtomicWriter(path) as out:
+            for stack, count in sorted(self.samples.items()):
+                out.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profiled(target):
+    """
+    Profile le bloc si `target` est demandé dans PIPELINE_PROFILE. Une étape
+    répétée (un appel par lot) cumule ses passages dans un même profil.
+    Les profils ne s'imbriquent pas : une étape d'un script déjà profilé
+    figure dans le profil du script.
+    """
+    if not should_profile(target) or METRICS.profiling:
+        yield
+        return
+    profiler = METRICS.profiles.get(target)
+    if profiler is None:
+        profiler = SamplingProfiler() if PROFILER == 'sample' else cProfile.Profile()
+        METRICS.profiles[target] = profiler
+    METRICS.profiling = target
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        METRICS.profiling = None
+
+
+def write_profiles(profiles):
+    """Écrit les profils du script (.folded ou .prof) et résume les profils cProfile."""
+    if profiles:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+    for target, profiler in profiles.items():
+        if isinstance(profiler, SamplingProfiler):
+            path = profile_file(target, '.folded')
+            profiler.write(path)
+            print(f"Profil (échantillons) de {target} : {path}")
+            continue
+        path = profile_file(target, '.prof')
+        profiler.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_TOP)
+        print(f"Profil (cProfile) de {target} : {path}\n{report.getvalue()}")
+
+
+# --- Étapes et scripts ---
+
+@contextmanager
+def stage(name):
+    """Mesure (et profile à la demande) une étape du script en cours."""
+    target = f"{METRICS.script}/{name}" if METRICS.script else name
+    start = time.perf_counter()
+    try:
+        with profiled(target):
+            yield
+    finally:
+        METRICS.add_stage(name, time.perf_counter() - start)
+
+
+@contextmanager
+def instrument(script):
+    """
+    Encadre l'exécution d'un script : métriques remises à zéro puis écrites
+    à la sortie, même en cas d'erreur. Appelé à l'intérieur d'un script déjà
+    instrumenté, le bloc devient une simple étape.
+    """
+    # Un processus issu d'un fork (pool de processus) repart de zéro avec son propre fichier
+    if METRICS.script is not None and METRICS.pid == os.getpid():
+        with stage(script):
+            yield METRICS
+        return
+    METRICS.reset(script)
+    start = time.perf_counter()
+    try:
+        with profiled(script):
+            yield METRICS
+    finally:
+        METRICS.duration = time.perf_counter() - start
+        write_profiles(METRICS.profiles)
+        paths = write_metrics(METRICS)
+        print(summary(METRICS.snapshot(), paths[0]))
+        METRICS.script = None
+
+
+def write_metrics(metrics, directory=None):
+    """Écrit les fichiers JSON et Prometheus ; renvoie leurs chemins."""
+    directory = directory or METRICS_DIR
+    os.makedirs(directory, exist_ok=True)
+    data = metrics.snapshot()
+    base = os.path.join(directory, re.sub(r'[^\w.-]', '_', data['script']))
+    with AtomicWriter(base + '.json') as out:
+        json.dump(data, out, indent=2, ensure_ascii=False)
+    with AtomicWriter(base + '.prom') as out:
+        out.write(prometheus_text(metrics, data))
+    return base + '.json', base + '.prom'
+
+
+def label_text(labels):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def prometheus_text(metrics, data):
+    """Métriques au format texte d'exposition Prometheus."""
+    lines = []
+    script = {'script': data['script']}
+
+    def family(name, kind, help_text, samples):
+        lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+        for suffix, labels, value in samples:
+            lines.append(f"{PROMETHEUS_PREFIX}_{name}{suffix}{label_text(dict(script, **labels))} {value}")
+
+    family('last_run_timestamp_seconds', 'gauge', "Début du dernier passage du script.",
+           [('', {}, round(data['started_at'], 3))])
+    family('duration_seconds', 'gauge', "Durée du dernier passage du script.", [('', {}, data['duration'])])
+    family('stage_duration_seconds', 'gauge', "Durée de chaque étape du script.",
+           [('', {'stage': name}, seconds) for name, seconds in data['stages'].items()])
+
+    with metrics.lock:
+        latencies = {key: sorted(values) for key, values in metrics.latencies.items()}
+        statuses = dict(metrics.statuses)
+    family('http_requests_total', 'counter', "Requêtes HTTP par hôte, endpoint et statut (ou type d'erreur).",
+           [('', {'host': host, 'endpoint': endpoint, 'status': status}, count)
+            for (host, endpoint, status), count in sorted(statuses.items())])
+    samples = []
+    for (host, endpoint), values in sorted(latencies.items()):
+        labels = {'host': host, 'endpoint': endpoint}
+        for bound in LATENCY_BUCKETS:
+            samples.append(('_bucket', dict(labels, le=bound), bisect_left(values, bound + 1e-12)))
+        samples.append(('_bucket', dict(labels, le='+Inf'), len(values)))
+        samples.append(('_sum', labels, round(sum(values), 6)))
+        samples.append(('_count', labels, len(values)))
+    family('http_request_duration_seconds', 'histogram', "Latence des requêtes HTTP.", samples)
+
+    family('cache_requests_total', 'counter', "Consultations des caches, par résultat.",
+           [('', {'cache': name, 'result': result}, counts[key])
+            for name, counts in data['cache'].items() for key, result in (('hits', 'hit'), ('misses', 'miss'))])
+    family('cache_hit_ratio', 'gauge', "Part des consultations servies par le cache.",
+           [('', {'cache': name}, counts['hit_ratio']) for name, counts in data['cache'].items()
+            if counts['hit_ratio'] is not None])
+    family('rate_limiter_wait_seconds_total', 'counter', "Temps passé à attendre les limiteurs de débit.",
+           [('', {'limiter': name}, waits['seconds']) for name, waits in data['rate_limiter_waits'].items()])
+    family('rate_limiter_waits_total', 'counter', "Requêtes retardées par les limiteurs de débit.",
+           [('', {'limiter': name}, waits['count']) for name, waits in data['rate_limiter_waits'].items()])
+    family('errors_total', 'counter', "Erreurs par source et par type.",
+           [('', {'source': error['source'], 'type': error['type']}, error['count']) for error in data['errors']])
+    return '\n'.join(lines) + '\n'
+
+
+def summary(data, path):
+    """Résumé en quelques lignes pour la sortie du script."""
+    lines = [f"Métriques de {data['script']} ({data['duration']:.1f} s) : {path}"]
+    if data['stages']:
+        lines.append("   étapes : " + ", ".join(f"{name} {seconds:.1f} s" for name, seconds in data['stages'].items()))
+    hosts = {}
+    for entry in data['requests']:
+        count, seconds = hosts.get(entry['host'], (0, 0.0))
+        hosts[entry['host']] = (count + entry['count'], seconds + entry['seconds'])
+    for host, (count, seconds) in hosts.items():
+        lines.append(f"   {host} : {count} requêtes, {seconds / count * 1000:.0f} ms en moyenne")
+    for name, counts in data['cache'].items():
+        if counts['hit_ratio'] is not None:
+            lines.append(f"   cache {name} : {counts['hit_ratio']:.0%} de succès")
+    for name, waits in data['rate_limiter_waits'].items():
+        lines.append(f"   limiteur {name} : {waits['seconds']:.1f} s d'attente cumulée "
+                     f"({waits['count']} requêtes retardées)")
+    if data['errors']:
+        lines.append("   erreurs : " + ", ".join(f"{e['source']} {e['type']} x{e['count']}" for e in data['errors']))
+    return '\n'.join(lines)
@@ -0,0 +1,143 @@
+"""
+Chaîne téléchargement / analyse découplée pour les pages de détail.
+
+Une fois les téléchargements parallélisés, l'analyse HTML (lxml ou
+BeautifulSoup) devient le goulot : dans un pool de threads, elle reste
+limitée à un cœur par le GIL et s'intercale avec les entrées / sorties.
+Ici les rôles sont séparés :
+  - les threads du PageFetcher téléchargent les pages et déposent leur
+    contenu brut dans une file bornée ;
+  - un pool de processus analyse ces contenus (`parse(content)` -> champs) ;
+  - le thread appelant, seul à écrire, reporte les champs sur les éléments
+    et les rend au fur et à mesure (par exemple à un AtomicCsvWriter).
+La file et le nombre d'analyses en cours sont bornés : si l'analyse prend du
+retard, les téléchargements s'arrêtent (contre-pression) au lieu
+d'accumuler des pages en mémoire. Les éléments sont rendus dans leur ordre
+d'origine dès que ceux qui les précèdent sont prêts ; seuls ceux qui
+attendent un prédécesseur plus lent restent en mémoire.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import requests
+from tqdm import tqdm
+
+# Processus d'analyse et pages téléchargées en attente d'analyse
+DEFAULT_PROCESSES = os.cpu_count() or 1
+DEFAULT_QUEUE_SIZE = 64
+# Analyses soumises au pool au plus, par processus
+IN_FLIGHT_PER_PROCESS = 2
+
+_DONE = object()
+
+
+def _produce(fetcher, items, url_of, pages, errors, stop):
+    """
+    Télécharge les pages dans le pool de threads du fetcher ; dépose
+    (index, page reçue, contenu à analyser ou None) dans `pages`.
+    """
+    def fetch(index):
+        if stop.is_set():
+            return
+        url = url_of(items[index])
+        received = False
+        content = None
+        if url:
+            try:
+                response = fetcher.get(url)
+                # 304 (page inchangée) : reçue, l'élément garde ses valeurs ; erreur : non reçue
+                received = response.status_code in (200, 304)
+                if response.status_code == 200:
+                    content = response.content
+            except requests.RequestException:
+                pass
+        # Bloque tant que la file est pleine
+        pages.put((index, received, content))
+
+    try:
+        with ThreadPoolExecutor(max_workers=fetcher.workers) as executor:
+            for _ in executor.map(fetch, range(len(items))):
+                pass
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        pages.put(_DONE)
+
+
+def fetch_and_parse(fetcher, items, url_of, parse, apply, processes=DEFAULT_PROCESSES,
+                    queue_size=DEFAULT_QUEUE_SIZE, desc="Progression"):
+    """
+    Télécharge la page `url_of(item)` de chaque élément, l'analyse avec
+    `parse(content)` (fonction de module : elle est exécutée dans un autre
+    processus) et appelle `apply(item, résultat)` dans le thread appelant.
+    Les éléments sans URL, dont la page est inchangée (304) ou n'a pas été
+    reçue (erreur) sont laissés tels quels. Génère (élément, page reçue),
+    la page étant reçue si elle a été analysée ou est inchangée, dans
+    l'ordre d'origine et au fur et à mesure. Une liste `items` est vidée
+    (None) à mesure que ses éléments sont rendus : ils ne sont plus retenus
+    que par le consommateur.
+    """
+    if not isinstance(items, list):
+        items = list(items)
+    pages = queue.Queue(maxsize=queue_size)
+    errors = []
+    stop = threading.Event()
+    producer = threading.Thread(target=_produce, args=(fetcher, items, url_of, pages, errors, stop), daemon=True)
+    producer.start()
+
+    # processes <= 1 : analyse dans le thread appelant, toujours découplée des téléchargements
+    pool = ProcessPoolExecutor(max_workers=processes) if processes > 1 else None
+    max_in_flight = processes * IN_FLIGHT_PER_PROCESS
+    pending = {}
+    # Éléments traités mais pas encore rendus (un prédécesseur est en cours) : {index: page reçue}
+    finished = {}
+    next_index = 0
+    fetching = True
+    try:
+        with tqdm(total=len(items), desc=desc) as progress:
+            def collect(futures):
+                for future in futures:
+                    index = pending.pop(future)
+                    apply(items[index], future.result())
+                    finished[index] = True
+                    progress.update()
+
+            while fetching or pending:
+                collect([future for future in pending if future.done()])
+                if fetching and len(pending) < max_in_flight:
+                    entry = pages.get()
+                    if entry is _DONE:
+                        fetching = False
+                        continue
+                    index, page_received, content = entry
+                    if content is None:
+                        finished[index] = page_received
+                        progress.update()
+                    elif pool is None:
+                        apply(items[index], parse(content))
+                        finished[index] = True
+                        progress.update()
+                    else:
+                        pending[pool.submit(parse, content)] = index
+                elif pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                while next_index in finished:
+                    # L'élément n'est plus retenu ici une fois rendu
+                    item, items[next_index] = items[next_index], None
+                    yield item, finished.pop(next_index)
+                    next_index += 1
+    except BaseException:
+        # Erreur d'analyse ou interruption : arrête les téléchargements et libère les threads bloqués sur la file
+        stop.set()
+        while fetching and pages.get() is not _DONE:
+            pass
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        producer.join()
+    if errors:
+        raise errors[0]
@@ -0,0 +1,200 @@
+"""
+Limiteur de débit adaptatif par hôte, partagé entre processus.
+
+Chaque hôte a un seau à jetons : `rate` jetons par seconde, au plus `burst`
+d'avance. Une requête prend un jeton ; s'il n'y en a plus, elle réserve le
+suivant et attend son tour (le compte de jetons passe en négatif), si bien
+que les threads et processus sont servis dans l'ordre sans se relayer
+en boucle.
+
+Le débit s'adapte aux réponses :
+  - 429 / 503 : débit divisé par deux et pause jusqu'à la date de
+    `Retry-After` (1 s sans en-tête) pour toutes les requêtes vers l'hôte ;
+  - toutes les INCREASE_AFTER réponses saines : débit augmenté d'un dixième
+    du débit de départ, jusqu'à MAX_RATE_FACTOR fois celui-ci.
+
+L'état des seaux est dans une base SQLite (.cache/rate_limits.sqlite) dont
+chaque réservation est une transaction `BEGIN IMMEDIATE` : les scrapers
+lancés en parallèle (run_regions, run_pipeline) se partagent le même débit
+par hôte, et le débit appris est repris au passage suivant.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from .cache import CACHE_DIR
+from .metrics import record_wait
+
+RATE_LIMIT_FILE = os.path.join(CACHE_DIR, "rate_limits.sqlite")
+
+# Réponses signalant que le serveur demande de ralentir
+THROTTLE_STATUSES = (429, 503)
+# Nouvelles tentatives d'une requête refusée par THROTTLE_STATUSES
+MAX_RETRIES = 3
+
+DEFAULT_BURST = 5
+BACKOFF_FACTOR = 0.5
+DEFAULT_PAUSE = 1.0
+# Au-delà, un Retry-After est tronqué : mieux vaut échouer que bloquer la chaîne
+MAX_PAUSE = 300.0
+INCREASE_AFTER = 20
+MIN_RATE_FACTOR = 0.1
+MAX_RATE_FACTOR = 3.0
+
+# Attente maximale d'un verrou tenu par un autre processus (secondes)
+LOCK_TIMEOUT = 30
+
+
+def host_of(url):
+    return urlsplit(url).netloc or url
+
+
+def parse_retry_after(value, now=None):
+    """Délai (secondes) d'un en-tête Retry-After : nombre de secondes ou date HTTP ; None si absent ou illisible."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - (now or time.time()))
+
+
+class AdaptiveRateLimiter:
+    """
+    Seaux à jetons par hôte, partagés par tous les threads et processus
+    qui utilisent le même `state_file` (`None` : état propre au processus).
+    """
+
+    def __init__(self, rate, state_file=RATE_LIMIT_FILE, burst=DEFAULT_BURST):
+        self.initial_rate = rate
+        self.min_rate = rate * MIN_RATE_FACTOR
+        self.max_rate = rate * MAX_RATE_FACTOR
+        self.increase_step = rate / 10
+        self.burst = burst
+        # Réponses saines comptées en mémoire, reportées dans la base par paquets de INCREASE_AFTER
+        self.healthy = {}
+        self.lock = threading.Lock()
+        if state_file:
+            directory = os.path.dirname(state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(state_file or ':memory:', timeout=LOCK_TIMEOUT, isolation_level=None,
+                                    check_same_thread=False)
+        if state_file:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=OFF")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " host TEXT PRIMARY KEY,"
+            " rate REAL NOT NULL,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+
+    def _update(self, host, change):
+        """
+        Applique `change(rate, tokens, updated_at, now)` -> (rate, tokens,
+        updated_at, résultat) au seau de l'hôte, dans une transaction exclusive.
+        Les jetons sont d'abord rechargés jusqu'à `now` ; `updated_at` dans le
+        futur marque une pause (aucun jeton avant cette date).
+        """
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self.conn.execute("SELECT rate, tokens, updated_at FROM buckets WHERE host = ?",
+                                        (host,)).fetchone()
+                rate, tokens, updated_at = row or (self.initial_rate, self.burst, now)
+                # Débit appris lors d'un passage précédent, ramené dans les bornes actuelles
+                rate = min(max(rate, self.min_rate), self.max_rate)
+                updated_at = min(updated_at, now + MAX_PAUSE)
+                if now > updated_at:
+                    tokens = min(self.burst, tokens + (now - updated_at) * rate)
+                    updated_at = now
+                rate, tokens, updated_at, result = change(rate, tokens, updated_at, now)
+                self.conn.execute("INSERT OR REPLACE INTO buckets (host, rate, tokens, updated_at) VALUES (?, ?, ?, ?)",
+                                  (host, rate, tokens, updated_at))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def reserve(self, url):
+        """Réserve un jeton pour l'hôte de `url` ; renvoie le délai à attendre avant d'envoyer la requête."""
+        def take(rate, tokens, updated_at, now):
+            tokens -= 1
+            return rate, tokens, updated_at, max(0.0, updated_at - now) + max(0.0, -tokens) / rate
+        return self._update(host_of(url), take)
+
+    def wait(self, url):
+        """Attend son tour pour l'hôte de `url` (threads)."""
+        delay = self.reserve(url)
+        if delay > 0:
+            record_wait(host_of(url), delay)
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        """
+        Attend son tour pour l'hôte de `url` (asyncio) : la transaction SQLite,
+        qui peut attendre le verrou d'un autre processus, s'exécute dans un
+        thread pour ne pas bloquer la boucle d'événements.
+        """
+        delay = await asyncio.to_thread(self.reserve, url)
+        if delay > 0:
+            record_wait(host_of(url), delay)
+            await asyncio.sleep(delay)
+
+    def report(self, url, status, retry_after=None):
+        """
+        Adapte le débit de l'hôte à une réponse : ralentit et met en pause sur
+        429 / 503 (`retry_after` en secondes), accélère après une série de
+        réponses saines.
+        """
+        change = self._adaptation(url, status, retry_after)
+        if change:
+            self._update(host_of(url), change)
+
+    async def report_async(self, url, status, retry_after=None):
+        """Comme `report` (asyncio) : la transaction SQLite, s'il y en a une, s'exécute dans un thread."""
+        change = self._adaptation(url, status, retry_after)
+        if change:
+            await asyncio.to_thread(self._update, host_of(url), change)
+
+    def _adaptation(self, url, status, retry_after):
+        """Changement à appliquer au seau de l'hôte après une réponse (voir `_update`), ou None."""
+        host = host_of(url)
+        if status in THROTTLE_STATUSES:
+            self.healthy[host] = 0
+            pause = min(retry_after if retry_after is not None else DEFAULT_PAUSE, MAX_PAUSE)
+
+            def back_off(rate, tokens, updated_at, now):
+                # Les refus simultanés de plusieurs threads ne divisent le débit qu'une fois
+                if updated_at <= now:
+                    rate = max(self.min_rate, rate * BACKOFF_FACTOR)
+                return rate, min(tokens, 0.0), max(updated_at, now + pause), None
+            return back_off
+        if status < 400:
+            with self.lock:
+                self.healthy[host] = self.healthy.get(host, 0) + 1
+                if self.healthy[host] < INCREASE_AFTER:
+                    return None
+                self.healthy[host] = 0
+            return lambda rate, tokens, updated_at, now: (
+                min(self.max_rate, rate + self.increase_step), tokens, updated_at, None)
+        return None
+
+    def rate(self, url):
+        """Débit actuel (requêtes / seconde) pour l'hôte de `url`."""
+        return self._update(host_of(url), lambda rate, tokens, updated_at, now: (rate, tokens, updated_at, rate))
+
+    def close(self):
+        self.conn.close()
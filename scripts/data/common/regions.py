@@ -0,0 +1,118 @@
+"""
+Régions scrapées : ajouter une mer ou un pays revient à déclarer une Region.
+
+Les stratégies de lecture sont désignées par leur nom (voir LIST_EXTRACTORS
+et DETAIL_STRATEGIES dans `common.scraping`). Les types d'eau et pays par
+défaut sont repris par les étapes suivantes (add_water_type.py,
+add_med_data.py, deduplicate_*.py).
+
+La priorité d'une région (`precedence`) fixe l'ordre de déduplication : un
+poisson présent dans plusieurs régions appartient à la première, les
+suivantes n'en écrivent que la mise à jour. Une région n'est comparée
+qu'aux régions qui la précèdent (voir common.known_species), si bien que le
+résultat ne dépend pas de l'ordre dans lequel les scripts sont lancés.
+
+Chaque région garde dans son dossier un script de scraping qui se contente
+d'appeler `scrape_region` avec sa Region (scrape_regions.py les lance toutes
+en parallèle). Il sort avec le code 1 si rien n'a été écrit, pour que
+run_pipeline.py ne considère pas l'étape comme terminée.
+"""
+import os
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Surchargeable pour les tests hors ligne, comme MEDIAWIKI_API_URL
+BASE_URL = os.environ.get('WIKIPEDIA_BASE_URL', "https://fr.wikipedia.org")
+
+
+class Region:
+    """
+    Configuration d'une région :
+      - `directory` / `output_csv` : dossier de la région et CSV produit ;
+      - `list_path` : chemin de la page de liste sur Wikipedia ;
+      - `list_extractor` : lecture des tableaux de la liste (clé de LIST_EXTRACTORS) ;
+      - `details` : champs lus sur les pages de détail (clé de DETAIL_STRATEGIES) ;
+      - `water_types` / `countries` : valeurs par défaut des étapes suivantes ;
+      - `precedence` : rang dans l'ordre de déduplication (la plus petite valeur d'abord).
+    """
+
+    def __init__(self, name, directory, list_path, output_csv, list_extractor, details='description',
+                 water_types=(), countries=(), precedence=0):
+        self.name = name
+        self.directory = directory
+        self.list_path = list_path
+        self.output_csv = output_csv
+        self.list_extractor = list_extractor
+        self.details = details
+        self.water_types = list(water_types)
+        self.countries = list(countries)
+        self.precedence = precedence
+
+    @property
+    def list_url(self):
+        return BASE_URL + self.list_path
+
+    @property
+    def output_path(self):
+        return os.path.join(DATA_DIR, self.directory, self.output_csv)
+
+
+# Liste des pays avec un littoral sur la mer Méditerranée (codes ISO)
+MEDITERRANEAN_COUNTRIES = [
+    "AL", "DZ", "BA", "HR", "CY", "EG", "FR", "GR", "IL", "IT",
+    "LB", "LY", "MT", "MC", "ME", "MA", "PS", "SI", "ES", "SY", "TN", "TR"
+]
+
+# Liste non exhaustive mais représentative des pays bordant l'Atlantique
+ATLANTIC_COUNTRIES = [
+    "US", "CA", "MX", "BR", "AR", "PT", "ES", "FR", "IE", "GB", "IS", "NO",
+    "MA", "SN", "NG", "ZA", "GH", "CI", "LR", "SL", "GN", "GW", "GM", "EH",
+    "MR", "CV", "GL", "SR", "GY", "VE", "CO", "PA", "CR", "NI", "HN", "GT",
+    "BZ", "BS", "HT", "DO", "JM", "CU"
+]
+
+FRESHWATER = Region(
+    name="eau-douce",
+    directory="eau-douce-france-metropole",
+    list_path="/wiki/Liste_des_poissons_d%27eau_douce_en_France_m%C3%A9tropolitaine",
+    output_csv="poissons_france.csv",
+    # Un tableau par famille, sous un titre <h4>
+    list_extractor='family_sections',
+    details='infobox',
+    water_types=["fresh"],
+    countries=["FR"],
+    precedence=0,
+)
+
+MEDITERRANEE = Region(
+    name="mediterranee",
+    directory="mediterranee",
+    list_path="/wiki/Liste_des_poissons_de_la_mer_M%C3%A9diterran%C3%A9e",
+    output_csv="poissons_mediterranee.csv",
+    # Un seul tableau principal
+    list_extractor='first_species_table',
+    water_types=["salt"],
+    countries=MEDITERRANEAN_COUNTRIES,
+    precedence=1,
+)
+
+ATLANTIQUE = Region(
+    name="atlantique",
+    directory="atlantique",
+    list_path="/wiki/Liste_des_poissons_de_l%27oc%C3%A9an_Atlantique",
+    output_csv="poissons_atlantique.csv",
+    # Plusieurs tableaux de même structure
+    list_extractor='species_tables',
+    water_types=["salt"],
+    countries=ATLANTIC_COUNTRIES,
+    precedence=2,
+)
+
+REGIONS = {region.name: region for region in sorted((FRESHWATER, MEDITERRANEE, ATLANTIQUE),
+                                                    key=lambda region: region.precedence)}
+
+
+def regions_up_to(name):
+    """Noms des régions auxquelles `name` est comparée : celles qui la précèdent, puis elle-même."""
+    precedence = REGIONS[name].precedence
+    return [region.name for region in REGIONS.values() if region.precedence <= precedence]
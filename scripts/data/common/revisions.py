@@ -0,0 +1,163 @@
+"""
+Re-scraping incrémental guidé par les révisions Wikipedia.
+
+À côté de chaque CSV produit par un scraper, un fichier `<nom>.revisions.csv`
+garde pour chaque poisson l'URL de sa page, l'identifiant de révision vu lors
+du dernier passage et les en-têtes ETag / Last-Modified. À la relance, les
+révisions sont vérifiées par lots de 50 titres via l'API : seules les pages
+modifiées sont retéléchargées et réanalysées, les autres reprennent les
+valeurs du CSV précédent. Ces fichiers sont un état local du scraper (non
+versionnés, voir .gitignore) : les supprimer force un passage complet.
+
+Avec le backend « dump », les révisions viennent du dump frwiki extrait
+(common.wikidump) : seules les pages dont la révision du dump diffère de
+celle du dernier passage sont relues.
+"""
+import csv
+import os
+from contextlib import closing
+
+from .csv_stream import AtomicCsvWriter
+from .mediawiki import fetch_revision_ids, title_from_url
+from .metrics import stage
+
+REVISION_FIELDNAMES = ['key', 'url', 'revid', 'etag', 'last_modified']
+
+
+def revisions_file_for(csv_file):
+    return os.path.splitext(csv_file)[0] + '.revisions.csv'
+
+
+class RevisionStore:
+    """Révisions connues, indexées par nom scientifique (ou URL pour la page de liste)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.previous = {}
+        self.entries = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as infile:
+                self.previous = {row['key']: row for row in csv.DictReader(infile)}
+        except FileNotFoundError:
+            pass
+
+    def is_current(self, key, url, revid):
+        """Vrai si la page `url` de `key` n'a pas changé depuis le dernier passage."""
+        entry = self.previous.get(key)
+        return bool(entry and revid and entry['url'] == (url or '') and entry['revid'] == str(revid))
+
+    def url_for(self, key):
+        entry = self.previous.get(key)
+        return entry['url'] if entry else None
+
+    def update(self, key, url, revid=None, validators=None):
+        entry = {'key': key, 'url': url or '', 'revid': str(revid) if revid else ''}
+        etag, last_modified = validators or (None, None)
+        previous = self.previous.get(key)
+        if not validators and previous and previous['url'] == entry['url']:
+            etag, last_modified = previous.get('etag'), previous.get('last_modified')
+        entry['etag'] = etag or ''
+        entry['last_modified'] = last_modified or ''
+        self.entries[key] = entry
+
+    def validators(self, keys):
+        """Renvoie {url: (etag, last_modified)} connus pour les clés données."""
+        result = {}
+        for key in keys:
+            entry = self.previous.get(key)
+            if entry and entry['url'] and (entry.get('etag') or entry.get('last_modified')):
+                result[entry['url']] = (entry.get('etag') or None, entry.get('last_modified') or None)
+        return result
+
+    def save(self):
+        # Fichier temporaire renommé à la fin : une interruption laisse les révisions précédentes intactes
+        with AtomicCsvWriter(self.path, REVISION_FIELDNAMES) as writer:
+            for entry in self.entries.values():
+                writer.writerow(entry)
+
+
+def load_previous_rows(csv_file):
+    """Renvoie {nom scientifique: ligne} du CSV produit lors du dernier passage."""
+    try:
+        with open(csv_file, 'r', encoding='utf-8') as infile:
+            return {row['scientific_name']: row for row in csv.DictReader(infile)}
+    except FileNotFoundError:
+        return {}
+
+
+def scrape_incrementally(list_url, get_fish_list, fetch_details, detail_fields, output_csv, fetcher, write,
+                         fetch_revisions=fetch_revision_ids):
+    """
+    Passe chaque poisson, détails compris, à `write(fish)` dans l'ordre de la
+    liste, au fil de la réception des détails ; renvoie le RevisionStore à
+    sauvegarder une fois le CSV en place.
+
+    `get_fish_list(url)` n'est appelée que si la page de liste a changé ;
+    `fetch_details(fish_list, fetcher)` ne reçoit que les poissons dont la page
+    a changé et génère (poisson, détails reçus) dans le même ordre : seuls les
+    poissons reçus enregistrent la nouvelle révision, les autres seront relus
+    au prochain passage. Les champs `detail_fields` des autres sont repris du
+    CSV précédent. `fetch_revisions(titles, fetcher)` fournit les révisions
+    actuelles (API par défaut).
+    """
+    store = RevisionStore(revisions_file_for(output_csv))
+    previous_rows = load_previous_rows(output_csv)
+
+    list_title = title_from_url(list_url)
+    with stage('list'):
+        list_revid = fetch_revisions([list_title], fetcher).get(list_title)
+        if previous_rows and store.is_current(list_url, list_url, list_revid):
+            print("1/2 - Page de liste inchangée depuis le dernier passage, reprise du CSV précédent.")
+            fish_list = [dict(row, details_url=store.url_for(name)) for name, row in previous_rows.items()]
+        else:
+            fish_list = get_fish_list(list_url)
+    store.update(list_url, list_url, list_revid)
+
+    titles = {fish['scientific_name']: title_from_url(fish.get('details_url')) for fish in fish_list}
+    print(f"Vérification des révisions de {len(titles)} pages...")
+    with stage('revisions'):
+        revision_ids = fetch_revisions(titles.values(), fetcher)
+
+    to_fetch = []
+    # Poissons dont le CSV précédent a les valeurs : eux seuls peuvent accepter une réponse 304
+    with_previous = set()
+    for fish in fish_list:
+        name = fish['scientific_name']
+        # Les lignes précédentes ne sont plus retenues une fois reprises
+        previous = previous_rows.pop(name, None)
+        revid = revision_ids.get(titles[name])
+        if previous:
+            with_previous.add(name)
+            # Valeurs précédentes par défaut (page inchangée ou réponse 304)
+            for field in detail_fields:
+                fish[field] = previous.get(field, '')
+        if fish.get('details_url') and not (previous and store.is_current(name, fish['details_url'], revid)):
+            to_fetch.append(fish)
+        store.update(name, fish.get('details_url'), revid)
+
+    print(f"2/2 - Récupération des détails de {len(to_fetch)} pages modifiées ou nouvelles sur {len(fish_list)}, "
+          f"écriture au fil de l'eau...")
+    fetcher.validators.update(store.validators(fish['scientific_name'] for fish in to_fetch
+                                               if fish['scientific_name'] in with_previous))
+    fetching = {id(fish) for fish in to_fetch}
+    # Rendus dans l'ordre de to_fetch, lui-même dans l'ordre de fish_list
+    fetched = fetch_details(to_fetch, fetcher)
+    missing = 0
+    with stage('details'), closing(fetched):
+        for index, fish in enumerate(fish_list):
+            # Le poisson n'est plus retenu ici une fois écrit
+            fish_list[index] = None
+            if id(fish) in fetching:
+                fish, received = next(fetched)
+                name = fish['scientific_name']
+                if received:
+                    store.update(name, fish['details_url'], revision_ids.get(titles[name]),
+                                 fetcher.validators.get(fish['details_url']))
+                else:
+                    # Détails non reçus (erreur, délai dépassé, page absente) : révision vide, la page sera relue au prochain passage
+                    store.update(name, fish['details_url'])
+                    missing += 1
+            write(fish)
+    if missing:
+        print(f"-> {missing} pages non reçues, elles seront relues au prochain passage.")
+    return store
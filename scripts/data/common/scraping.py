@@ -0,0 +1,333 @@
+"""
+Cadre commun des scrapers Wikipedia par région.
+
+Une région (voir `common.regions`) décrit seulement ce qui la distingue :
+la page de liste, la façon d'en extraire les poissons (LIST_EXTRACTORS),
+les champs lus sur les pages de détail (DETAIL_STRATEGIES) et les types
+d'eau / pays par défaut. Le reste est partagé : téléchargement, re-scraping
+incrémental guidé par les révisions, écriture du CSV.
+
+`run_regions` lance plusieurs régions en parallèle dans un pool de
+processus : un rafraîchissement complet dure autant que la région la plus
+lente.
+"""
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from urllib.parse import urljoin
+
+import requests
+
+from .csv_stream import AtomicCsvWriter
+from .fetcher import PageFetcher
+from .html_parsing import parse_detail_page, parse_list_tables
+from .mediawiki import fetch_page_summaries, fetch_revision_ids, title_from_url
+from .metrics import instrument, observed_get, stage
+from .parse_pool import DEFAULT_PROCESSES, fetch_and_parse
+from .regions import BASE_URL, REGIONS
+from .revisions import scrape_incrementally
+from .wikidump import DumpPages, fetch_dump_revision_ids
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/109.0.0.0 Safari/537.36'
+}
+
+# Pages de détail téléchargées en parallèle et débit maximal (requêtes / seconde), par région
+SCRAPER_WORKERS = 8
+SCRAPER_RATE_LIMIT = 10
+# Processus d'analyse des pages de détail (backend "html") pour une région seule ; run_regions
+# partage les cœurs entre les régions lancées en parallèle
+PARSER_PROCESSES = DEFAULT_PROCESSES
+
+# Source des détails : "html" (une page par poisson), "api" (API MediaWiki, 50 titres par requête)
+# ou "dump" (pages extraites d'un dump frwiki par extract_wiki_dump.py, sans réseau)
+DETAILS_BACKEND = "html"
+DETAILS_BACKENDS = ['html', 'api', 'dump']
+
+FIELDNAMES = [
+    'name', 'name_en', 'scientific_name', 'common_names', 'family', 'category',
+    'habitat_types', 'water_types', 'depth_range_min', 'depth_range_max',
+    'temperature_range_min', 'temperature_range_max', 'geographic_zones',
+    'countries', 'fao_zones', 'average_size_cm', 'max_size_cm',
+    'average_weight_kg', 'max_weight_kg', 'rarity', 'icon_url', 'photo_url',
+    'description', 'fishbase_id', 'gbif_id'
+]
+
+
+def clean_text(text):
+    """Nettoie le texte en retirant les références comme [1], [2], etc."""
+    if not text:
+        return ""
+    return re.sub(r'\[\d+\]', '', text).strip()
+
+
+# --- Stratégies de lecture des pages de liste ---
+
+def extract_family_sections(soup):
+    """
+    Un tableau par famille, précédé d'un titre <h4> « Famille : ... » ; la
+    première cellule contient le nom vernaculaire et le nom scientifique.
+    """
+    fish_list = []
+    for header in soup.find_all('h4'):
+        header_text = header.get_text(strip=True)
+        if 'Famille' not in header_text:
+            continue
+
+        family = ""
+        if ':' in header_text:
+            family = header_text.split(':')[1].strip()
+
+        table = header.find_next('table', class_='wikitable')
+        if not table:
+            continue
+
+        for row in table.find('tbody').find_all('tr')[1:]:
+            cells = row.find_all('td')
+            if len(cells) < 1:
+                continue
+
+            cell_one = cells[0]
+
+            vernacular_name = cell_one.find(string=True, recursive=False)
+            if vernacular_name:
+                vernacular_name = vernacular_name.strip()
+            else:
+                vernacular_name = ""
+
+            scientific_name_tag = cell_one.find('i')
+            if not scientific_name_tag:
+                continue
+            scientific_name = scientific_name_tag.get_text(strip=True)
+
+            link_tag = cell_one.find('a')
+            details_url = None
+            if link_tag and 'href' in link_tag.attrs:
+                details_url = urljoin(BASE_URL, link_tag['href'])
+
+            fish_list.append({
+                'name': vernacular_name,
+                'scientific_name': scientific_name,
+                'family': family,
+                'details_url': details_url
+            })
+    return fish_list
+
+
+def extract_species_tables(soup, all_tables=True):
+    """
+    Tableaux 'wikitable sortable' à colonnes fixes : n°, famille, nom,
+    nom scientifique (lien), image. `all_tables=False` ne lit que le premier.
+    """
+    tables = soup.find_all('table', class_='wikitable sortable')
+    if not all_tables:
+        tables = tables[:1]
+
+    fish_list = []
+    for table in tables:
+        # On parcourt toutes les lignes du tableau, en sautant l'en-tête
+        for row in table.find('tbody').find_all('tr')[1:]:
+            cells = row.find_all('td')
+            if len(cells) < 5:  # S'assurer qu'on a assez de colonnes
+                continue
+
+            family = cells[1].get_text(strip=True)
+            name = cells[2].get_text(strip=True)
+
+            # Le nom scientifique et l'URL sont dans la 4ème colonne
+            scientific_name_cell = cells[3]
+            scientific_name_tag = scientific_name_cell.find('i')
+            link_tag = scientific_name_cell.find('a')
+
+            if scientific_name_tag and link_tag:
+                scientific_name = scientific_name_tag.get_text(strip=True)
+                details_url = urljoin(BASE_URL, link_tag['href'])
+
+                # L'URL de l'image est dans la 5ème colonne
+                photo_url = None
+                image_tag = cells[4].find('img')
+                if image_tag and 'src' in image_tag.attrs:
+                    photo_url = "https:" + image_tag['src']
+
+                fish_list.append({
+                    'name': name,
+                    'scientific_name': scientific_name,
+                    'family': family,
+                    'photo_url': photo_url,
+                    'icon_url': photo_url,  # On utilise la même pour l'icône
+                    'details_url': details_url
+                })
+    return fish_list
+
+
+# Stratégie de lecture de la page de liste : (fonction, garder les titres <h4>)
+LIST_EXTRACTORS = {
+    'family_sections': (extract_family_sections, True),
+    'first_species_table': (partial(extract_species_tables, all_tables=False), False),
+    'species_tables': (extract_species_tables, False),
+}
+
+
+def get_fish_list(region, url):
+    """Télécharge la page de liste et en extrait les poissons avec la stratégie de la région."""
+    print(f"1/2 - Récupération de la liste des poissons depuis {url}...")
+    try:
+        response = observed_get(requests.get, url, headers=HEADERS)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Erreur lors de la récupération de la liste : {e}")
+        return []
+
+    extract_list, with_headers = LIST_EXTRACTORS[region.list_extractor]
+    soup = parse_list_tables(response.content, with_headers=with_headers)
+    fish_list = extract_list(soup)
+
+    if not fish_list:
+        print("Erreur: Aucune liste de poissons n'a pu être extraite. La structure de la page a peut-être changé.")
+        return []
+
+    print(f"-> {len(fish_list)} poissons trouvés dans la liste.")
+    return fish_list
+
+
+# --- Stratégies de lecture des pages de détail ---
+
+def parse_description(content):
+    """Champs lus sur une page de détail pour la stratégie « description » (exécutée dans un processus d'analyse)."""
+    # Description : premier paragraphe de la page, sans construire l'arbre complet
+    description, _ = parse_detail_page(content, skip_empty=False, with_infobox=False)
+    return {'description': clean_text(description)}
+
+
+def parse_details(content):
+    """
+    Champs lus sur une page de détail pour la stratégie « infobox » :
+    description, URL de l'image et mesures de l'infobox.
+    """
+    # Premier paragraphe non vide et infobox, sans construire l'arbre complet
+    description, infobox = parse_detail_page(content)
+    details = {'description': clean_text(description), 'photo_url': '', 'max_size_cm': '', 'max_weight_kg': ''}
+
+    if infobox:
+        if infobox['image_src']:
+            details['photo_url'] = f"https:{infobox['image_src']}"
+
+        for header_text, value in infobox['rows']:
+            header_text = header_text.lower()
+            value_text = clean_text(value)
+            if 'taille' in header_text:
+                match = re.search(r'(\d+[\.,]?\d*)', value_text)
+                if match:
+                    details['max_size_cm'] = match.group(1).replace(',', '.')
+            if 'poids' in header_text or 'masse' in header_text:
+                match = re.search(r'(\d+[\.,]?\d*)', value_text)
+                if match:
+                    details['max_weight_kg'] = match.group(1).replace(',', '.')
+
+    return details
+
+
+def get_fish_summaries(fish_list, summaries, fields):
+    """
+    Reprend les champs `fields` des résumés de pages (API MediaWiki par lots
+    de 50 titres ou dump frwiki) ; `summaries` : fonction titres ->
+    {titre: résumé}, fetch_page_summaries ou DumpPages.summaries. Génère
+    (poisson, détails reçus) dans l'ordre de `fish_list`.
+    """
+    titles = [title_from_url(fish_data.get('details_url')) for fish_data in fish_list]
+    found = summaries(titles)
+    for fish_data, title in zip(fish_list, titles):
+        summary = found.get(title)
+        if summary:
+            fish_data.update((field, summary[field]) for field in fields)
+        yield fish_data, bool(summary)
+
+
+# Champs lus sur la page de détail (repris du CSV précédent si la page n'a pas changé) et analyse
+# d'une page HTML (backend "html") ; les backends "api" et "dump" lisent ces champs avec get_fish_summaries
+DETAIL_STRATEGIES = {
+    'description': {
+        'fields': ['description'],
+        'parse': parse_description,
+    },
+    'infobox': {
+        'fields': ['description', 'photo_url', 'max_size_cm', 'max_weight_kg'],
+        'parse': parse_details,
+    },
+}
+
+
+def fetch_details(strategy, backend, fish_list, fetcher, parser_processes=PARSER_PROCESSES):
+    """
+    Récupère les détails des poissons donnés avec la stratégie et le backend
+    choisis ; génère (poisson, détails reçus) dans l'ordre de `fish_list`
+    (page absente, erreur ou délai dépassé : non reçus). `parser_processes` :
+    processus d'analyse des pages HTML.
+    """
+    if backend == "html":
+        # Téléchargements dans les threads du fetcher, analyse dans un pool de processus, rendus au fil de l'eau
+        yield from fetch_and_parse(fetcher, fish_list, lambda fish_data: fish_data.get('details_url'),
+                                   strategy['parse'], dict.update, parser_processes)
+        return
+    if backend == "api":
+        yield from get_fish_summaries(fish_list, partial(fetch_page_summaries, fetcher=fetcher), strategy['fields'])
+    else:
+        with DumpPages() as pages:
+            yield from get_fish_summaries(fish_list, pages.summaries, strategy['fields'])
+
+
+def scrape_region(region, backend=DETAILS_BACKEND, parser_processes=PARSER_PROCESSES):
+    """
+    Scrape une région et écrit son CSV ; renvoie le nombre de poissons
+    écrits (0 si la liste est vide ou si le CSV n'a pas pu être écrit).
+    Les métriques sont écrites sous le nom d'étape de run_pipeline.py (« <région>:scrape »).
+    """
+    strategy = DETAIL_STRATEGIES[region.details]
+    with instrument(f"{region.name}:scrape"):
+        fetcher = PageFetcher(HEADERS, workers=SCRAPER_WORKERS, rate_limit=SCRAPER_RATE_LIMIT)
+        details = partial(fetch_details, strategy, backend, parser_processes=parser_processes)
+        revision_ids = fetch_dump_revision_ids if backend == "dump" else fetch_revision_ids
+        try:
+            # Un seul écrivain : chaque poisson est écrit dès que ses détails sont prêts (ou repris du CSV précédent)
+            with AtomicCsvWriter(region.output_path, FIELDNAMES, extrasaction='ignore') as writer:
+                # Seules les pages modifiées depuis le dernier passage sont retéléchargées
+                revisions = scrape_incrementally(region.list_url, partial(get_fish_list, region), details,
+                                                 strategy['fields'], region.output_path, fetcher, writer.writerow,
+                                                 revision_ids)
+                if not writer.count:
+                    # Liste vide : le CSV précédent est conservé
+                    writer.discard()
+        except IOError as e:
+            print(f"Erreur lors de l'écriture du fichier CSV : {e}")
+            return 0
+        finally:
+            fetcher.close()
+
+        if not writer.count:
+            print("Aucune donnée à sauvegarder.")
+            return 0
+        print(f"-> Succès ! Fichier {region.output_path} créé avec {writer.count} lignes.")
+        # Révisions enregistrées seulement une fois le CSV en place
+        with stage('write'):
+            revisions.save()
+    return writer.count
+
+
+def run_regions(names, processes=None, backend=DETAILS_BACKEND):
+    """
+    Scrape les régions données en parallèle ; renvoie {nom: nombre de
+    poissons ou exception}. Chaque région lancée en même temps reçoit sa part
+    des cœurs pour analyser ses pages (au moins un processus).
+    """
+    results = {}
+    concurrent = min(processes or len(names), len(names))
+    parser_processes = max(1, PARSER_PROCESSES // concurrent)
+    with ProcessPoolExecutor(max_workers=concurrent) as executor:
+        futures = {executor.submit(scrape_region, REGIONS[name], backend, parser_processes): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = e
+    return results
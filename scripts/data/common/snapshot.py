@@ -0,0 +1,129 @@
+"""
+Instantané colonnaire de l'export `species_registry_rows.csv`.
+
+Le CSV est converti en fichier Arrow IPC (format « file », non compressé)
+aux colonnes typées : tableaux -> list<string>, mesures -> float64,
+identifiants -> int64, dates -> timestamp UTC, le reste en texte (valeur
+vide -> null). Ce fichier s'ouvre en mémoire mappée : l'ouverture ne lit que
+les métadonnées et seules les colonnes demandées sont touchées, sans copie.
+Une copie Parquet (compressée, pour l'échange) peut aussi être écrite ;
+elle se relit par colonnes mais doit être décompressée.
+
+    table = open_snapshot(columns=['scientific_name', 'countries'])
+    names = table.column('scientific_name').to_pylist()
+
+Nécessite pyarrow (dépendance optionnelle : pip install pyarrow).
+"""
+import csv
+import os
+import re
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+
+from .csv_stream import AtomicWriter, chunked
+from .sql import parse_array_field
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REGISTRY_CSV = os.path.join(DATA_DIR, "species_registry_rows.csv")
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "species_registry.arrow")
+
+# Lignes converties par lot (un record batch Arrow par lot)
+BATCH_SIZE = 10_000
+
+
+def to_text(value):
+    return value if value != '' else None
+
+
+def to_float(value):
+    return float(value) if value else None
+
+
+def to_int(value):
+    return int(value) if value else None
+
+
+def to_timestamp(value):
+    """'2025-11-22 01:24:05.500597+00' (format Postgres) -> datetime avec fuseau."""
+    if not value:
+        return None
+    # fromisoformat n'accepte « +00 » qu'à partir de Python 3.11
+    if re.search(r'[+-]\d\d$', value):
+        value += ':00'
+    return datetime.fromisoformat(value)
+
+
+TEXT_LIST = pa.list_(pa.string())
+TIMESTAMP = pa.timestamp('us', tz='UTC')
+
+# Type Arrow et conversion depuis le texte du CSV ; colonnes absentes : texte
+COLUMN_TYPES = {
+    'habitat_types': (TEXT_LIST, parse_array_field),
+    'water_types': (TEXT_LIST, parse_array_field),
+    'geographic_zones': (TEXT_LIST, parse_array_field),
+    'countries': (TEXT_LIST, parse_array_field),
+    'fao_zones': (TEXT_LIST, parse_array_field),
+    'depth_range_min': (pa.float64(), to_float),
+    'depth_range_max': (pa.float64(), to_float),
+    'temperature_range_min': (pa.float64(), to_float),
+    'temperature_range_max': (pa.float64(), to_float),
+    'average_size_cm': (pa.float64(), to_float),
+    'max_size_cm': (pa.float64(), to_float),
+    'average_weight_kg': (pa.float64(), to_float),
+    'max_weight_kg': (pa.float64(), to_float),
+    'fishbase_id': (pa.int64(), to_int),
+    'gbif_id': (pa.int64(), to_int),
+    'created_at': (TIMESTAMP, to_timestamp),
+    'updated_at': (TIMESTAMP, to_timestamp),
+}
+TEXT_COLUMN = (pa.string(), to_text)
+
+
+def registry_schema(fieldnames):
+    """Schéma Arrow des colonnes du CSV, dans leur ordre."""
+    return pa.schema([pa.field(name, COLUMN_TYPES.get(name, TEXT_COLUMN)[0]) for name in fieldnames])
+
+
+def record_batch(rows, schema):
+    """Convertit une liste de lignes CSV (dictionnaires) en record batch typé."""
+    arrays = []
+    for field in schema:
+        convert = COLUMN_TYPES.get(field.name, TEXT_COLUMN)[1]
+        arrays.append(pa.array([convert(row[field.name]) for row in rows], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_snapshot(csv_file=REGISTRY_CSV, snapshot_file=SNAPSHOT_FILE, parquet_file=None):
+    """
+    Écrit l'instantané Arrow (et Parquet si `parquet_file`) du CSV, lu par
+    lots de BATCH_SIZE lignes. Renvoie le nombre de lignes.
+    """
+    count = 0
+    with open(csv_file, 'r', encoding='utf-8', newline='') as infile:
+        reader = csv.DictReader(infile)
+        schema = registry_schema(reader.fieldnames)
+        with AtomicWriter(snapshot_file, binary=True) as out, pa.ipc.new_file(out.file, schema) as writer:
+            for rows in chunked(reader, BATCH_SIZE):
+                writer.write_batch(record_batch(rows, schema))
+                count += len(rows)
+
+    if parquet_file:
+        # Relu depuis l'instantané en mémoire mappée, sans repasser par le CSV
+        with AtomicWriter(parquet_file, binary=True) as out:
+            pq.write_table(open_snapshot(snapshot_file), out.file, row_group_size=BATCH_SIZE)
+    return count
+
+
+def open_snapshot(path=SNAPSHOT_FILE, columns=None):
+    """
+    Ouvre un instantané et renvoie une `pyarrow.Table` limitée aux colonnes
+    demandées. Un fichier Arrow est mappé en mémoire (aucune donnée copiée),
+    un fichier .parquet n'est décompressé que pour ces colonnes.
+    """
+    if path.endswith('.parquet'):
+        return pq.read_table(path, columns=columns, memory_map=True)
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.select(columns) if columns else table
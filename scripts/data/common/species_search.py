@@ -0,0 +1,159 @@
+"""
+Recherche d'espèces insensible aux accents et tolérante aux fautes, côté
+Postgres.
+
+`search_setup_sql` génère (et les scripts appliquent) :
+  - les extensions `unaccent` et `pg_trgm` ;
+  - `species_search_text(text)` : texte en minuscules et sans accents
+    (fonction IMMUTABLE, utilisable dans un index) ;
+  - `species_names_text(jsonb)` : les noms de `common_names`, quelle que soit
+    leur forme (liste, objet par langue...), ramenés au même format et sans
+    répéter le nom français ni le nom anglais ;
+  - une colonne générée `search_text` (`species_search_document`) : name,
+    name_en, scientific_name et common_names normalisés, séparés par « | »
+    (le nom français en tête), avec un index GIN trigrammes ;
+  - `search_species(query, max_results)` : poissons dont un champ contient la
+    requête (nom qui commence par la requête, puis mot qui commence par la
+    requête, puis noms les plus courts), complétés si besoin par ceux dont un
+    mot lui ressemble (similarité de mots pg_trgm, la plus forte d'abord).
+
+Le texte normalisé est calculé une fois à l'écriture de la ligne : les lignes
+candidates renvoyées par l'index sont vérifiées et classées sans rappeler
+unaccent ni parcourir le JSON.
+
+Un `ilike('name', '%q%')` ne peut pas utiliser d'index B-tree (joker en tête)
+et ne trouve ni « epinoche » pour « Épinoche », ni les noms anglais.
+"""
+from .sql import REGISTRY_TABLE
+
+# Schéma des extensions sur Supabase
+DEFAULT_EXTENSION_SCHEMA = "extensions"
+
+SEARCH_COLUMN = "search_text"
+
+# Seuil de similarité de mots de `<%` (0,6 par défaut dans pg_trgm) : 0,5 tolère une
+# lettre oubliée ou remplacée (« brocet », « angille », « anquille »)
+WORD_SIMILARITY_THRESHOLD = 0.5
+
+# Longueur minimale de requête pour la recherche approchée (les plus courtes : sous-chaîne exacte)
+FUZZY_MIN_LENGTH = 4
+
+# Lignes candidates de la recherche approchée au plus (similarité calculée pour chacune)
+FUZZY_CANDIDATES = 200
+
+
+def split_table(table):
+    schema, _, name = table.rpartition('.')
+    return schema or 'public', name
+
+
+def search_setup_sql(table=REGISTRY_TABLE, extension_schema=DEFAULT_EXTENSION_SCHEMA):
+    """Instructions de mise en place de la recherche pour `table` (fonctions créées dans son schéma)."""
+    schema, name = split_table(table)
+    ext = extension_schema
+    column = SEARCH_COLUMN
+    return [
+        f"CREATE SCHEMA IF NOT EXISTS {ext}",
+        f"CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA {ext}",
+        f"CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA {ext}",
+
+        # unaccent() n'est que STABLE (dictionnaire modifiable) : on fixe le dictionnaire
+        # pour pouvoir l'utiliser dans une colonne générée
+        f"""CREATE OR REPLACE FUNCTION {schema}.species_search_text(value text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT lower({ext}.unaccent('{ext}.unaccent'::regdictionary, value)) $$""",
+
+        # Les noms déjà présents ailleurs (`known`, normalisés) ne sont pas répétés
+        f"""CREATE OR REPLACE FUNCTION {schema}.species_names_text(names jsonb, known text[] DEFAULT '{{}}')
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT string_agg(DISTINCT name, ' ')
+    FROM jsonb_path_query(names, 'strict $.** ? (@.type() == "string")') AS value,
+         LATERAL {schema}.species_search_text(value #>> '{{}}') AS name
+    WHERE name <> ALL (known)
+$$""",
+
+        # concat_ws() n'est que STABLE : même contournement que pour unaccent()
+        f"""CREATE OR REPLACE FUNCTION {schema}.species_search_document(
+    name text, name_en text, scientific_name text, common_names jsonb
+) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT concat_ws(' | ', n, e, sn, {schema}.species_names_text(common_names, array_remove(ARRAY[n, e], NULL)))
+    FROM (SELECT {schema}.species_search_text(name) AS n,
+                 {schema}.species_search_text(name_en) AS e,
+                 {schema}.species_search_text(scientific_name) AS sn) AS normalized
+$$""",
+
+        # Si une des fonctions ci-dessus change, les lignes existantes ne sont recalculées
+        # qu'à leur prochaine écriture (UPDATE ... SET name = name pour tout recalculer)
+        f"""ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} text GENERATED ALWAYS AS (
+    {schema}.species_search_document(name, name_en, scientific_name, common_names)
+) STORED""",
+
+        f"CREATE INDEX IF NOT EXISTS {name}_{column}_trgm_idx ON {table} USING gin ({column} {ext}.gin_trgm_ops)",
+
+        # Deux passages, requêtes construites avec la saisie en littéral (EXECUTE) : le planificateur
+        # estime la sélectivité réelle des motifs et passe par l'index trigrammes
+        #   1. sous-chaîne exacte (LIKE, motif échappé), classée sans calcul de similarité ;
+        #   2. si elle ne remplit pas la page, mots ressemblants (<%) parmi FUZZY_CANDIDATES candidats au plus :
+        #      recalculer la similarité de milliers de candidats coûtait plus que l'ILIKE remplacé
+        f"""CREATE OR REPLACE FUNCTION {schema}.search_species(query text, max_results integer DEFAULT 10)
+RETURNS SETOF {table}
+LANGUAGE plpgsql STABLE
+SET search_path = {schema}, {ext}
+SET pg_trgm.word_similarity_threshold = {WORD_SIMILARITY_THRESHOLD}
+AS $function$
+DECLARE
+    term text := {schema}.species_search_text(btrim(query));
+    escaped text;
+    found integer;
+BEGIN
+    IF term IS NULL OR term = '' OR max_results <= 0 THEN
+        RETURN;
+    END IF;
+    escaped := replace(replace(replace(term, '\\', '\\\\'), '%', '\\%'), '_', '\\_');
+
+    RETURN QUERY EXECUTE format($query$
+        SELECT s.*
+        FROM {table} AS s
+        WHERE s.{column} LIKE %1$L
+        ORDER BY (s.{column} LIKE %2$L)::int + (s.{column} LIKE %3$L)::int DESC, length(s.name), s.name
+        LIMIT %4$s
+    $query$, '%' || escaped || '%', escaped || '%', '% ' || escaped || '%', max_results);
+    GET DIAGNOSTICS found = ROW_COUNT;
+
+    -- En dessous de {FUZZY_MIN_LENGTH} caractères, presque tous les mots « ressemblent » à la requête
+    IF found >= max_results OR length(term) < {FUZZY_MIN_LENGTH} THEN
+        RETURN;
+    END IF;
+    -- CTE matérialisée : planifiée pour tous les candidats (parcours de l'index), lue seulement
+    -- jusqu'au plafond ; sous un simple LIMIT, le planificateur choisit un parcours séquentiel
+    -- en supposant les candidats répartis uniformément dans la table
+    RETURN QUERY EXECUTE format($query$
+        WITH candidates AS MATERIALIZED (
+            SELECT s FROM {table} AS s WHERE %1$L <%% s.{column}
+        )
+        SELECT (c.s).*
+        FROM (
+            SELECT s, word_similarity(%1$L, (s).{column}) AS similarity
+            FROM (SELECT s FROM candidates WHERE (s).{column} NOT LIKE %2$L LIMIT %3$s) AS bounded
+        ) AS c
+        ORDER BY c.similarity DESC, length((c.s).name), (c.s).name
+        LIMIT %4$s
+    $query$, term, '%' || escaped || '%', {FUZZY_CANDIDATES}, max_results - found);
+END
+$function$""",
+        f"ANALYZE {table}",
+    ]
+
+
+def extension_schema_of(cursor, default=DEFAULT_EXTENSION_SCHEMA):
+    """Schéma où unaccent / pg_trgm sont déjà installés (le premier trouvé), sinon `default`."""
+    cursor.execute(
+        "SELECT extnamespace::regnamespace::text FROM pg_extension "
+        "WHERE extname IN ('unaccent', 'pg_trgm') ORDER BY extname DESC LIMIT 1"
+    )
+    row = cursor.fetchone()
+    return row[0] if row else default
@@ -0,0 +1,121 @@
+"""
+Génération des scripts SQL de mise à jour de `public.species_registry`.
+
+Les poissons déjà présents en base reçoivent un type d'eau et une liste de
+pays supplémentaires. Plutôt que deux UPDATE par poisson (un aller-retour et
+une recherche d'index chacun), tous les noms sont réunis dans une seule
+instruction `UPDATE ... FROM (VALUES ...)`, exécutée dans une transaction.
+
+Les CSV des régions codent les tableaux de plusieurs façons ({a,b},
+{"a"}, ["a"]) : `parse_array_field` les ramène tous à une liste Python et
+`pg_array_literal` produit le format texte attendu par Postgres (COPY).
+"""
+import json
+
+REGISTRY_TABLE = "public.species_registry"
+
+
+def sql_literal(value):
+    """Chaîne SQL entre apostrophes (apostrophes internes doublées)."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def sql_text_array(values):
+    """Tableau SQL ARRAY['a','b'] à partir d'une liste de chaînes."""
+    return "ARRAY[" + ",".join(sql_literal(v) for v in values) + "]"
+
+
+def parse_array_field(value):
+    """
+    Liste Python à partir d'un champ tableau du CSV, quel que soit son format :
+    '' -> [], '{ES,FR}' / '{"salt"}' -> tableau Postgres, '["FR"]' -> JSON.
+    """
+    value = (value or '').strip()
+    if not value:
+        return []
+    if value.startswith('['):
+        try:
+            return [str(item) for item in json.loads(value)]
+        except ValueError:
+            value = value.strip('[]')
+    if value.startswith('{') and value.endswith('}'):
+        value = value[1:-1]
+    items = []
+    for item in value.split(','):
+        item = item.strip()
+        if len(item) >= 2 and item[0] == item[-1] == '"':
+            item = item[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+        if item:
+            items.append(item)
+    return items
+
+
+def pg_array_literal(items):
+    """Tableau au format texte de Postgres : {"a","b"} (None si vide)."""
+    if not items:
+        return None
+    quoted = ('"' + item.replace('\\', '\\\\').replace('"', '\\"') + '"' for item in items)
+    return "{" + ",".join(quoted) + "}"
+
+
+def json_field(value):
+    """Champ JSON du CSV pour une colonne jsonb (common_names) : '' si vide."""
+    if not value:
+        return ''
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class BulkRegistryUpdate:
+    """
+    Écrit au fil de l'eau une mise à jour ensembliste des poissons existants :
+
+        BEGIN;
+        UPDATE public.species_registry AS s
+        SET water_types = ..., countries = ...
+        FROM (VALUES ('Nom 1'), ('Nom 2'), ...) AS d(scientific_name)
+        WHERE s.scientific_name = d.scientific_name;
+        COMMIT;
+
+    `out` est un fichier ouvert en écriture ; `add()` ajoute un nom (les
+    doublons sont ignorés) et `finish()` termine l'instruction.
+    """
+
+    def __init__(self, out, water_type, countries, title):
+        self.out = out
+        self.water_type = water_type
+        self.countries = countries
+        self.title = title
+        self.names = set()
+
+    def _write_header(self):
+        self.out.write(
+            f"-- {self.title}\n"
+            "-- Une seule instruction pour tous les poissons, dans une transaction\n\n"
+            "BEGIN;\n\n"
+            f"UPDATE {REGISTRY_TABLE} AS s\n"
+            f"SET water_types = ARRAY(SELECT DISTINCT unnest(s.water_types || {sql_literal('{' + self.water_type + '}')})),\n"
+            f"    countries = ARRAY(SELECT DISTINCT unnest(s.countries || {sql_text_array(self.countries)}))\n"
+            "FROM (VALUES\n"
+        )
+
+    def add(self, scientific_name):
+        if scientific_name in self.names:
+            return
+        if not self.names:
+            self._write_header()
+        else:
+            self.out.write(",\n")
+        self.names.add(scientific_name)
+        self.out.write(f"    ({sql_literal(scientific_name)})")
+
+    def finish(self):
+        if self.names:
+            self.out.write(
+                "\n) AS d(scientific_name)\n"
+                "WHERE s.scientific_name = d.scientific_name;\n\n"
+                "COMMIT;\n"
+            )
+
+    @property
+    def count(self):
+        return len(self.names)
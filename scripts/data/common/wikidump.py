@@ -0,0 +1,229 @@
+"""
+Lecture hors ligne des pages de détail depuis un dump frwiki.
+
+Un dump « pages-articles » (frwiki-latest-pages-articles.xml.bz2, plusieurs
+Go) est lu en flux avec `iterparse` : chaque élément <page> est libéré dès
+qu'il est traité, la mémoire reste bornée quelle que soit la taille du dump.
+Seules les pages dont le titre est dans l'ensemble demandé (titres des pages
+de détail des listes régionales) voient leur wikitexte analysé ; leurs
+champs (description, photo, taille, poids) et leur identifiant de révision
+sont rangés dans une base SQLite (.cache/frwiki_pages.sqlite).
+
+Les redirections sont suivies : la cible d'un titre demandé est ajoutée à
+l'ensemble, et relue lors d'un passage supplémentaire si elle précédait la
+redirection dans le dump.
+
+Le backend de détails « dump » (common.scraping) lit ensuite cette base à
+la place du réseau, y compris pour les identifiants de révision du
+re-scraping incrémental.
+"""
+import bz2
+import os
+import sqlite3
+import time
+import xml.etree.ElementTree as ElementTree
+
+from .cache import CACHE_DIR
+from .csv_stream import chunked
+from .mediawiki import THUMBNAIL_SIZE
+from .wikitext import commons_thumbnail_url, first_paragraph, infobox_image, infobox_measures
+
+# Surchargeable (WIKI_DUMP_PAGES) pour garder plusieurs extractions côte à côte
+DEFAULT_PAGES_FILE = os.environ.get('WIKI_DUMP_PAGES', os.path.join(CACHE_DIR, "frwiki_pages.sqlite"))
+
+# Espace de noms des articles
+ARTICLE_NAMESPACE = '0'
+# Passages au plus sur le dump pour les cibles de redirection vues avant leur redirection
+MAX_PASSES = 3
+INSERT_BATCH = 1000
+# Lots de titres par requête de lecture (limite de variables SQLite)
+QUERY_BATCH = 500
+# Modèles marquant une page d'homonymie
+DISAMBIGUATION_MARKERS = ('{{homonymie', '{{Homonymie', '{{patronymie', '{{Patronymie')
+
+SCHEMA = """
+CREATE TABLE pages (
+    title TEXT PRIMARY KEY,
+    revid INTEGER,
+    description TEXT,
+    photo_url TEXT,
+    max_size_cm TEXT,
+    max_weight_kg TEXT
+);
+CREATE TABLE redirects (title TEXT PRIMARY KEY, target TEXT NOT NULL);
+CREATE TABLE metadata (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def open_dump(path):
+    """Flux binaire du dump, décompressé à la volée s'il est en .bz2."""
+    return bz2.open(path, 'rb') if path.endswith('.bz2') else open(path, 'rb')
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_pages(path):
+    """
+    Parcourt le dump et renvoie (titre, espace de noms, cible de redirection
+    ou None, identifiant de révision, wikitexte) pour chaque page.
+    """
+    with open_dump(path) as dump:
+        context = iter(ElementTree.iterparse(dump, events=('start', 'end')))
+        _, root = next(context)
+        for event, element in context:
+            if event != 'end' or _local(element.tag) != 'page':
+                continue
+            title = namespace = redirect = revid = text = None
+            for child in element:
+                tag = _local(child.tag)
+                if tag == 'title':
+                    title = child.text
+                elif tag == 'ns':
+                    namespace = child.text
+                elif tag == 'redirect':
+                    redirect = child.get('title')
+                elif tag == 'revision':
+                    for field in child:
+                        field_tag = _local(field.tag)
+                        if field_tag == 'id':
+                            revid = int(field.text)
+                        elif field_tag == 'text':
+                            text = field.text or ''
+            yield title, namespace, redirect, revid, text
+            # Libère la page traitée (et sa place dans la racine) pour borner la mémoire
+            element.clear()
+            root.clear()
+
+
+def page_summary(wikitext):
+    """Champs description / photo / mesures d'une page, ou None pour une page d'homonymie."""
+    if any(marker in wikitext for marker in DISAMBIGUATION_MARKERS):
+        return None
+    image = infobox_image(wikitext)
+    summary = {
+        'description': first_paragraph(wikitext),
+        'photo_url': commons_thumbnail_url(image, THUMBNAIL_SIZE) if image else '',
+    }
+    summary.update(infobox_measures(wikitext))
+    return summary
+
+
+def _scan(path, wanted):
+    """Un passage sur le dump : renvoie (pages, redirections, titres rencontrés) parmi `wanted`."""
+    pages = []
+    redirects = {}
+    seen = set()
+    for title, namespace, redirect, revid, text in iter_pages(path):
+        if namespace != ARTICLE_NAMESPACE or title not in wanted:
+            continue
+        seen.add(title)
+        if redirect:
+            redirects[title] = redirect
+            # La cible est lue si elle vient plus loin dans le dump, sinon au passage suivant
+            wanted.add(redirect)
+            continue
+        summary = page_summary(text)
+        if summary:
+            pages.append((title, revid, summary['description'], summary['photo_url'],
+                          summary['max_size_cm'], summary['max_weight_kg']))
+    return pages, redirects, seen
+
+
+def build_page_store(dump_path, titles, pages_file=DEFAULT_PAGES_FILE):
+    """
+    Extrait du dump les pages des `titles` (et de leurs cibles de
+    redirection) dans la base `pages_file` ; renvoie (pages, redirections).
+    """
+    directory = os.path.dirname(pages_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_file = pages_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    wanted = {title for title in titles if title}
+    found = set()
+    all_redirects = {}
+    conn = sqlite3.connect(tmp_file)
+    try:
+        conn.executescript(SCHEMA)
+        for _ in range(MAX_PASSES):
+            pages, redirects, seen = _scan(dump_path, set(wanted))
+            all_redirects.update(redirects)
+            for batch in chunked(pages, INSERT_BATCH):
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)", batch)
+            found.update(seen)
+            # Cibles de redirection pas encore lues : elles précédaient leur redirection
+            wanted = {target for target in all_redirects.values() if target not in found}
+            if not wanted:
+                break
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO redirects VALUES (?, ?)", all_redirects.items())
+            conn.executemany("INSERT INTO metadata VALUES (?, ?)", [
+                ('dump', os.path.abspath(dump_path)),
+                ('built_at', str(time.time())),
+            ])
+        page_count = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+    finally:
+        conn.close()
+    os.replace(tmp_file, pages_file)
+    return page_count, len(all_redirects)
+
+
+class DumpPages:
+    """Pages extraites d'un dump, au format de common.mediawiki."""
+
+    def __init__(self, pages_file=DEFAULT_PAGES_FILE):
+        if not os.path.exists(pages_file):
+            raise FileNotFoundError(f"pages du dump introuvables : {pages_file} (voir extract_wiki_dump.py)")
+        self.conn = sqlite3.connect(f"file:{pages_file}?mode=ro", uri=True)
+        self.redirects = dict(self.conn.execute("SELECT title, target FROM redirects"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+    def _resolve(self, title):
+        for _ in range(5):
+            if title not in self.redirects:
+                break
+            title = self.redirects[title]
+        return title
+
+    def _rows(self, titles, columns):
+        """{titre demandé: ligne} des pages trouvées, redirections suivies."""
+        resolved = {title: self._resolve(title) for title in dict.fromkeys(t for t in titles if t)}
+        rows = {}
+        for batch in chunked(list(set(resolved.values())), QUERY_BATCH):
+            placeholders = ', '.join('?' * len(batch))
+            for row in self.conn.execute(f"SELECT title, {columns} FROM pages WHERE title IN ({placeholders})", batch):
+                rows[row[0]] = row[1:]
+        return {title: rows[target] for title, target in resolved.items() if target in rows}
+
+    def summaries(self, titles):
+        """{titre demandé: {description, photo_url, max_size_cm, max_weight_kg}}, comme fetch_page_summaries."""
+        return {
+            title: {'description': description, 'photo_url': photo_url,
+                    'max_size_cm': max_size_cm, 'max_weight_kg': max_weight_kg}
+            for title, (description, photo_url, max_size_cm, max_weight_kg)
+            in self._rows(titles, 'description, photo_url, max_size_cm, max_weight_kg').items()
+        }
+
+    def revision_ids(self, titles):
+        """{titre demandé: identifiant de révision dans le dump}, comme fetch_revision_ids."""
+        return {title: revid for title, (revid,) in self._rows(titles, 'revid').items() if revid}
+
+    def close(self):
+        self.conn.close()
+
+
+def fetch_dump_revision_ids(titles, fetcher=None, pages_file=DEFAULT_PAGES_FILE):
+    """Identifiants de révision lus dans la base du dump (même signature que fetch_revision_ids)."""
+    with DumpPages(pages_file) as pages:
+        return pages.revision_ids(titles)
@@ -0,0 +1,123 @@
+"""
+Extraction des champs d'un article depuis son wikitexte : mesures de
+l'infobox (taille, poids), image principale et premier paragraphe en texte
+brut (pour les pages lues dans un dump, voir common.wikidump).
+"""
+import hashlib
+import html
+import re
+from urllib.parse import quote
+
+# Paramètre de modèle sur sa propre ligne : "| taille = 120 cm"
+TEMPLATE_PARAM_RE = re.compile(r'^\s*\|\s*([^=|\n]+?)\s*=\s*(.*?)\s*$', re.MULTILINE)
+NUMBER_RE = re.compile(r'(\d+[\.,]?\d*)')
+REFERENCE_RE = re.compile(r'<ref[^>/]*/>|<ref[^>]*>.*?</ref>', re.DOTALL)
+
+COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+# Modèle sans modèle imbriqué ({{...}}), tableau ({|...|}) et lien interne sans lien imbriqué ([[...]])
+INNER_TEMPLATE_RE = re.compile(r'\{\{([^{}]*)\}\}')
+TABLE_RE = re.compile(r'\{\|.*?\|\}', re.DOTALL)
+INNER_LINK_RE = re.compile(r'\[\[([^\[\]]*)\]\]')
+EXTERNAL_LINK_RE = re.compile(r'\[(?:https?:)?//[^\s\]]+\s*([^\]]*)\]')
+EMPHASIS_RE = re.compile(r"'{2,}")
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Liens internes qui ne sont pas du texte : fichiers, catégories, liens interlangues
+NON_TEXT_LINK_RE = re.compile(r'^\s*(?:fichier|file|image|catégorie|category|[a-z]{2,3}(?:-[a-z]+)?)\s*:', re.IGNORECASE)
+FILE_PREFIX_RE = re.compile(r'^\s*(?:fichier|file|image)\s*:\s*', re.IGNORECASE)
+# Modèles dont le texte fait partie de la phrase : {{lang|la|Esox lucius}}, {{unité|150|cm}}...
+TEXT_TEMPLATES = {'lang', 'langue', 'lien', 'nobr', 'unité', 'nombre', 'formatnum', 'date', 'siècle', 'nom scientifique'}
+
+COMMONS_THUMBNAIL_URL = "https://upload.wikimedia.org/wikipedia/commons/thumb"
+
+
+def parse_number(text):
+    """Renvoie le premier nombre de `text` avec un point décimal, ou ''."""
+    match = NUMBER_RE.search(text)
+    return match.group(1).replace(',', '.') if match else ''
+
+
+def infobox_measures(wikitext):
+    """
+    Renvoie {'max_size_cm', 'max_weight_kg'} à partir des paramètres
+    "taille" et "poids"/"masse" des modèles de l'article ('' si absents).
+    """
+    measures = {'max_size_cm': '', 'max_weight_kg': ''}
+    if not wikitext:
+        return measures
+    for name, value in TEMPLATE_PARAM_RE.findall(REFERENCE_RE.sub('', wikitext)):
+        name = name.lower()
+        if 'taille' in name and not measures['max_size_cm']:
+            measures['max_size_cm'] = parse_number(value)
+        if ('poids' in name or 'masse' in name) and not measures['max_weight_kg']:
+            measures['max_weight_kg'] = parse_number(value)
+    return measures
+
+
+def infobox_image(wikitext):
+    """Nom du fichier du paramètre "image" de l'infobox (« Esox lucius.jpg »), ou ''."""
+    for name, value in TEMPLATE_PARAM_RE.findall(wikitext or ''):
+        if name.lower() == 'image' and value:
+            value = FILE_PREFIX_RE.sub('', value.strip('[] ')).split('|', 1)[0]
+            return value.strip()
+    return ''
+
+
+def commons_thumbnail_url(filename, size):
+    """URL de la miniature Wikimedia Commons de `filename`, de `size` pixels de large."""
+    name = filename.strip().replace(' ', '_')
+    name = name[:1].upper() + name[1:]
+    digest = hashlib.md5(name.encode('utf-8')).hexdigest()
+    thumbnail = f"{size}px-{name}"
+    # Les SVG sont rendus en PNG
+    if name.lower().endswith('.svg'):
+        thumbnail += '.png'
+    return f"{COMMONS_THUMBNAIL_URL}/{digest[0]}/{digest[:2]}/{quote(name)}/{quote(thumbnail)}"
+
+
+def _template_text(match):
+    name, *params = match.group(1).split('|')
+    if name.strip().lower() not in TEXT_TEMPLATES:
+        return ''
+    positional = [param.strip() for param in params if '=' not in param]
+    if name.strip().lower() in ('lang', 'langue'):
+        positional = positional[1:]
+    return ' '.join(positional)
+
+
+def _link_text(match):
+    target, _, label = match.group(1).partition('|')
+    if NON_TEXT_LINK_RE.match(target):
+        return ''
+    return label.rsplit('|', 1)[-1] if label else target
+
+
+def _replace_innermost(pattern, replacement, text):
+    """Remplace `pattern` jusqu'à épuisement, des éléments les plus imbriqués vers l'extérieur."""
+    while True:
+        text, count = pattern.subn(replacement, text)
+        if not count:
+            return text
+
+
+def first_paragraph(wikitext):
+    """Premier paragraphe de texte de l'article, sans modèles, références ni balisage ; '' s'il n'y en a pas."""
+    if not wikitext:
+        return ''
+    text = REFERENCE_RE.sub('', COMMENT_RE.sub('', wikitext))
+    text = _replace_innermost(INNER_TEMPLATE_RE, _template_text, text)
+    text = TABLE_RE.sub('', text)
+    text = _replace_innermost(INNER_LINK_RE, _link_text, text)
+    text = EXTERNAL_LINK_RE.sub(r'\1', text)
+
+    paragraph = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or line[0] in '=*#:;|!{}_':
+            if paragraph:
+                break
+            continue
+        paragraph.append(line)
+    text = html.unescape(TAG_RE.sub('', EMPHASIS_RE.sub('', ' '.join(paragraph))))
+    text = re.sub(r'\s+', ' ', text)
+    return re.sub(r'\(\s+', '(', re.sub(r'\s+([,.)])', r'\1', text)).strip()
@@ -1,42 +1,63 @@
 import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.csv_stream import AtomicCsvWriter
+from common.known_species import KnownSpeciesRegistry
+from common.metrics import instrument
+from common.regions import FRESHWATER
+from common.sql import pg_array_literal
 
 # Le fichier à modifier
 CSV_FILE = "poissons_france_enrichi.csv"
 
+def set_water_types(rows):
+    """Assigne les valeurs formatées pour PostgreSQL, une ligne à la fois."""
+    for row in rows:
+        row['water_types'] = pg_array_literal(FRESHWATER.water_types)
+        row['countries'] = pg_array_literal(FRESHWATER.countries)
+        yield row
+
 def main():
     """
     Met à jour les colonnes 'water_types' et 'countries' pour toutes les lignes.
+    Le fichier est relu ligne par ligne et réécrit via un fichier temporaire ;
+    chaque poisson est enregistré dans le registre des espèces connues, contre
+    lequel les régions suivantes sont dédupliquées.
     """
     print(f"Lecture du fichier : {CSV_FILE}...")
     try:
-        with open(CSV_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            data = list(reader)
-            fieldnames = reader.fieldnames
+        infile = open(CSV_FILE, 'r', encoding='utf-8')
     except FileNotFoundError:
         print(f"Erreur : Le fichier '{CSV_FILE}' n'a pas été trouvé.")
-        return
+        sys.exit(1)
 
-    # S'assurer que les colonnes existent
-    if 'water_types' not in fieldnames or 'countries' not in fieldnames:
-        print("Erreur : Les colonnes 'water_types' et/ou 'countries' sont manquantes.")
-        return
+    with infile:
+        reader = csv.DictReader(infile)
+        fieldnames = reader.fieldnames
 
-    print("Mise à jour des colonnes 'water_types' et 'countries'...")
-    for row in data:
-        # Assigner les valeurs formatées pour PostgreSQL
-        row['water_types'] = '{"fresh"}'
-        row['countries'] = '{"FR"}'
+        # S'assurer que les colonnes existent
+        if 'water_types' not in fieldnames or 'countries' not in fieldnames:
+            print("Erreur : Les colonnes 'water_types' et/ou 'countries' sont manquantes.")
+            sys.exit(1)
 
-    print(f"Sauvegarde des modifications dans {CSV_FILE}...")
-    try:
-        with open(CSV_FILE, 'w', newline='', encoding='utf-8') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
-        print(f"-> Succès ! {len(data)} lignes ont été mises à jour.")
-    except IOError as e:
-        print(f"Erreur lors de l'écriture du fichier : {e}")
+        print("Mise à jour des colonnes 'water_types' et 'countries'...")
+        print(f"Sauvegarde des modifications dans {CSV_FILE}...")
+        try:
+            with KnownSpeciesRegistry() as registry:
+                registry.forget_region(FRESHWATER.name)
+                with AtomicCsvWriter(CSV_FILE, fieldnames) as writer:
+                    for row in set_water_types(reader):
+                        writer.writerow(row)
+                        registry.add(row['scientific_name'], FRESHWATER.name, row.get('gbif_id'))
+                # Registre mis à jour seulement une fois le fichier en place
+                registry.commit()
+            print(f"-> Succès ! {writer.count} lignes ont été mises à jour.")
+        except IOError as e:
+            print(f"Erreur lors de l'écriture du fichier : {e}")
+            sys.exit(1)
 
 if __name__ == "__main__":
-    main()
+    with instrument("eau-douce:water-types"):
+        main()
@@ -0,0 +1,267 @@
+"""
+Script SQL minimal de mise à jour de `public.species_registry` : seules les
+différences entre les CSV finaux des régions et l'export actuel de la table
+(species_registry_rows.csv) sont écrites.
+
+Chaque poisson est rapproché de la base par son nom scientifique, à défaut
+par son identifiant GBIF (espèce renommée). Les règles sont celles de
+load_species_registry.py : un champ vide du CSV n'efface jamais la base et
+les tableaux (types d'eau, pays...) sont complétés plutôt que remplacés.
+Une empreinte (SHA-1) de chaque ligne, valeurs normalisées, écarte d'emblée
+les poissons inchangés ; pour les autres, seules les colonnes modifiées sont
+écrites :
+  - les nouveaux poissons dans un seul INSERT ;
+  - les poissons modifiés dans un UPDATE ... FROM (VALUES ...) par ensemble
+    de colonnes modifiées.
+Le temps de chargement et les écritures en base suivent ainsi le volume des
+changements, pas la taille des CSV.
+
+L'export doit être récent (sinon les différences sont calculées contre un
+état périmé) ; le script produit est rejouable sans effet de bord.
+
+Usage :
+    python export_registry_delta.py
+    python export_registry_delta.py --registry autre_export.csv --output delta.sql
+    psql "$DATABASE_URL" -f registry_delta.sql
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.csv_stream import AtomicWriter
+from common.metrics import instrument, stage
+from common.sql import parse_array_field, pg_array_literal, sql_literal
+from load_species_registry import (ARRAY_COLUMNS, DEFAULT_INPUTS, DEFAULT_TABLE, INTEGER_COLUMNS, JSON_COLUMNS,
+                                   LOAD_COLUMNS, NUMERIC_COLUMNS, convert_value)
+
+REGISTRY_CSV = os.path.join(DATA_DIR, "species_registry_rows.csv")
+DEFAULT_OUTPUT = os.path.join(DATA_DIR, "registry_delta.sql")
+
+
+def column_type(column):
+    if column in ARRAY_COLUMNS:
+        return 'text[]'
+    if column in NUMERIC_COLUMNS:
+        return 'numeric'
+    if column in INTEGER_COLUMNS:
+        return 'integer'
+    if column in JSON_COLUMNS:
+        return 'jsonb'
+    return 'text'
+
+
+def normalize_value(column, value):
+    """
+    Valeur comparable d'une colonne, quel que soit le format du CSV :
+    liste pour les tableaux, JSON trié pour jsonb, texte de COPY sinon (None si vide).
+    """
+    if column in ARRAY_COLUMNS:
+        return parse_array_field(value)
+    value = convert_value(column, value)
+    if value is not None and column in JSON_COLUMNS:
+        value = json.dumps(json.loads(value), ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return value
+
+
+def normalize_row(row):
+    return {column: normalize_value(column, row.get(column)) for column in LOAD_COLUMNS}
+
+
+def row_hash(values):
+    """Empreinte des valeurs normalisées d'une ligne."""
+    digest = hashlib.sha1()
+    for column in LOAD_COLUMNS:
+        value = values[column]
+        digest.update(('\x1e'.join(value) if isinstance(value, list) else
+                       '\x00' if value is None else value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def read_incoming(paths):
+    """{nom scientifique: valeurs normalisées} des CSV finaux (la ligne du dernier fichier l'emporte)."""
+    rows = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as infile:
+            for row in csv.DictReader(infile):
+                if not row.get('scientific_name') or not row.get('name'):
+                    continue
+                rows[row['scientific_name']] = normalize_row(row)
+    return rows
+
+
+def read_registry(path):
+    """(lignes normalisées par nom scientifique, noms scientifiques par identifiant GBIF) de l'export."""
+    by_name = {}
+    by_gbif_id = {}
+    with open(path, 'r', encoding='utf-8') as infile:
+        for row in csv.DictReader(infile):
+            values = normalize_row(row)
+            by_name[row['scientific_name']] = values
+            if values['gbif_id']:
+                by_gbif_id.setdefault(values['gbif_id'], row['scientific_name'])
+    return by_name, by_gbif_id
+
+
+def merged_row(current, incoming):
+    """Ligne de la base après fusion de `incoming` (mêmes règles que load_species_registry.py)."""
+    merged = dict(current)
+    for column, value in incoming.items():
+        if column in ARRAY_COLUMNS:
+            merged[column] = current[column] + [item for item in value if item not in current[column]]
+        elif value is not None:
+            merged[column] = value
+    return merged
+
+
+def changed_columns(current, merged):
+    """{colonne: valeur à écrire} ; pour un tableau, seulement les éléments ajoutés."""
+    changes = {}
+    for column in LOAD_COLUMNS:
+        if merged[column] == current[column]:
+            continue
+        if column in ARRAY_COLUMNS:
+            changes[column] = merged[column][len(current[column]):]
+        else:
+            changes[column] = merged[column]
+    return changes
+
+
+def compute_delta(incoming, registry, registry_by_gbif_id):
+    """
+    Renvoie (lignes à insérer, {clé en base: colonnes modifiées}, poissons inchangés).
+    La clé en base est le nom scientifique de la ligne existante.
+    """
+    inserts = []
+    updates = {}
+    unchanged = 0
+    registry_hashes = {}
+    for name, values in incoming.items():
+        key = name if name in registry else registry_by_gbif_id.get(values['gbif_id'])
+        if key is None:
+            inserts.append(values)
+            continue
+        current = registry[key]
+        merged = merged_row(current, values)
+        if key not in registry_hashes:
+            registry_hashes[key] = row_hash(current)
+        if row_hash(merged) == registry_hashes[key]:
+            unchanged += 1
+            continue
+        updates[key] = changed_columns(current, merged)
+    return inserts, updates, unchanged
+
+
+def sql_value(column, value, cast=False):
+    if value is None:
+        return "NULL"
+    if column in ARRAY_COLUMNS:
+        value = pg_array_literal(value)
+        if value is None:
+            return "NULL"
+    literal = sql_literal(value)
+    return f"{literal}::{column_type(column)}" if cast else literal
+
+
+def write_inserts(out, table, inserts):
+    columns = ", ".join(LOAD_COLUMNS)
+    out.write(f"-- Nouveaux poissons ({len(inserts)})\n"
+              f"INSERT INTO {table} ({columns})\nVALUES\n")
+    out.write(",\n".join(
+        "    (" + ", ".join(sql_value(column, values[column]) for column in LOAD_COLUMNS) + ")"
+        for values in inserts
+    ))
+    out.write("\nON CONFLICT (scientific_name) DO NOTHING;\n\n")
+
+
+def assignment(column):
+    if column in ARRAY_COLUMNS:
+        # Complète le tableau sans doublons, même si la base a changé depuis l'export
+        return (f"{column} = COALESCE(r.{column}, '{{}}') "
+                f"|| ARRAY(SELECT unnest(d.{column}) EXCEPT SELECT unnest(COALESCE(r.{column}, '{{}}')))")
+    return f"{column} = d.{column}"
+
+
+def changed_condition(column):
+    """Vrai si la valeur de la base diffère encore : rejouer le script ne touche aucune ligne."""
+    if column in ARRAY_COLUMNS:
+        return f"NOT COALESCE(r.{column} @> d.{column}, false)"
+    return f"r.{column} IS DISTINCT FROM d.{column}"
+
+
+def write_updates(out, table, columns, rows):
+    """Un UPDATE ensembliste pour les poissons dont ce même ensemble de colonnes change."""
+    out.write(f"-- Poissons modifiés ({len(rows)}) : {', '.join(columns)}\n"
+              f"UPDATE {table} AS r\n"
+              f"SET {', '.join(assignment(column) for column in columns)},\n"
+              f"    updated_at = now()\n"
+              f"FROM (VALUES\n")
+    # Les types sont donnés sur la première ligne, Postgres les applique à toute la liste
+    out.write(",\n".join(
+        "    (" + ", ".join([sql_literal(key) + ("::text" if index == 0 else "")]
+                           + [sql_value(column, changes[column], cast=index == 0) for column in columns]) + ")"
+        for index, (key, changes) in enumerate(rows)
+    ))
+    out.write(f"\n) AS d(key, {', '.join(columns)})\n"
+              f"WHERE r.scientific_name = d.key\n"
+              f"  AND ({' OR '.join(changed_condition(column) for column in columns)});\n\n")
+
+
+def write_delta(path, table, inserts, updates):
+    groups = {}
+    for key, changes in updates.items():
+        groups.setdefault(tuple(column for column in LOAD_COLUMNS if column in changes), []).append((key, changes))
+    with AtomicWriter(path) as out:
+        out.write(f"-- Différences avec l'export de {table}, généré par export_registry_delta.py\n")
+        if not inserts and not updates:
+            out.write("-- Aucun changement.\n")
+            return
+        out.write("BEGIN;\n\n")
+        if inserts:
+            write_inserts(out, table, inserts)
+        for columns, rows in sorted(groups.items(), key=lambda group: -len(group[1])):
+            write_updates(out, table, columns, rows)
+        out.write("COMMIT;\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', help="CSV finaux à comparer (par défaut, ceux des trois régions)")
+    parser.add_argument('--registry', default=REGISTRY_CSV, help="export actuel de species_registry")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="script SQL à écrire")
+    parser.add_argument('--table', default=DEFAULT_TABLE)
+    args = parser.parse_args()
+
+    paths = args.inputs or [os.path.join(DATA_DIR, p) for p in DEFAULT_INPUTS]
+    missing = [p for p in paths + [args.registry] if not os.path.exists(p)]
+    if missing:
+        print(f"Erreur : fichier(s) introuvable(s) : {', '.join(missing)}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    with stage('read'):
+        incoming = read_incoming(paths)
+        registry, registry_by_gbif_id = read_registry(args.registry)
+    with stage('diff'):
+        inserts, updates, unchanged = compute_delta(incoming, registry, registry_by_gbif_id)
+    with stage('write'):
+        write_delta(args.output, args.table, inserts, updates)
+
+    cells = len(inserts) * len(LOAD_COLUMNS) + sum(len(changes) for changes in updates.values())
+    print(f"{len(incoming)} poissons comparés à {len(registry)} lignes de {args.registry} "
+          f"en {time.perf_counter() - start:.2f} s :")
+    print(f"  - {len(inserts)} à insérer, {len(updates)} à mettre à jour, {unchanged} inchangés")
+    print(f"  - {cells} valeurs écrites, contre {len(incoming) * len(LOAD_COLUMNS)} pour un rechargement complet")
+    print(f"-> Script écrit dans {args.output}.")
+
+
+if __name__ == "__main__":
+    with instrument("registry:delta"):
+        main()
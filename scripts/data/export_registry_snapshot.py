@@ -0,0 +1,58 @@
+"""
+Exporte `species_registry_rows.csv` en instantané colonnaire (Arrow IPC,
+et Parquet en option) aux colonnes typées, relisible en mémoire mappée avec
+`common.snapshot.open_snapshot`.
+
+Usage :
+    python export_registry_snapshot.py
+    python export_registry_snapshot.py --parquet species_registry.parquet
+    python export_registry_snapshot.py --input autre_export.csv --output autre.arrow
+
+Nécessite pyarrow (pip install pyarrow).
+"""
+import argparse
+import os
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.metrics import instrument
+
+
+def main():
+    try:
+        from common.snapshot import REGISTRY_CSV, SNAPSHOT_FILE, open_snapshot, write_snapshot
+    except ImportError:
+        print("Erreur : pyarrow n'est pas installé (pip install pyarrow).")
+        sys.exit(1)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default=REGISTRY_CSV, help="export CSV de species_registry")
+    parser.add_argument('--output', default=SNAPSHOT_FILE, help="instantané Arrow à écrire")
+    parser.add_argument('--parquet', help="écrire aussi une copie Parquet à ce chemin")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Erreur : Le fichier '{args.input}' n'a pas été trouvé.")
+        sys.exit(1)
+
+    print(f"Conversion de {args.input}...")
+    start = time.perf_counter()
+    count = write_snapshot(args.input, args.output, args.parquet)
+    elapsed = time.perf_counter() - start
+    print(f"-> {count} lignes écrites dans {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} Ko) en {elapsed:.2f} s.")
+    if args.parquet:
+        print(f"-> Copie Parquet : {args.parquet} ({os.path.getsize(args.parquet) / 1024:.0f} Ko).")
+
+    # Vérification : réouverture en mémoire mappée d'une seule colonne
+    start = time.perf_counter()
+    names = open_snapshot(args.output, columns=['scientific_name'])
+    print(f"-> Relu en {(time.perf_counter() - start) * 1000:.1f} ms ({names.num_rows} noms scientifiques).")
+
+
+if __name__ == "__main__":
+    with instrument("export_registry_snapshot"):
+        main()
@@ -0,0 +1,78 @@
+"""
+Extrait d'un dump frwiki les pages de détail des poissons, pour le backend
+de détails « dump » (scrape_regions.py --backend dump) : un rafraîchissement
+complet se fait alors sans une requête par poisson.
+
+Le dump « pages-articles » se télécharge sur
+https://dumps.wikimedia.org/frwiki/latest/frwiki-latest-pages-articles.xml.bz2
+Il est lu en flux (mémoire bornée) et seules les pages des titres cités par
+les listes régionales sont analysées. Ces titres viennent des pages de liste
+(une requête par région) et des fichiers `.revisions.csv` laissés en local
+par les passages précédents du scraper ; avec --offline, seulement de ces
+derniers (il faut donc avoir scrapé au moins une fois sur cette machine).
+
+Usage :
+    python extract_wiki_dump.py frwiki-latest-pages-articles.xml.bz2
+    python extract_wiki_dump.py dump.xml.bz2 --offline --output .cache/frwiki_pages.sqlite
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.mediawiki import title_from_url
+from common.metrics import instrument
+from common.regions import REGIONS
+from common.revisions import revisions_file_for
+from common.wikidump import DEFAULT_PAGES_FILE, build_page_store
+
+
+def region_titles(offline=False):
+    """Titres des pages de liste et de détail de toutes les régions."""
+    from common.scraping import get_fish_list
+
+    titles = set()
+    for region in REGIONS.values():
+        titles.add(title_from_url(region.list_url))
+        try:
+            with open(revisions_file_for(region.output_path), 'r', encoding='utf-8') as infile:
+                titles.update(title_from_url(row['url']) for row in csv.DictReader(infile))
+        except FileNotFoundError:
+            pass
+        if not offline:
+            titles.update(title_from_url(fish.get('details_url')) for fish in get_fish_list(region, region.list_url))
+    titles.discard(None)
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('dump', help="dump pages-articles (.xml ou .xml.bz2)")
+    parser.add_argument('--output', default=DEFAULT_PAGES_FILE, help="base SQLite des pages extraites")
+    parser.add_argument('--offline', action='store_true',
+                        help="titres tirés des .revisions.csv seulement, sans télécharger les listes")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.dump):
+        print(f"Erreur : Le dump '{args.dump}' n'a pas été trouvé.")
+        sys.exit(1)
+
+    titles = region_titles(args.offline)
+    if not titles:
+        print("Erreur : Aucun titre à extraire (listes injoignables et aucun .revisions.csv).")
+        sys.exit(1)
+
+    print(f"Lecture de {args.dump} pour {len(titles)} titres...")
+    start = time.perf_counter()
+    page_count, redirect_count = build_page_store(args.dump, titles, args.output)
+    print(f"-> {page_count} pages et {redirect_count} redirections écrites dans {args.output} "
+          f"en {time.perf_counter() - start:.1f} s.")
+
+
+if __name__ == "__main__":
+    with instrument("extract_wiki_dump"):
+        main()
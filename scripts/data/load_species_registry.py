@@ -0,0 +1,188 @@
+"""
+Charge les CSV finaux des régions dans `public.species_registry`.
+
+Les lignes sont envoyées en flux avec COPY dans une table temporaire, puis
+fusionnées en deux instructions dans une seule transaction :
+  - les poissons existants (même scientific_name) ne sont mis à jour que si
+    une valeur change ; un champ vide du CSV n'efface jamais la base et les
+    tableaux (types d'eau, pays...) sont complétés plutôt que remplacés ;
+  - les nouveaux poissons sont insérés.
+Les différents formats de tableaux des CSV ({a,b}, {"a"}, ["a"]) sont
+normalisés au passage. Si un poisson apparaît dans plusieurs fichiers, la
+ligne du dernier fichier l'emporte. Pour n'envoyer que les différences avec
+l'export actuel de la table, voir export_registry_delta.py.
+
+Nécessite psycopg 3 (pip install "psycopg[binary]"). Pour tester sur une
+base jetable, voir offline/species_registry.sql.
+
+Usage :
+    python load_species_registry.py --dsn postgresql://postgres@localhost/fishable_test
+    python load_species_registry.py mediterranee/poissons_mediterranee_deduplicate_enrichi.csv
+(la connexion peut aussi venir de DATABASE_URL)
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.metrics import instrument, stage
+from common.sql import parse_array_field, pg_array_literal
+
+DEFAULT_INPUTS = [
+    "eau-douce-france-metropole/poissons_france_enrichi.csv",
+    "mediterranee/poissons_mediterranee_deduplicate_enrichi.csv",
+    "atlantique/poissons_atlantique_deduplique_enrichi.csv",
+]
+DEFAULT_TABLE = "public.species_registry"
+STAGING_TABLE = "species_registry_staging"
+
+# Colonnes chargées (id, created_at et updated_at sont gérés par la base)
+LOAD_COLUMNS = [
+    'name', 'name_en', 'scientific_name', 'common_names', 'family', 'category',
+    'habitat_types', 'water_types', 'depth_range_min', 'depth_range_max',
+    'temperature_range_min', 'temperature_range_max', 'geographic_zones', 'countries',
+    'fao_zones', 'average_size_cm', 'max_size_cm', 'average_weight_kg', 'max_weight_kg',
+    'rarity', 'icon_url', 'photo_url', 'description', 'fishbase_id', 'gbif_id',
+]
+ARRAY_COLUMNS = {'habitat_types', 'water_types', 'geographic_zones', 'countries', 'fao_zones'}
+NUMERIC_COLUMNS = {
+    'depth_range_min', 'depth_range_max', 'temperature_range_min', 'temperature_range_max',
+    'average_size_cm', 'max_size_cm', 'average_weight_kg', 'max_weight_kg',
+}
+INTEGER_COLUMNS = {'fishbase_id', 'gbif_id'}
+JSON_COLUMNS = {'common_names'}
+
+
+def convert_value(column, value):
+    """Valeur du CSV -> texte accepté par COPY pour la colonne (None = NULL)."""
+    if column in ARRAY_COLUMNS:
+        return pg_array_literal(parse_array_field(value))
+    value = (value or '').strip()
+    if not value:
+        return None
+    if column in INTEGER_COLUMNS:
+        return str(int(float(value)))
+    if column in NUMERIC_COLUMNS:
+        return str(float(value.replace(',', '.')))
+    if column in JSON_COLUMNS:
+        try:
+            json.loads(value)
+        except ValueError:
+            # Liste simple de noms : stockée comme tableau JSON
+            value = json.dumps(parse_array_field(value), ensure_ascii=False)
+    return value
+
+
+def read_rows(paths):
+    """Lignes converties de tous les fichiers, une à la fois."""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as infile:
+            for row in csv.DictReader(infile):
+                if not row.get('scientific_name') or not row.get('name'):
+                    continue
+                yield tuple(convert_value(column, row.get(column)) for column in LOAD_COLUMNS)
+
+
+def merged_value(column):
+    """Nouvelle valeur d'une colonne : les tableaux sont complétés, les autres champs remplacés s'ils sont fournis."""
+    if column in ARRAY_COLUMNS:
+        return (f"CASE WHEN i.{column} IS NULL THEN r.{column} "
+                f"ELSE r.{column} || ARRAY(SELECT unnest(i.{column}) EXCEPT SELECT unnest(r.{column})) END")
+    return f"COALESCE(i.{column}, r.{column})"
+
+
+def changed_condition(column):
+    """Vrai si la ligne entrante modifie la colonne."""
+    if column in ARRAY_COLUMNS:
+        return f"(i.{column} IS NOT NULL AND NOT COALESCE(r.{column} @> i.{column}, false))"
+    return f"(i.{column} IS NOT NULL AND i.{column} IS DISTINCT FROM r.{column})"
+
+
+def merge_statements(table):
+    """Instructions de mise à jour (lignes modifiées seulement) et d'insertion."""
+    columns = ", ".join(LOAD_COLUMNS)
+    incoming = (
+        f"WITH incoming AS (SELECT DISTINCT ON (scientific_name) * FROM {STAGING_TABLE} "
+        f"ORDER BY scientific_name, load_order DESC)\n"
+    )
+    updated_columns = [c for c in LOAD_COLUMNS if c != 'scientific_name']
+    assignments = ",\n    ".join(f"{c} = {merged_value(c)}" for c in updated_columns)
+    changed = "\n    OR ".join(changed_condition(c) for c in updated_columns)
+    update = (
+        incoming
+        + f"UPDATE {table} AS r\nSET {assignments},\n    updated_at = now()\n"
+        f"FROM incoming AS i\n"
+        f"WHERE r.scientific_name = i.scientific_name\n"
+        f"  AND ({changed})"
+    )
+    insert = (
+        incoming
+        + f"INSERT INTO {table} ({columns})\n"
+        f"SELECT {columns} FROM incoming AS i\n"
+        f"WHERE NOT EXISTS (SELECT 1 FROM {table} AS r WHERE r.scientific_name = i.scientific_name)"
+    )
+    return update, insert
+
+
+def load(dsn, table, paths):
+    """Charge les fichiers ; renvoie (lignes lues, mises à jour, insertions, durée COPY, durée totale)."""
+    import psycopg
+
+    update_sql, insert_sql = merge_statements(table)
+    start = time.perf_counter()
+    with psycopg.connect(dsn) as conn, conn.cursor() as cursor:
+        cursor.execute(f"CREATE TEMP TABLE {STAGING_TABLE} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        cursor.execute(f"ALTER TABLE {STAGING_TABLE} ADD COLUMN load_order bigserial")
+
+        count = 0
+        with stage('copy'), cursor.copy(f"COPY {STAGING_TABLE} ({', '.join(LOAD_COLUMNS)}) FROM STDIN") as copy:
+            for values in read_rows(paths):
+                copy.write_row(values)
+                count += 1
+        copy_time = time.perf_counter() - start
+
+        with stage('merge'):
+            cursor.execute(update_sql)
+            updated = cursor.rowcount
+            cursor.execute(insert_sql)
+            inserted = cursor.rowcount
+        # La connexion valide la transaction à la sortie du bloc
+    return count, updated, inserted, copy_time, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('inputs', nargs='*', help="CSV à charger (par défaut, les CSV finaux des trois régions)")
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help="chaîne de connexion Postgres")
+    parser.add_argument('--table', default=DEFAULT_TABLE)
+    args = parser.parse_args()
+
+    if not args.dsn:
+        parser.error("indiquez --dsn ou la variable DATABASE_URL")
+    try:
+        import psycopg  # noqa: F401
+    except ImportError:
+        print("Erreur : psycopg n'est pas installé (pip install \"psycopg[binary]\").")
+        sys.exit(1)
+
+    paths = args.inputs or [os.path.join(DATA_DIR, p) for p in DEFAULT_INPUTS]
+    missing = [p for p in paths if not os.path.exists(p)]
+    if missing:
+        print(f"Erreur : fichier(s) introuvable(s) : {', '.join(missing)}")
+        sys.exit(1)
+
+    print(f"Chargement de {len(paths)} fichier(s) dans {args.table}...")
+    count, updated, inserted, copy_time, total_time = load(args.dsn, args.table, paths)
+    print(f"-> {count} lignes envoyées par COPY en {copy_time:.2f} s ({count / copy_time:.0f} lignes/s).")
+    print(f"-> {inserted} poissons ajoutés, {updated} mis à jour, {count - inserted - updated} inchangés ou en double "
+          f"({count / total_time:.0f} lignes/s au total).")
+
+
+if __name__ == "__main__":
+    with instrument("load_species_registry"):
+        main()
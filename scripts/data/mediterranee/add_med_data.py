@@ -1,14 +1,17 @@
 import csv
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.csv_stream import AtomicCsvWriter
+from common.metrics import instrument
+from common.regions import MEDITERRANEE
+from common.sql import pg_array_literal
 
 # Fichiers d'entrée et de sortie
 INPUT_CSV_FILE = "poissons_mediterranee.csv"
 OUTPUT_CSV_FILE = "poissons_mediterranee_enrichi.csv"
 
-# Liste des pays avec un littoral sur la mer Méditerranée (codes ISO)
-MEDITERRANEAN_COUNTRIES = [
-    "AL", "DZ", "BA", "HR", "CY", "EG", "FR", "GR", "IL", "IT",
-    "LB", "LY", "MT", "MC", "ME", "MA", "PS", "SI", "ES", "SY", "TN", "TR"
-]
 
 def list_to_postgres_array_string(py_list):
     """Formate une liste Python en une chaîne de tableau {a,b,c}."""
@@ -17,45 +20,51 @@ def list_to_postgres_array_string(py_list):
     # Format simple car les codes pays n'ont pas de caractères spéciaux
     return "{" + ",".join(py_list) + "}"
 
+def add_med_columns(rows, water_types_value, countries_value):
+    """Ajoute les types d'eau et les pays à chaque ligne, une ligne à la fois."""
+    for row in rows:
+        row['water_types'] = water_types_value
+        row['countries'] = countries_value
+        yield row
+
 def main():
     """
     Ajoute les types d'eau et les pays méditerranéens au fichier CSV.
+    Le fichier est lu et écrit ligne par ligne.
     """
     print(f"Lecture du fichier : {INPUT_CSV_FILE}...")
     try:
-        with open(INPUT_CSV_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            data = list(reader)
-            fieldnames = reader.fieldnames
+        infile = open(INPUT_CSV_FILE, 'r', encoding='utf-8')
     except FileNotFoundError:
         print(f"Erreur : Le fichier '{INPUT_CSV_FILE}' n'a pas été trouvé.")
-        return
+        sys.exit(1)
 
-    # S'assurer que les colonnes existent, sinon les ajouter
-    if 'water_types' not in fieldnames:
-        fieldnames.append('water_types')
-    if 'countries' not in fieldnames:
-        fieldnames.append('countries')
+    with infile:
+        reader = csv.DictReader(infile)
+        fieldnames = list(reader.fieldnames)
 
-    print("Mise à jour des colonnes 'water_types' et 'countries'...")
+        # S'assurer que les colonnes existent, sinon les ajouter
+        if 'water_types' not in fieldnames:
+            fieldnames.append('water_types')
+        if 'countries' not in fieldnames:
+            fieldnames.append('countries')
 
-    # Préparer les valeurs à ajouter
-    water_types_value = '{"salt"}'
-    countries_value = list_to_postgres_array_string(MEDITERRANEAN_COUNTRIES)
+        print("Mise à jour des colonnes 'water_types' et 'countries'...")
 
-    for row in data:
-        row['water_types'] = water_types_value
-        row['countries'] = countries_value
+        # Préparer les valeurs à ajouter
+        water_types_value = pg_array_literal(MEDITERRANEE.water_types)
+        countries_value = list_to_postgres_array_string(MEDITERRANEE.countries)
 
-    print(f"Sauvegarde des données enrichies dans {OUTPUT_CSV_FILE}...")
-    try:
-        with open(OUTPUT_CSV_FILE, 'w', newline='', encoding='utf-8') as outfile:
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(data)
-        print(f"-> Succès ! Fichier {OUTPUT_CSV_FILE} créé avec {len(data)} lignes mises à jour.")
-    except IOError as e:
-        print(f"Erreur lors de l'écriture du fichier : {e}")
+        print(f"Sauvegarde des données enrichies dans {OUTPUT_CSV_FILE}...")
+        try:
+            with AtomicCsvWriter(OUTPUT_CSV_FILE, fieldnames, extrasaction='ignore') as writer:
+                for row in add_med_columns(reader, water_types_value, countries_value):
+                    writer.writerow(row)
+            print(f"-> Succès ! Fichier {OUTPUT_CSV_FILE} créé avec {writer.count} lignes mises à jour.")
+        except IOError as e:
+            print(f"Erreur lors de l'écriture du fichier : {e}")
+            sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with instrument("mediterranee:add-data"):
+        main()
\ No newline at end of file
@@ -1,99 +1,95 @@
 import csv
+import os
+import sys
 
-# --- Fichiers de référence ---
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.csv_stream import AtomicCsvWriter, AtomicWriter
+from common.known_species import KnownSpeciesRegistry
+from common.metrics import instrument
+from common.regions import FRESHWATER, MEDITERRANEE
+from common.sql import BulkRegistryUpdate
+
+# --- Fichier de référence, lu seulement si le registre des espèces connues ne contient pas l'eau douce ---
 FRESHWATER_FILE = "../eau-douce-france-metropole/poissons_france_enrichi.csv"
+
+# --- Fichier d'entrée ---
 MED_FILE = "poissons_mediterranee_enrichi.csv"
 
 # --- Fichiers de sortie ---
 DEDUPLICATED_CSV_OUTPUT = "poissons_mediterranee_deduplique.csv"
 SQL_UPDATE_OUTPUT = "update_existing_fish.sql"
 
-# --- Données à ajouter ---
-MEDITERRANEAN_COUNTRIES = [
-    "AL", "DZ", "BA", "HR", "CY", "EG", "FR", "GR", "IL", "IT",
-    "LB", "LY", "MT", "MC", "ME", "MA", "PS", "SI", "ES", "SY", "TN", "TR"
-]
-
 def main():
     """
     Sépare les poissons de Méditerranée en "nouveaux" et "doublons",
     et génère un CSV pour les nouveaux et un SQL pour les doublons.
+    Le fichier est parcouru une seule fois, ligne par ligne.
     """
-    # 1. Lire tous les noms scientifiques des poissons d'eau douce
-    print(f"Lecture du fichier de référence : {FRESHWATER_FILE}")
-    try:
-        with open(FRESHWATER_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            freshwater_names = {row['scientific_name'] for row in reader}
-        print(f"-> {len(freshwater_names)} poissons d'eau douce trouvés.")
-    except FileNotFoundError:
-        print(f"Erreur : Le fichier '{FRESHWATER_FILE}' n'a pas été trouvé.")
-        return
-
-    # 2. Lire le fichier des poissons de Méditerranée et séparer les données
+    # 1. Ouvrir le fichier des poissons de Méditerranée
     print(f"Analyse du fichier des poissons de Méditerranée : {MED_FILE}")
     try:
-        with open(MED_FILE, 'r', encoding='utf-8') as infile:
-            reader = csv.DictReader(infile)
-            med_data = list(reader)
-            fieldnames = reader.fieldnames
+        infile = open(MED_FILE, 'r', encoding='utf-8')
     except FileNotFoundError:
         print(f"Erreur : Le fichier '{MED_FILE}' n'a pas été trouvé.")
-        return
-
-    new_fish_rows = []
-    duplicate_fish_names = []
-
-    for row in med_data:
-        if row['scientific_name'] in freshwater_names:
-            duplicate_fish_names.append(row['scientific_name'])
-        else:
-            new_fish_rows.append(row)
+        sys.exit(1)
 
-    print(f"Analyse terminée : {len(new_fish_rows)} nouveaux poissons et {len(duplicate_fish_names)} doublons trouvés.")
-
-    # 3. Écrire le nouveau fichier CSV dédupliqué
-    if new_fish_rows:
-        print(f"Génération du fichier CSV dédupliqué : {DEDUPLICATED_CSV_OUTPUT}")
+    # 2. Comparer chaque poisson au registre des espèces connues et écrire au fil de l'eau
+    with infile, KnownSpeciesRegistry() as registry:
         try:
-            with open(DEDUPLICATED_CSV_OUTPUT, 'w', newline='', encoding='utf-8') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(new_fish_rows)
-            print(f"-> Succès ! {len(new_fish_rows)} lignes écrites.")
-        except IOError as e:
-            print(f"Erreur lors de l'écriture du fichier CSV : {e}")
-    else:
-        print("Aucun nouveau poisson à ajouter dans le fichier CSV.")
-
-    # 4. Générer le fichier SQL de mise à jour pour les doublons
-    if duplicate_fish_names:
-        print(f"Génération du script SQL de mise à jour : {SQL_UPDATE_OUTPUT}")
-
-        # Formatte la liste des pays pour l'instruction ARRAY de SQL
-        countries_sql_array = "ARRAY[" + ",".join([f"'{c}'" for c in MEDITERRANEAN_COUNTRIES]) + "]"
-
+            seeded = registry.ensure_region(FRESHWATER.name, FRESHWATER_FILE)
+        except FileNotFoundError:
+            print(f"Erreur : Le fichier '{FRESHWATER_FILE}' n'a pas été trouvé.")
+            sys.exit(1)
+        if seeded:
+            print(f"-> Registre amorcé avec {seeded} poissons d'eau douce ({FRESHWATER_FILE}).")
+        # Relance : les poissons enregistrés par le passage précédent sont réévalués
+        registry.forget_region(MEDITERRANEE.name)
+
+        print(f"-> {registry.count()} poissons déjà connus dans le registre.")
+
+        reader = csv.DictReader(infile)
         try:
-            with open(SQL_UPDATE_OUTPUT, 'w', encoding='utf-8') as outfile:
-                outfile.write("-- Script pour mettre à jour les poissons existants avec les données de la Méditerranée\n\n")
-                for name in duplicate_fish_names:
-                    # Échapper les apostrophes dans le nom scientifique pour la requête SQL
-                    safe_name = name.replace("'", "''")
+            with AtomicCsvWriter(DEDUPLICATED_CSV_OUTPUT, reader.fieldnames) as csv_out, \
+                    AtomicWriter(SQL_UPDATE_OUTPUT) as sql_out:
+                duplicates = BulkRegistryUpdate(
+                    sql_out, MEDITERRANEE.water_types[0], MEDITERRANEE.countries,
+                    "Script pour mettre à jour les poissons existants avec les données de la Méditerranée",
+                )
+
+                for row in reader:
+                    known = registry.check_and_add(row['scientific_name'], MEDITERRANEE.name, row.get('gbif_id'))
+                    if known:
+                        # On met à jour la ligne existante, sous le nom avec lequel elle a été enregistrée
+                        duplicates.add(known.scientific_name)
+                    else:
+                        csv_out.writerow(row)
+
+                duplicates.finish()
+
+                # Un fichier vide n'est pas écrit (le précédent est conservé)
+                if not csv_out.count:
+                    csv_out.discard()
+                if not duplicates.count:
+                    sql_out.discard()
+        except IOError as e:
+            print(f"Erreur lors de l'écriture des fichiers : {e}")
+            sys.exit(1)
+        registry.commit()
 
-                    # Commande pour ajouter 'salt' au tableau water_types
-                    update_water_types = f"UPDATE public.species_registry SET water_types = ARRAY(SELECT DISTINCT unnest(water_types || '{{salt}}')) WHERE scientific_name = '{safe_name}';"
+    print(f"Analyse terminée : {csv_out.count} nouveaux poissons et {duplicates.count} doublons trouvés.")
 
-                    # Commande pour ajouter les pays méditerranéens
-                    update_countries = f"UPDATE public.species_registry SET countries = ARRAY(SELECT DISTINCT unnest(countries || {countries_sql_array})) WHERE scientific_name = '{safe_name}';"
+    # 3. Nouveau fichier CSV dédupliqué
+    if csv_out.count:
+        print(f"-> Succès ! {csv_out.count} lignes écrites dans {DEDUPLICATED_CSV_OUTPUT}.")
+    else:
+        print("Aucun nouveau poisson à ajouter dans le fichier CSV.")
 
-                    outfile.write(f"-- Mise à jour pour : {name}\n")
-                    outfile.write(update_water_types + "\n")
-                    outfile.write(update_countries + "\n\n")
-            print(f"-> Succès ! {len(duplicate_fish_names)} poissons à mettre à jour dans le fichier SQL.")
-        except IOError as e:
-            print(f"Erreur lors de l'écriture du fichier SQL : {e}")
+    # 4. Fichier SQL de mise à jour pour les doublons
+    if duplicates.count:
+        print(f"-> Succès ! {duplicates.count} poissons à mettre à jour dans le fichier SQL {SQL_UPDATE_OUTPUT}.")
     else:
         print("Aucun doublon trouvé, pas de script SQL généré.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with instrument("mediterranee:dedupe"):
+        main()
\ No newline at end of file
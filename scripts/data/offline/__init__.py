@@ -0,0 +1 @@
+"""Serveurs locaux et données de test pour exécuter les scripts sans réseau."""
@@ -0,0 +1,117 @@
+"""
+Vérifie que la déduplication des régions ne dépend pas de l'ordre dans
+lequel ses scripts sont lancés.
+
+Les CSV des régions (ceux du dépôt) sont copiés dans un dossier temporaire,
+puis add_water_type.py, deduplicate_and_update.py et
+deduplicate_atlantique.py y sont lancés dans chacun des ordres possibles,
+avec un registre des espèces connues neuf et partagé par les trois scripts
+(KNOWN_SPECIES_REGISTRY). Un poisson de l'Atlantique absent des autres
+régions est ajouté à l'entrée Méditerranée : nouvelle espèce scrapée, pas
+encore dans le CSV Méditerranée enrichi qui sert de référence à
+l'Atlantique, elle est au cœur des écarts possibles. Les fichiers produits
+doivent être identiques d'un ordre à l'autre ; sinon le script affiche les
+différences et échoue (code 1).
+
+Usage : python -m offline.check_dedupe_order
+"""
+import csv
+import filecmp
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if DATA_DIR not in sys.path:
+    sys.path.insert(0, DATA_DIR)
+
+from common.known_species import normalize_scientific_name
+
+# (dossier, script) de chaque étape, dans l'ordre de la chaîne
+SCRIPTS = [
+    ("eau-douce-france-metropole", "add_water_type.py"),
+    ("mediterranee", "deduplicate_and_update.py"),
+    ("atlantique", "deduplicate_atlantique.py"),
+]
+
+# Entrées copiées du dépôt (le CSV Méditerranée dédupliqué et enrichi sert de référence à l'Atlantique)
+MED_INPUT = "mediterranee/poissons_mediterranee_enrichi.csv"
+ATLANTIC_INPUT = "atlantique/poissons_atlantique.csv"
+OTHER_INPUTS = [
+    "eau-douce-france-metropole/poissons_france_enrichi.csv",
+    MED_INPUT,
+    "mediterranee/poissons_mediterranee_deduplicate_enrichi.csv",
+]
+INPUTS = OTHER_INPUTS + [ATLANTIC_INPUT]
+
+# Fichiers comparés d'un ordre à l'autre
+OUTPUTS = [
+    "eau-douce-france-metropole/poissons_france_enrichi.csv",
+    "mediterranee/poissons_mediterranee_deduplique.csv",
+    "mediterranee/update_existing_fish.sql",
+    "atlantique/poissons_atlantique_deduplique_enrichi.csv",
+    "atlantique/update_atlantic_duplicates.sql",
+]
+
+
+def read_rows(path):
+    with open(os.path.join(DATA_DIR, path), 'r', encoding='utf-8') as infile:
+        return list(csv.DictReader(infile))
+
+
+def atlantic_only_row():
+    """Premier poisson (par nom) de l'entrée Atlantique absent des autres régions."""
+    known = {normalize_scientific_name(row['scientific_name']) for path in OTHER_INPUTS for row in read_rows(path)}
+    rows = [row for row in read_rows(ATLANTIC_INPUT) if normalize_scientific_name(row['scientific_name']) not in known]
+    return min(rows, key=lambda row: row['scientific_name'])
+
+
+def run_order(order, workdir, extra_med_row):
+    """Lance les scripts dans `order` sur une copie des entrées ; renvoie le dossier de travail."""
+    for path in INPUTS:
+        os.makedirs(os.path.join(workdir, os.path.dirname(path)), exist_ok=True)
+        shutil.copyfile(os.path.join(DATA_DIR, path), os.path.join(workdir, path))
+    with open(os.path.join(workdir, MED_INPUT), 'r', encoding='utf-8') as infile:
+        fieldnames = csv.DictReader(infile).fieldnames
+    with open(os.path.join(workdir, MED_INPUT), 'a', encoding='utf-8', newline='') as outfile:
+        csv.DictWriter(outfile, fieldnames, extrasaction='ignore').writerow(extra_med_row)
+    env = dict(os.environ, KNOWN_SPECIES_REGISTRY=os.path.join(workdir, "known_species.sqlite"),
+               PIPELINE_METRICS_DIR=os.path.join(workdir, "metrics"))
+    for directory, script in order:
+        process = subprocess.run([sys.executable, os.path.join(DATA_DIR, directory, script)],
+                                 cwd=os.path.join(workdir, directory), env=env, capture_output=True, text=True)
+        if process.returncode != 0:
+            raise RuntimeError(f"{directory}/{script} en échec :\n{process.stdout}{process.stderr}")
+    return workdir
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        extra_med_row = atlantic_only_row()
+        print(f"Poisson de l'Atlantique ajouté à l'entrée Méditerranée : {extra_med_row['scientific_name']}")
+        orders = list(itertools.permutations(SCRIPTS))
+        workdirs = [run_order(order, os.path.join(tmp, str(index)), extra_med_row)
+                    for index, order in enumerate(orders)]
+        reference = workdirs[0]
+        differences = []
+        for order, workdir in zip(orders[1:], workdirs[1:]):
+            for path in OUTPUTS:
+                expected, actual = os.path.join(reference, path), os.path.join(workdir, path)
+                if os.path.exists(expected) != os.path.exists(actual) or \
+                        (os.path.exists(expected) and not filecmp.cmp(expected, actual, shallow=False)):
+                    differences.append(f"{path} ({' -> '.join(script for _, script in order)})")
+
+    print(f"{len(orders)} ordres comparés, {len(OUTPUTS)} fichiers par ordre.")
+    if differences:
+        print("Résultats différents de l'ordre de la chaîne :")
+        for difference in differences:
+            print(f"  - {difference}")
+        sys.exit(1)
+    print("-> Mêmes résultats quel que soit l'ordre.")
+
+
+if __name__ == "__main__":
+    main()
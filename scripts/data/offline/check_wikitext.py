@@ -0,0 +1,123 @@
+"""
+Vérifie la lecture du wikitexte (common.wikitext) utilisée par le backend
+de détails « dump ».
+
+Trois séries de contrôles :
+  - des cas écrits à la main (modèles imbriqués, références, liens,
+    tableaux, commentaires, image de l'infobox) ;
+  - les pages de offline/fixtures/mediawiki_pages.json : mesures lues dans
+    le wikitexte et pages d'homonymie écartées ;
+  - un aller-retour sur le corpus réel (offline/corpus.py) : le wikitexte
+    que offline/wiki_dump.py écrit pour chaque espèce doit redonner sa
+    description (aux blancs près), ses mesures et l'URL de sa miniature
+    Commons (celle de Wikipedia, à la taille près).
+Au moindre écart, le script affiche les différences et échoue (code 1).
+
+Usage : python -m offline.check_wikitext
+"""
+import json
+import os
+import re
+import sys
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if DATA_DIR not in sys.path:
+    sys.path.insert(0, DATA_DIR)
+
+from common.wikidump import THUMBNAIL_SIZE, page_summary
+from common.wikitext import first_paragraph, infobox_image, infobox_measures
+from offline.corpus import real_corpus
+from offline.wiki_dump import species_wikitext
+
+FIXTURE_FILE = os.path.join(DATA_DIR, "offline", "fixtures", "mediawiki_pages.json")
+
+# (fonction, wikitexte, résultat attendu)
+CASES = [
+    (first_paragraph,
+     "{{Infobox Poisson\n| image = [[Fichier:Esox lucius.jpg|thumb]]\n}}\n"
+     "Le '''Brochet''' ({{lang|la|Esox lucius}}) est un [[poisson]] des [[Esocidae|ésocidés]]"
+     "<ref name=\"fb\">FishBase</ref>.\n\nDeuxième paragraphe.",
+     "Le Brochet (Esox lucius) est un poisson des ésocidés."),
+    (first_paragraph,
+     "<!-- ébauche -->{{Taxobox {{nobr|x}} }}\n{| class=\"wikitable\"\n| a || b\n|}\n[[Catégorie:Poisson]]\n"
+     "La [[Perche commune]] mesure {{unité|50|cm}} selon [https://www.fishbase.se FishBase].\n== Description ==",
+     "La Perche commune mesure 50 cm selon FishBase."),
+    (first_paragraph, "{{Homonymie}}\n== Voir aussi ==\n* [[Loup]]", ""),
+    (infobox_image, "{{Infobox Poisson\n| image = [[Fichier:Esox lucius.jpg|thumb]]\n}}", "Esox lucius.jpg"),
+    (infobox_image, "{{Infobox Poisson\n| image = Image: Sander lucioperca.svg\n}}", "Sander lucioperca.svg"),
+    (infobox_image, "{{Infobox Poisson\n| nom = Sandre\n}}", ""),
+    (infobox_measures, "{{Infobox Poisson\n| taille = 1,2 m<ref>| poids = 3 kg</ref>\n| masse = 4,5 kg\n}}",
+     {'max_size_cm': '1.2', 'max_weight_kg': '4.5'}),
+    (infobox_measures, "", {'max_size_cm': '', 'max_weight_kg': ''}),
+]
+
+# Mesures attendues des pages de offline/fixtures/mediawiki_pages.json (None : page d'homonymie)
+FIXTURE_MEASURES = {
+    'Brochet': {'max_size_cm': '150', 'max_weight_kg': '28.4'},
+    'Sandre': {'max_size_cm': '100', 'max_weight_kg': '20'},
+    'Bar commun': {'max_size_cm': '', 'max_weight_kg': ''},
+    'Loup (homonymie)': None,
+}
+
+THUMBNAIL_SIZE_RE = re.compile(r'/\d+px-')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def check_cases():
+    differences = []
+    for function, wikitext, expected in CASES:
+        actual = function(wikitext)
+        if actual != expected:
+            differences.append(f"{function.__name__}({wikitext[:40]!r}...) : {actual!r} au lieu de {expected!r}")
+    return differences
+
+
+def check_fixtures():
+    with open(FIXTURE_FILE, 'r', encoding='utf-8') as infile:
+        pages = json.load(infile)['pages']
+    differences = []
+    for title, expected in FIXTURE_MEASURES.items():
+        summary = page_summary(pages[title]['wikitext'])
+        actual = summary and {field: summary[field] for field in ('max_size_cm', 'max_weight_kg')}
+        if actual != expected:
+            differences.append(f"{title} : {actual!r} au lieu de {expected!r}")
+    return differences
+
+
+def check_corpus_round_trip():
+    differences = []
+    for title, species in real_corpus().by_title.items():
+        summary = page_summary(species_wikitext(species))
+        expected = {
+            'description': species['description'],
+            'photo_url': THUMBNAIL_SIZE_RE.sub(f'/{THUMBNAIL_SIZE}px-', species['photo_url']),
+            'max_size_cm': species['max_size_cm'],
+            'max_weight_kg': species['max_weight_kg'],
+        }
+        for field, value in expected.items():
+            # Description comparée aux blancs près : first_paragraph les normalise (espaces insécables, ponctuation)
+            if field == 'description' and WHITESPACE_RE.sub('', summary[field]) == WHITESPACE_RE.sub('', value):
+                continue
+            if summary[field] != value:
+                differences.append(f"{title}, {field} : {summary[field]!r} au lieu de {value!r}")
+    return differences
+
+
+def main():
+    differences = []
+    for name, check in [("cas écrits à la main", check_cases), ("fixtures MediaWiki", check_fixtures),
+                        ("aller-retour sur le corpus", check_corpus_round_trip)]:
+        found = check()
+        print(f"{name} : {'OK' if not found else f'{len(found)} écarts'}")
+        differences.extend(found)
+
+    if differences:
+        print("Écarts de lecture du wikitexte :")
+        for difference in differences:
+            print(f"  - {difference}")
+        sys.exit(1)
+    print("-> Wikitexte lu comme attendu.")
+
+
+if __name__ == "__main__":
+    main()
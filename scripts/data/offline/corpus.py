@@ -0,0 +1,279 @@
+"""
+Corpus d'espèces servi par les serveurs locaux stub_wikipedia et stub_gbif.
+
+`real_corpus()` reconstitue les pages derrière les CSV existants : chaque
+poisson des CSV scrapés (poissons_france.csv, poissons_mediterranee.csv,
+poissons_atlantique.csv) retrouve sa ligne dans la page de liste de sa
+région (même structure de tableaux que sur Wikipedia), sa page de détail
+(premier paragraphe, infobox) et ses réponses GBIF (clé, nom anglais, pays,
+habitats) tirées des CSV enrichis et de species_registry_rows.csv.
+
+`synthetic_corpus(count)` démultiplie ce corpus jusqu'à `count` espèces
+(10k à 100k) en gardant la répartition entre régions et les doublons entre
+régions : la n-ième copie d'un poisson présent dans deux listes porte le
+même nom scientifique dans les deux. Les copies se distinguent par un
+suffixe en lettres accolé à l'épithète (« Salmo truttab ») : un suffixe
+numérique serait pris pour un auteur par `normalize_scientific_name`.
+"""
+import csv
+import hashlib
+import html
+import os
+import sys
+from collections.abc import Mapping
+from urllib.parse import quote, unquote
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if DATA_DIR not in sys.path:
+    sys.path.insert(0, DATA_DIR)
+
+from common.regions import REGIONS
+from common.sql import parse_array_field
+
+# Sources des réponses GBIF (les dernières complètent les premières)
+GBIF_SOURCES = [
+    "species_registry_rows.csv",
+    "eau-douce-france-metropole/poissons_france_enrichi.csv",
+    "mediterranee/poissons_mediterranee_deduplicate_enrichi.csv",
+    "atlantique/poissons_atlantique_deduplique_enrichi.csv",
+]
+
+# Types d'eau des CSV -> habitats renvoyés par GBIF (/species/{clé})
+HABITATS = {'fresh': 'FRESHWATER', 'salt': 'MARINE', 'brackish': 'BRACKISH'}
+
+# Écart entre les clés GBIF de deux copies d'une même espèce
+KEY_STRIDE = 100_000_000
+
+# Lignes par tableau pour les listes à plusieurs tableaux (atlantique)
+ROWS_PER_TABLE = 50
+
+# Habillage des pages (menus, boîtes de navigation) : une page Wikipedia réelle
+# pèse plusieurs centaines de Ko, dont l'essentiel hors du contenu utile
+CHROME_LINKS = 300
+PAGE_CHROME = "".join(
+    f'<div class="navbox"><table><tr><td><a href="/wiki/Lien_{i}">Lien {i}</a>'
+    f'<sup class="reference">[{i}]</sup></td></tr></table></div>'
+    for i in range(CHROME_LINKS)
+)
+
+
+def title_of(scientific_name):
+    """Titre de la page de détail (les scrapers suivent le lien du nom scientifique)."""
+    return scientific_name.replace(' ', '_')
+
+
+def letters(index):
+    """0 -> '', 1 -> 'b', ..., 26 -> 'ba' : suffixe unique par copie."""
+    text = ''
+    while index:
+        index, digit = divmod(index, 26)
+        text = chr(ord('a') + digit) + text
+    return text
+
+
+def stable_number(text, low, high):
+    """Nombre déterministe dans [low, high) tiré d'un texte."""
+    return low + int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16) % (high - low)
+
+
+def read_csv(relative_path):
+    try:
+        with open(os.path.join(DATA_DIR, relative_path), 'r', encoding='utf-8') as infile:
+            return list(csv.DictReader(infile))
+    except FileNotFoundError:
+        return []
+
+
+def load_gbif_records():
+    """{nom scientifique: {key, name_en, countries, habitats}} connus des CSV enrichis."""
+    records = {}
+    for path in GBIF_SOURCES:
+        for row in read_csv(path):
+            if not row.get('gbif_id'):
+                continue
+            record = records.setdefault(row['scientific_name'], {
+                'key': int(float(row['gbif_id'])), 'name_en': None, 'countries': [], 'habitats': []
+            })
+            record['name_en'] = row.get('name_en') or record['name_en']
+            record['countries'] = parse_array_field(row.get('countries')) or record['countries']
+            water_types = [HABITATS[w] for w in parse_array_field(row.get('water_types')) if w in HABITATS]
+            record['habitats'] = water_types or record['habitats']
+    return records
+
+
+class Corpus:
+    """Espèces par région, avec leurs pages et leurs réponses GBIF."""
+
+    def __init__(self, regions):
+        # {nom de région: [espèce, ...]} ; une espèce est un dictionnaire
+        self.regions = regions
+        self.by_title = {}
+        self.by_name = {}
+        self.by_key = {}
+        for species_list in regions.values():
+            for species in species_list:
+                self.by_title.setdefault(species['title'], species)
+                if species['gbif']:
+                    self.by_name.setdefault(species['scientific_name'], species)
+                    self.by_key.setdefault(species['gbif']['key'], species)
+        self.pages = CorpusPages(self)
+
+    @property
+    def count(self):
+        return sum(len(species_list) for species_list in self.regions.values())
+
+    def list_page(self, region_name):
+        """HTML de la page de liste, dans la structure lue par la stratégie de la région."""
+        region = REGIONS[region_name]
+        species_list = self.regions[region_name]
+        if region.list_extractor == 'family_sections':
+            body = family_sections_html(species_list)
+        elif region.list_extractor == 'first_species_table':
+            body = species_table_html(species_list)
+        else:
+            body = "".join(species_table_html(species_list[i:i + ROWS_PER_TABLE])
+                           for i in range(0, len(species_list), ROWS_PER_TABLE))
+        return page_html(REGIONS[region_name].list_path, body)
+
+    def detail_page(self, title):
+        """HTML de la page de détail, ou None si le titre est inconnu."""
+        species = self.by_title.get(title)
+        if species is None:
+            return None
+        image = ''
+        if species['photo_url']:
+            image = f'<tr><td colspan="2"><img src="{html.escape(species["photo_url"].removeprefix("https:"))}"></td></tr>'
+        infobox = (
+            '<table class="infobox_v2 infobox-biologie">'
+            f'<tr><th colspan="2">{html.escape(species["name"])}</th></tr>{image}'
+            f'<tr><th>Taille</th><td>{species["max_size_cm"]} cm<sup class="reference">[1]</sup></td></tr>'
+            f'<tr><th>Poids</th><td>{species["max_weight_kg"].replace(".", ",")} kg</td></tr>'
+            '</table>'
+        )
+        body = f'{infobox}<p>{html.escape(species["description"])}</p>'
+        return page_html(title, body)
+
+
+class CorpusPages(Mapping):
+    """Pages au format de offline/fixtures/mediawiki_pages.json, construites à la demande."""
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.list_titles = {unquote(region.list_path.rsplit('/', 1)[1]).replace('_', ' ') for region in REGIONS.values()}
+
+    def __getitem__(self, title):
+        species = self.corpus.by_title.get(title.replace(' ', '_'))
+        if species is None:
+            raise KeyError(title)
+        return {
+            'revid': stable_number(title, 1, 2 ** 31),
+            'extract': species['description'],
+            'thumbnail': species['photo_url'],
+            'wikitext': (f"{{{{Infobox Poisson\n| nom = {species['name']}\n| taille = {species['max_size_cm']} cm\n"
+                         f"| poids = {species['max_weight_kg']} kg\n}}}}\n"),
+        }
+
+    def get(self, title, default=None):
+        # Les pages de liste existent (révision stable) sans être des espèces
+        if title in self.list_titles:
+            return {'revid': stable_number(title, 1, 2 ** 31)}
+        try:
+            return self[title]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        return iter(self.corpus.by_title)
+
+    def __len__(self):
+        return len(self.corpus.by_title)
+
+
+def page_html(title, body):
+    return (
+        f'<!DOCTYPE html><html lang="fr"><head><meta charset="UTF-8"><title>{html.escape(title)}</title></head>'
+        f'<body><div id="content"><div class="mw-parser-output">{body}{PAGE_CHROME}</div></div></body></html>'
+    )
+
+
+def family_sections_html(species_list):
+    """Un titre « Famille : ... » et un tableau par famille (eau douce)."""
+    families = {}
+    for species in species_list:
+        families.setdefault(species['family'], []).append(species)
+    parts = []
+    for family, members in families.items():
+        rows = "".join(
+            f'<tr><td>{html.escape(s["name"])}<br><i><a href="/wiki/{quote(s["title"])}">'
+            f'{html.escape(s["scientific_name"])}</a></i></td><td>{html.escape(s["description"][:40])}</td></tr>'
+            for s in members
+        )
+        parts.append(f'<h4>Famille : {html.escape(family)}</h4>'
+                     f'<table class="wikitable"><tbody><tr><th>Nom</th><th>Remarque</th></tr>{rows}</tbody></table>')
+    return "".join(parts)
+
+
+def species_table_html(species_list):
+    """Tableau « wikitable sortable » : n°, famille, nom, nom scientifique, image."""
+    rows = "".join(
+        f'<tr><td>{index}</td><td>{html.escape(s["family"])}</td><td>{html.escape(s["name"])}</td>'
+        f'<td><i><a href="/wiki/{quote(s["title"])}">{html.escape(s["scientific_name"])}</a></i></td>'
+        f'<td>{image_cell(s)}</td></tr>'
+        for index, s in enumerate(species_list, 1)
+    )
+    return ('<table class="wikitable sortable"><tbody><tr><th>N°</th><th>Famille</th><th>Nom</th>'
+            f'<th>Nom scientifique</th><th>Image</th></tr>{rows}</tbody></table>')
+
+
+def image_cell(species):
+    if not species['photo_url']:
+        return ''
+    return f'<img src="{html.escape(species["photo_url"].removeprefix("https:"))}" width="120">'
+
+
+def species_from_row(row, gbif_records):
+    name = row['scientific_name']
+    return {
+        'name': row['name'] or name,
+        'scientific_name': name,
+        'title': title_of(name),
+        'family': row['family'],
+        'description': row['description'] or f"{name} est une espèce de poissons de la famille des {row['family']}.",
+        'photo_url': row.get('photo_url') or '',
+        'max_size_cm': row.get('max_size_cm') or str(stable_number(name, 10, 200)),
+        'max_weight_kg': row.get('max_weight_kg') or f"{stable_number(name, 1, 500) / 10:.1f}",
+        'gbif': gbif_records.get(name),
+    }
+
+
+def real_corpus():
+    """Les poissons des CSV scrapés de chaque région."""
+    gbif_records = load_gbif_records()
+    regions = {}
+    for name, region in REGIONS.items():
+        rows = read_csv(os.path.relpath(region.output_path, DATA_DIR))
+        regions[name] = [species_from_row(row, gbif_records) for row in rows if row.get('scientific_name')]
+    return Corpus(regions)
+
+
+def copy_of(species, copy):
+    """n-ième copie d'une espèce (la copie 0 est l'espèce elle-même)."""
+    if not copy:
+        return species
+    suffix = letters(copy)
+    scientific_name = species['scientific_name'] + suffix
+    gbif = species['gbif'] and dict(species['gbif'], key=species['gbif']['key'] + copy * KEY_STRIDE,
+                                    name_en=species['gbif']['name_en'] and f"{species['gbif']['name_en']} {suffix}")
+    return dict(species, name=f"{species['name']} {copy}", scientific_name=scientific_name,
+                title=title_of(scientific_name), gbif=gbif)
+
+
+def synthetic_corpus(count):
+    """`count` espèces au total, réparties entre régions comme dans le corpus réel."""
+    real = real_corpus()
+    regions = {}
+    for name, species_list in real.regions.items():
+        region_count = max(1, round(count * len(species_list) / real.count))
+        regions[name] = [copy_of(species_list[i % len(species_list)], i // len(species_list))
+                         for i in range(region_count)]
+    return Corpus(regions)
@@ -0,0 +1,37 @@
+-- Table species_registry minimale pour tester le chargeur sur un Postgres jetable
+-- (colonnes et types repris de lib/types.ts).
+--
+--   createdb fishable_test
+--   psql fishable_test -f offline/species_registry.sql
+--   python load_species_registry.py --dsn postgresql:///fishable_test
+
+CREATE TABLE IF NOT EXISTS public.species_registry (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text NOT NULL,
+    name_en text,
+    scientific_name text NOT NULL UNIQUE,
+    common_names jsonb,
+    family text,
+    category text,
+    habitat_types text[],
+    water_types text[],
+    depth_range_min numeric,
+    depth_range_max numeric,
+    temperature_range_min numeric,
+    temperature_range_max numeric,
+    geographic_zones text[],
+    countries text[],
+    fao_zones text[],
+    average_size_cm numeric,
+    max_size_cm numeric,
+    average_weight_kg numeric,
+    max_weight_kg numeric,
+    rarity text CHECK (rarity IN ('common', 'uncommon', 'rare', 'epic', 'legendary')),
+    icon_url text,
+    photo_url text,
+    description text,
+    fishbase_id integer,
+    gbif_id integer,
+    created_at timestamptz DEFAULT now(),
+    updated_at timestamptz DEFAULT now()
+);
@@ -0,0 +1,157 @@
+"""
+Serveur local imitant l'API GBIF (v1) pour l'enrichissement hors ligne.
+
+Il répond, pour les espèces d'un corpus (offline/corpus.py), aux endpoints
+utilisés par `common.gbif` :
+  - `/v1/species/match?name=...` : clé de l'espèce (matchType NONE sinon) ;
+  - `/v1/species/{clé}` : fiche avec ses habitats ;
+  - `/v1/species/{clé}/vernacularNames` : noms français et anglais ;
+  - `/v1/species/{clé}/distributions` : un enregistrement par pays.
+Les deux listes sont paginées comme l'API réelle (offset, limit=20 par
+défaut, endOfRecords, count).
+
+Avec `max_rate` (--max-rate), le serveur refuse au-delà de ce nombre de
+requêtes par seconde (429 et `Retry-After: 1`), comme une API qui se
+protège : de quoi observer le limiteur adaptatif de common.ratelimit.
+
+Usage : python -m offline.stub_gbif [port] [--species 10000] [--max-rate 20]
+puis GBIF_API_URL=http://127.0.0.1:<port>/v1 python enrich_med_gbif.py
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from offline.corpus import real_corpus, synthetic_corpus
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 1000
+
+SPECIES_PATH_RE = re.compile(r'^/v1/species/(\d+)(?:/(vernacularNames|distributions))?$')
+
+
+def paginate(results, params):
+    offset = int(params.get('offset', 0))
+    limit = min(int(params.get('limit', DEFAULT_PAGE_LIMIT)), MAX_PAGE_LIMIT)
+    return {
+        'offset': offset,
+        'limit': limit,
+        'endOfRecords': offset + limit >= len(results),
+        'count': len(results),
+        'results': results[offset:offset + limit],
+    }
+
+
+def match_response(corpus, params):
+    species = corpus.by_name.get(params.get('name', '').strip())
+    if species is None:
+        return {'confidence': 100, 'matchType': 'NONE', 'synonym': False}
+    return {
+        'usageKey': species['gbif']['key'],
+        'scientificName': species['scientific_name'],
+        'canonicalName': species['scientific_name'],
+        'rank': 'SPECIES',
+        'status': 'ACCEPTED',
+        'confidence': 99,
+        'matchType': 'EXACT',
+        'synonym': False,
+        'family': species['family'],
+    }
+
+
+def species_response(species, endpoint, params):
+    gbif = species['gbif']
+    if endpoint == 'vernacularNames':
+        names = [{'vernacularName': species['name'], 'language': 'fra', 'source': 'Stub'}]
+        if gbif['name_en']:
+            names.append({'vernacularName': gbif['name_en'], 'language': 'eng', 'source': 'Stub'})
+        return paginate(names, params)
+    if endpoint == 'distributions':
+        return paginate([{'locality': code, 'countryCode': code, 'source': 'Stub'} for code in gbif['countries']],
+                        params)
+    return {
+        'key': gbif['key'],
+        'scientificName': species['scientific_name'],
+        'canonicalName': species['scientific_name'],
+        'rank': 'SPECIES',
+        'taxonomicStatus': 'ACCEPTED',
+        'family': species['family'],
+        'habitats': gbif['habitats'],
+    }
+
+
+def make_handler(corpus, max_rate=None):
+    # Requêtes acceptées dans la seconde en cours : [début de la seconde, nombre]
+    window = [0.0, 0]
+    lock = threading.Lock()
+
+    def over_limit():
+        with lock:
+            now = time.monotonic()
+            if now - window[0] >= 1.0:
+                window[0], window[1] = now, 0
+            window[1] += 1
+            return window[1] > max_rate
+
+    class GbifHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # En-têtes et corps partent en deux écritures : sans cela, chaque réponse attend l'ACK différé (~40 ms)
+        disable_nagle_algorithm = True
+        request_count = 0
+        throttled_count = 0
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            GbifHandler.request_count += 1
+            if max_rate and over_limit():
+                GbifHandler.throttled_count += 1
+                self.send_response(429)
+                self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            data = None
+            if url.path == '/v1/species/match':
+                data = match_response(corpus, params)
+            else:
+                match = SPECIES_PATH_RE.match(url.path)
+                species = corpus.by_key.get(int(match.group(1))) if match else None
+                if species is not None:
+                    data = species_response(species, match.group(2), params)
+            if data is None:
+                self.send_error(404)
+                return
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return GbifHandler
+
+
+def start_server(corpus=None, port=0, max_rate=None):
+    """Démarre le serveur dans un thread et le renvoie (API sous `/v1`)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(corpus or real_corpus(), max_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('port', type=int, nargs='?', default=8084)
+    parser.add_argument('--species', type=int, help="corpus synthétique de cette taille")
+    parser.add_argument('--max-rate', type=float, help="requêtes par seconde au-delà desquelles répondre 429")
+    args = parser.parse_args()
+    corpus = synthetic_corpus(args.species) if args.species else real_corpus()
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(corpus, args.max_rate))
+    print(f"API GBIF locale ({len(corpus.by_key)} espèces) sur http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
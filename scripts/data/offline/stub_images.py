@@ -0,0 +1,94 @@
+"""
+Serveur local d'images pour tester common/images.py sans réseau.
+
+`GET /<dossiers>/<nom>-<largeur>x<hauteur>.<jpg|png>` renvoie une image
+générée à partir du nom : le même nom et la même taille donnent toujours
+les mêmes octets, quel que soit le dossier (plusieurs URL pour une même
+image, comme le « Defaut.svg » partagé par les scrapers). Les noms commençant
+par `missing` renvoient 404, l'extension `.html` une page qui n'est pas une
+image. `latency` simule le temps de réponse d'un serveur distant.
+
+Usage : python -m offline.stub_images [port]
+"""
+import hashlib
+import io
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from PIL import Image, ImageDraw
+
+IMAGE_PATH_RE = re.compile(r'/(?P<name>[\w.-]+)-(?P<width>\d+)x(?P<height>\d+)\.(?P<ext>jpg|png|html)$')
+CONTENT_TYPES = {'jpg': 'image/jpeg', 'png': 'image/png', 'html': 'text/html; charset=utf-8'}
+
+
+@lru_cache(maxsize=1024)
+def render_image(name, width, height, ext):
+    """Octets d'une image déterministe : fond et ellipse aux couleurs tirées du nom."""
+    seed = hashlib.md5(name.encode('utf-8')).digest()
+    image = Image.new('RGB', (width, height), tuple(seed[0:3]))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((width // 8, height // 4, width * 7 // 8, height * 3 // 4), fill=tuple(seed[3:6]))
+    draw.line((0, height - 1, width - 1, 0), fill=tuple(seed[6:9]), width=max(1, width // 50))
+    buffer = io.BytesIO()
+    if ext == 'jpg':
+        image.save(buffer, 'JPEG', quality=90)
+    else:
+        image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def render_path(path):
+    """(type de contenu, octets) servis pour `path`, ou None pour une 404."""
+    match = IMAGE_PATH_RE.search(urlparse(path).path)
+    if not match or match['name'].startswith('missing'):
+        return None
+    if match['ext'] == 'html':
+        return CONTENT_TYPES['html'], b"<html><body>Pas une image</body></html>"
+    return CONTENT_TYPES[match['ext']], render_image(match['name'], int(match['width']), int(match['height']), match['ext'])
+
+
+def make_handler(latency=0.0):
+    class ImageHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # En-têtes et corps partent en deux écritures : sans cela, chaque réponse attend l'ACK différé (~40 ms)
+        disable_nagle_algorithm = True
+        request_count = 0
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            ImageHandler.request_count += 1
+            if latency:
+                time.sleep(latency)
+            content = render_path(self.path)
+            if content is None:
+                self.send_error(404)
+                return
+            content_type, body = content
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return ImageHandler
+
+
+def start_server(port=0, latency=0.0):
+    """Démarre le serveur dans un thread et le renvoie (`server.server_port`)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8082
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler())
+    print(f"Images locales sur http://127.0.0.1:{port}/<nom>-<largeur>x<hauteur>.jpg")
+    server.serve_forever()
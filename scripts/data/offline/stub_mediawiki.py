@@ -0,0 +1,116 @@
+"""
+Serveur local imitant l'API MediaWiki (`action=query`) pour les tests hors ligne.
+
+Il sert les pages décrites dans `fixtures/mediawiki_pages.json` et reproduit
+les comportements utilisés par `common.mediawiki` : normalisation des titres,
+redirections, extraits limités à 20 par réponse avec continuation, images,
+propriétés de page, wikitexte et identifiants de révision.
+
+Usage : python -m offline.stub_mediawiki [port]
+puis MEDIAWIKI_API_URL=http://127.0.0.1:<port>/w/api.php python scraper.py
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'mediawiki_pages.json')
+
+# Limite de l'API réelle pour les extraits d'introduction
+EXTRACTS_LIMIT = 20
+
+
+def load_fixture(path=FIXTURE_FILE):
+    with open(path, 'r', encoding='utf-8') as infile:
+        return json.load(infile)
+
+
+def normalize_title(title):
+    title = title.replace('_', ' ').strip()
+    return title[:1].upper() + title[1:]
+
+
+def build_query_response(fixture, params):
+    """Construit la réponse JSON (formatversion=2) d'une requête action=query."""
+    titles = params.get('titles', '').split('|') if params.get('titles') else []
+    props = params.get('prop', '').split('|')
+    offset = int(params.get('excontinue', 0))
+    query = {'normalized': [], 'redirects': [], 'pages': []}
+
+    resolved = []
+    for title in titles:
+        normalized = normalize_title(title)
+        if normalized != title:
+            query['normalized'].append({'from': title, 'to': normalized})
+        target = fixture.get('redirects', {}).get(normalized)
+        if target:
+            query['redirects'].append({'from': normalized, 'to': target})
+            normalized = target
+        if normalized not in resolved:
+            resolved.append(normalized)
+
+    for index, title in enumerate(resolved):
+        data = fixture['pages'].get(title)
+        if data is None:
+            query['pages'].append({'title': title, 'missing': True})
+            continue
+        page = {'pageid': index + 1, 'title': title}
+        # Comme l'API réelle, les extraits n'arrivent que par paquets de 20
+        if 'extracts' in props and offset <= index < offset + EXTRACTS_LIMIT and 'extract' in data:
+            page['extract'] = data['extract']
+        if offset == 0:
+            if 'info' in props:
+                page['lastrevid'] = data.get('revid', 1)
+            if 'pageimages' in props and data.get('thumbnail'):
+                page['thumbnail'] = {'source': data['thumbnail'], 'width': 250, 'height': 166}
+            if 'pageprops' in props and data.get('disambiguation'):
+                page['pageprops'] = {'disambiguation': ''}
+            if 'revisions' in props and 'wikitext' in data:
+                page['revisions'] = [{'slots': {'main': {'content': data['wikitext']}}}]
+        query['pages'].append(page)
+
+    response = {'batchcomplete': True, 'query': query}
+    if 'extracts' in props and offset + EXTRACTS_LIMIT < len(resolved):
+        response = {'continue': {'excontinue': offset + EXTRACTS_LIMIT, 'continue': '||'}, 'query': query}
+    return response
+
+
+def make_handler(fixture):
+    class MediaWikiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        request_count = 0
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            MediaWikiHandler.request_count += 1
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path != '/w/api.php' or params.get('action') != 'query':
+                self.send_error(404)
+                return
+            body = json.dumps(build_query_response(fixture, params)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MediaWikiHandler
+
+
+def start_server(fixture=None, port=0):
+    """Démarre le serveur dans un thread et le renvoie (`server.server_port`)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(fixture or load_fixture()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8081
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(load_fixture()))
+    print(f"API MediaWiki locale sur http://127.0.0.1:{port}/w/api.php")
+    server.serve_forever()
@@ -0,0 +1,89 @@
+"""
+Serveur local imitant fr.wikipedia.org pour les scrapers et les benchmarks.
+
+Il sert un corpus (offline/corpus.py) :
+  - `/wiki/<page de liste>` : la liste de chaque région, dans la structure
+    de tableaux que lit sa stratégie (LIST_EXTRACTORS) ;
+  - `/wiki/<Nom_scientifique>` : la page de détail de chaque poisson ;
+  - `/w/api.php` : l'API MediaWiki de offline/stub_mediawiki.py (révisions,
+    extraits, images, wikitexte) sur les mêmes pages.
+
+Usage : python -m offline.stub_wikipedia [port] [--species 10000]
+puis WIKIPEDIA_BASE_URL=http://127.0.0.1:<port>
+     MEDIAWIKI_API_URL=http://127.0.0.1:<port>/w/api.php python scrape_regions.py
+(sans --species : les poissons des CSV existants)
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from offline.corpus import real_corpus, synthetic_corpus
+from offline.stub_mediawiki import build_query_response
+from common.regions import REGIONS
+
+
+def make_handler(corpus):
+    list_pages = {unquote(region.list_path): name for name, region in REGIONS.items()}
+    rendered_lists = {}
+    fixture = {'pages': corpus.pages, 'redirects': {}}
+
+    class WikipediaHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # En-têtes et corps partent en deux écritures : sans cela, chaque réponse attend l'ACK différé (~40 ms)
+        disable_nagle_algorithm = True
+        request_count = 0
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_body(self, body, content_type):
+            body = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            WikipediaHandler.request_count += 1
+            url = urlparse(self.path)
+            if url.path == '/w/api.php':
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                self.send_body(json.dumps(build_query_response(fixture, params)), 'application/json; charset=utf-8')
+                return
+
+            path = unquote(url.path)
+            region_name = list_pages.get(path)
+            if region_name:
+                # Pages de liste volumineuses : construites une seule fois
+                if region_name not in rendered_lists:
+                    rendered_lists[region_name] = corpus.list_page(region_name)
+                page = rendered_lists[region_name]
+            else:
+                page = corpus.detail_page(path.removeprefix('/wiki/')) if path.startswith('/wiki/') else None
+            if page is None:
+                self.send_error(404)
+                return
+            self.send_body(page, 'text/html; charset=UTF-8')
+
+    return WikipediaHandler
+
+
+def start_server(corpus=None, port=0):
+    """Démarre le serveur dans un thread et le renvoie (`server.server_port`)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(corpus or real_corpus()))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('port', type=int, nargs='?', default=8083)
+    parser.add_argument('--species', type=int, help="corpus synthétique de cette taille")
+    args = parser.parse_args()
+    corpus = synthetic_corpus(args.species) if args.species else real_corpus()
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(corpus))
+    print(f"Wikipedia locale ({corpus.count} poissons) sur http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,93 @@
+"""
+Dump frwiki factice (format pages-articles) construit à partir d'un corpus
+(offline/corpus.py), pour essayer extract_wiki_dump.py et le backend de
+détails « dump » sans télécharger le vrai dump.
+
+Chaque espèce a sa page (infobox avec image, taille et poids, puis un
+paragraphe d'introduction) et les pages de liste existent. Une espèce sur
+REDIRECT_EVERY a sa page sous un autre titre, précédant la redirection
+depuis le titre cité par la liste (relue au second passage), et `filler`
+pages sans rapport (dont des pages hors espace de noms principal)
+grossissent le dump pour observer la mémoire sur un gros fichier.
+
+Usage : python -m offline.wiki_dump dump.xml.bz2 [--species 10000] [--filler 100000]
+"""
+import argparse
+import bz2
+import html
+from urllib.parse import unquote
+
+from common.regions import REGIONS
+from offline.corpus import real_corpus, stable_number, synthetic_corpus
+
+EXPORT_NAMESPACE = "http://www.mediawiki.org/xml/export-0.11/"
+REDIRECT_EVERY = 10
+
+
+def page_xml(title, wikitext=None, redirect=None, namespace=0):
+    revid = stable_number(title, 1, 2 ** 31)
+    redirect_xml = f'<redirect title="{html.escape(redirect)}" />' if redirect else ''
+    text = f"#REDIRECTION [[{redirect}]]" if redirect else wikitext
+    return (
+        f"  <page>\n    <title>{html.escape(title)}</title>\n    <ns>{namespace}</ns>\n"
+        f"    <id>{stable_number(title, 1, 2 ** 24)}</id>\n    {redirect_xml}\n"
+        f"    <revision>\n      <id>{revid}</id>\n      <model>wikitext</model>\n"
+        f"      <text bytes=\"{len(text.encode('utf-8'))}\" xml:space=\"preserve\">{html.escape(text)}</text>\n"
+        f"    </revision>\n  </page>\n"
+    )
+
+
+def species_wikitext(species):
+    image = ''
+    if species['photo_url']:
+        # Fichier source de la miniature (…/thumb/8/85/Defaut.svg/120px-Defaut.svg.png -> Defaut.svg)
+        image = f"| image = {unquote(species['photo_url'].rsplit('/', 2)[-2]).replace('_', ' ')}\n"
+    return (
+        f"{{{{Infobox Poisson\n| nom = {species['name']}\n{image}"
+        f"| taille = {species['max_size_cm']} cm<ref>FishBase</ref>\n| poids = {species['max_weight_kg']} kg\n}}}}\n"
+        f"{species['description']}\n\n== Description ==\nTexte de la section.\n\n[[Catégorie:Poisson]]\n"
+    )
+
+
+def iter_dump_pages(corpus, filler=0):
+    for region in REGIONS.values():
+        title = unquote(region.list_path.rsplit('/', 1)[1]).replace('_', ' ')
+        yield page_xml(title, f"Liste des poissons.\n{{{{Palette|{region.name}}}}}\n")
+    for index, (title, species) in enumerate(corpus.by_title.items()):
+        title = unquote(title).replace('_', ' ')
+        if index % REDIRECT_EVERY:
+            yield page_xml(title, species_wikitext(species))
+        else:
+            target = f"{species['name']} ({title})"
+            yield page_xml(target, species_wikitext(species))
+            yield page_xml(title, redirect=target)
+    for index in range(filler):
+        namespace = 0 if index % 4 else 14
+        prefix = "" if namespace == 0 else "Catégorie:"
+        yield page_xml(f"{prefix}Page sans rapport {index}",
+                       f"{{{{Infobox Commune\n| nom = Commune {index}\n}}}}\n'''Page''' {index}. " * 5,
+                       namespace=namespace)
+
+
+def write_dump(corpus, path, filler=0):
+    """Écrit le dump (compressé en bz2 si `path` finit par .bz2) ; renvoie le nombre de pages."""
+    count = 0
+    opener = bz2.open if path.endswith('.bz2') else open
+    with opener(path, 'wt', encoding='utf-8') as dump:
+        dump.write(f'<mediawiki xmlns="{EXPORT_NAMESPACE}" version="0.11" xml:lang="fr">\n'
+                   '  <siteinfo>\n    <sitename>Wikipédia</sitename>\n    <dbname>frwiki</dbname>\n  </siteinfo>\n')
+        for page in iter_dump_pages(corpus, filler):
+            dump.write(page)
+            count += 1
+        dump.write('</mediawiki>\n')
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path', help="dump à écrire (.xml ou .xml.bz2)")
+    parser.add_argument('--species', type=int, help="corpus synthétique de cette taille")
+    parser.add_argument('--filler', type=int, default=0, help="pages sans rapport ajoutées")
+    args = parser.parse_args()
+    corpus = synthetic_corpus(args.species) if args.species else real_corpus()
+    print(f"-> {write_dump(corpus, args.path, args.filler)} pages écrites dans {args.path}")
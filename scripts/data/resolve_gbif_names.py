@@ -0,0 +1,67 @@
+"""
+Pré-passe GBIF commune à toutes les régions.
+
+Rassemble les noms scientifiques distincts des CSV scrapés des trois
+régions et interroge GBIF une seule fois par nom ; les réponses sont
+conservées dans le cache partagé, d'où les étapes d'enrichissement
+régionales (lancées ensuite par run_pipeline.py) les relisent sans appel
+réseau. Comme dans ces scripts, les lignes qui ont déjà un gbif_id ne sont
+pas interrogées.
+
+Les CSV lus sont ceux du scraping, et non les entrées dédupliquées des
+enrichissements : la déduplication de l'Atlantique dépend de
+l'enrichissement Méditerranée, qui dépend lui-même de cette pré-passe. Les
+doublons retirés plus tard ne coûtent rien : ils portent les noms d'une
+autre région, résolus une seule fois.
+"""
+import csv
+import os
+import sys
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+from common.gbif import fetch_species_info
+from common.metrics import instrument
+
+# CSV scrapés de chaque région (entrées de l'étape gbif:resolve de run_pipeline.py)
+INPUT_FILES = [
+    "eau-douce-france-metropole/poissons_france.csv",
+    "mediterranee/poissons_mediterranee_enrichi.csv",
+    "atlantique/poissons_atlantique.csv",
+]
+
+# Espèces interrogées en parallèle et débit maximal (requêtes / seconde)
+GBIF_CONCURRENCY = 8
+GBIF_RATE_LIMIT = 10
+
+def read_unresolved_names(path):
+    """Noms scientifiques des lignes d'un CSV sans gbif_id (vide si le fichier est absent)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as infile:
+            return [row['scientific_name'] for row in csv.DictReader(infile)
+                    if row.get('scientific_name') and not row.get('gbif_id')]
+    except FileNotFoundError:
+        print(f"Attention : le fichier '{path}' n'a pas été trouvé, il est ignoré.")
+        return []
+
+def main():
+    """Résout tous les noms une seule fois et remplit le cache partagé."""
+    all_names = []
+    for input_file in INPUT_FILES:
+        names = read_unresolved_names(os.path.join(DATA_DIR, input_file))
+        print(f"{input_file} : {len(names)} noms sans gbif_id.")
+        all_names.extend(names)
+
+    distinct_names = list(dict.fromkeys(all_names))
+    print(f"-> {len(distinct_names)} noms distincts sur {len(all_names)} à résoudre auprès de GBIF.")
+
+    # Habitats inclus : l'enrichissement eau douce en a besoin, les autres régions les ignorent
+    results = fetch_species_info(distinct_names, concurrency=GBIF_CONCURRENCY, rate_limit=GBIF_RATE_LIMIT,
+                                 with_habitats=True)
+    found = sum(1 for info in results.values() if info['gbif_id'])
+    # Pas d'échec ici : les noms non résolus seront réinterrogés par les enrichissements
+    print(f"-> {found} noms résolus, réponses conservées dans le cache GBIF.")
+
+if __name__ == "__main__":
+    with instrument("gbif:resolve"):
+        main()
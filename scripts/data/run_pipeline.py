@@ -0,0 +1,239 @@
+"""
+Exécute la chaîne complète de préparation des données sous forme de DAG.
+
+Chaque étape est un script lancé depuis son propre dossier. Une étape est
+sautée si le hachage de son code (script + modules `common`) et de ses
+fichiers d'entrée est identique à celui du dernier passage et que ses sorties
+existent. Les étapes indépendantes (par exemple les scrapers des trois
+régions) tournent en parallèle.
+
+Les étapes réseau (scraping, GBIF) n'ont pas d'entrée locale : elles ne sont
+relancées qu'avec --refresh (ou --force).
+
+Chaque étape écrit ses métriques dans .cache/metrics/<étape>.json et .prom
+(voir common/metrics.py) ; --profile en profile certaines (ou « all »).
+
+Usage :
+    python run_pipeline.py                   # étapes périmées uniquement
+    python run_pipeline.py --refresh         # relance aussi scraping et GBIF
+    python run_pipeline.py --force mediterranee:dedupe
+    python run_pipeline.py --dry-run
+    python run_pipeline.py --force mediterranee:enrich --profile mediterranee:enrich --profiler sample
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.metrics import METRICS, PROFILERS, instrument
+
+COMMON_DIR = os.path.join(DATA_DIR, 'common')
+STATE_FILE = os.path.join(DATA_DIR, '.cache', 'pipeline_state.json')
+LOG_DIR = os.path.join(DATA_DIR, '.cache', 'logs')
+
+FRESHWATER = "eau-douce-france-metropole"
+MED = "mediterranee"
+ATLANTIC = "atlantique"
+
+# Chemins relatifs au dossier de chaque étape, comme dans les scripts
+STAGES = [
+    {'name': 'eau-douce:scrape', 'dir': FRESHWATER, 'script': 'scraper.py', 'network': True,
+     'deps': [], 'inputs': [], 'outputs': ['poissons_france.csv']},
+    {'name': 'eau-douce:enrich', 'dir': FRESHWATER, 'script': 'enrich_gbif.py', 'network': True,
+     'deps': ['eau-douce:scrape', 'gbif:resolve'], 'inputs': ['poissons_france.csv'], 'outputs': ['poissons_france_enrichi.csv']},
+    {'name': 'eau-douce:water-types', 'dir': FRESHWATER, 'script': 'add_water_type.py',
+     'deps': ['eau-douce:enrich'], 'inputs': ['poissons_france_enrichi.csv'], 'outputs': ['poissons_france_enrichi.csv']},
+
+    {'name': 'mediterranee:scrape', 'dir': MED, 'script': 'scrapper_med.py', 'network': True,
+     'deps': [], 'inputs': [], 'outputs': ['poissons_mediterranee.csv']},
+    {'name': 'mediterranee:add-data', 'dir': MED, 'script': 'add_med_data.py',
+     'deps': ['mediterranee:scrape'], 'inputs': ['poissons_mediterranee.csv'],
+     'outputs': ['poissons_mediterranee_enrichi.csv']},
+    {'name': 'mediterranee:dedupe', 'dir': MED, 'script': 'deduplicate_and_update.py',
+     'deps': ['mediterranee:add-data', 'eau-douce:water-types'],
+     'inputs': ['poissons_mediterranee_enrichi.csv', f'../{FRESHWATER}/poissons_france_enrichi.csv'],
+     'outputs': ['poissons_mediterranee_deduplique.csv', 'update_existing_fish.sql']},
+    {'name': 'mediterranee:enrich', 'dir': MED, 'script': 'enrich_med_gbif.py', 'network': True,
+     'deps': ['mediterranee:dedupe', 'gbif:resolve'], 'inputs': ['poissons_mediterranee_deduplique.csv'],
+     'outputs': ['poissons_mediterranee_deduplicate_enrichi.csv']},
+
+    {'name': 'atlantique:scrape', 'dir': ATLANTIC, 'script': 'scraper_atlantique.py', 'network': True,
+     'deps': [], 'inputs': [], 'outputs': ['poissons_atlantique.csv']},
+    {'name': 'atlantique:dedupe', 'dir': ATLANTIC, 'script': 'deduplicate_atlantique.py',
+     'deps': ['atlantique:scrape', 'eau-douce:water-types', 'mediterranee:enrich'],
+     'inputs': ['poissons_atlantique.csv', f'../{FRESHWATER}/poissons_france_enrichi.csv',
+                f'../{MED}/poissons_mediterranee_deduplicate_enrichi.csv'],
+     'outputs': ['poissons_atlantique_deduplique_enrichi.csv', 'update_atlantic_duplicates.sql']},
+    {'name': 'atlantique:enrich', 'dir': ATLANTIC, 'script': 'enrich_atlantic_deduplicate_gbif.py', 'network': True,
+     'deps': ['atlantique:dedupe', 'gbif:resolve'], 'inputs': ['poissons_atlantique_deduplique_enrichi.csv'],
+     'outputs': ['poissons_atlantique_deduplique_enrichi.csv']},
+
+    # Pré-passe GBIF : chaque nom des trois régions interrogé une seule fois, les enrichissements lisent le cache
+    {'name': 'gbif:resolve', 'dir': '.', 'script': 'resolve_gbif_names.py', 'network': True,
+     'deps': ['eau-douce:scrape', 'mediterranee:add-data', 'atlantique:scrape'],
+     'inputs': [f'{FRESHWATER}/poissons_france.csv', f'{MED}/poissons_mediterranee_enrichi.csv',
+                f'{ATLANTIC}/poissons_atlantique.csv'],
+     'outputs': []},
+
+    # Différences avec l'export de la base : seules les lignes et colonnes modifiées sont à charger
+    {'name': 'registry:delta', 'dir': '.', 'script': 'export_registry_delta.py',
+     'deps': ['eau-douce:water-types', 'mediterranee:enrich', 'atlantique:enrich'],
+     'inputs': [f'{FRESHWATER}/poissons_france_enrichi.csv', f'{MED}/poissons_mediterranee_deduplicate_enrichi.csv',
+                f'{ATLANTIC}/poissons_atlantique_deduplique_enrichi.csv', 'species_registry_rows.csv'],
+     'outputs': ['registry_delta.sql']},
+]
+
+DEFAULT_WORKERS = 3
+
+
+def stage_path(stage, relative_path):
+    return os.path.normpath(os.path.join(DATA_DIR, stage['dir'], relative_path))
+
+
+def hash_file(path, digest):
+    with open(path, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(chunk)
+
+
+def fingerprint(stage):
+    """Hachage du code de l'étape, des modules communs et de ses entrées (None si une entrée manque)."""
+    digest = hashlib.sha256()
+    code_files = [stage_path(stage, stage['script'])] + sorted(glob.glob(os.path.join(COMMON_DIR, '*.py')))
+    for path in code_files + [stage_path(stage, p) for p in stage['inputs']]:
+        if not os.path.exists(path):
+            return None
+        digest.update(os.path.relpath(path, DATA_DIR).encode('utf-8'))
+        hash_file(path, digest)
+    return digest.hexdigest()
+
+
+def is_current(stage, state):
+    current = fingerprint(stage)
+    return (
+        current is not None
+        and state.get(stage['name']) == current
+        and all(os.path.exists(stage_path(stage, p)) for p in stage['outputs'])
+    )
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as infile:
+            return json.load(infile)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_file = STATE_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as outfile:
+        json.dump(state, outfile, indent=2, sort_keys=True)
+    os.replace(tmp_file, STATE_FILE)
+
+
+def run_stage(stage):
+    """Lance le script de l'étape depuis son dossier ; renvoie (code retour, chemin du journal)."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_file = os.path.join(LOG_DIR, stage['name'].replace(':', '_') + '.log')
+    start = time.perf_counter()
+    with open(log_file, 'w', encoding='utf-8') as log:
+        process = subprocess.run(
+            [sys.executable, stage['script']],
+            cwd=os.path.join(DATA_DIR, stage['dir']),
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    METRICS.add_stage(stage['name'], time.perf_counter() - start)
+    return process.returncode, log_file
+
+
+def should_run(stage, state, args):
+    """L'empreinte est calculée une fois les dépendances terminées, sur leurs sorties à jour."""
+    if 'all' in args.force or stage['name'] in args.force:
+        return True
+    if args.refresh and stage.get('network'):
+        return True
+    return not is_current(stage, state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--refresh', action='store_true', help="relance les étapes réseau (scraping, GBIF)")
+    parser.add_argument('--force', nargs='+', default=[], metavar='ÉTAPE', help="étapes à relancer ('all' pour toutes)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="étapes exécutées en parallèle")
+    parser.add_argument('--dry-run', action='store_true', help="affiche l'état des étapes sans rien lancer")
+    parser.add_argument('--profile', nargs='+', default=[], metavar='ÉTAPE',
+                        help="étapes à profiler ('all' pour toutes, 'ÉTAPE/sous-étape' pour une partie)")
+    parser.add_argument('--profiler', choices=PROFILERS, default=PROFILERS[0], help="profileur utilisé")
+    args = parser.parse_args()
+
+    if args.profile:
+        # Transmis aux scripts des étapes par leur environnement
+        os.environ['PIPELINE_PROFILE'] = ','.join(args.profile)
+        os.environ['PIPELINE_PROFILER'] = args.profiler
+
+    state = load_state()
+    stages = {stage['name']: stage for stage in STAGES}
+
+    if args.dry_run:
+        for stage in STAGES:
+            status = "à relancer" if should_run(stage, state, args) else "à jour"
+            print(f"{stage['name']:<26} {status}")
+        return
+
+    done, failed, rerun = set(), set(), set()
+    pending = dict(stages)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        while pending or running:
+            # Lance toutes les étapes dont les dépendances sont terminées
+            for name, stage in list(pending.items()):
+                if any(dep in failed for dep in stage['deps']):
+                    print(f"[{name}] ignorée : une dépendance a échoué.")
+                    failed.add(name)
+                    del pending[name]
+                elif all(dep in done for dep in stage['deps']):
+                    del pending[name]
+                    if should_run(stage, state, args):
+                        print(f"[{name}] lancement de {stage['dir']}/{stage['script']}...")
+                        running[executor.submit(run_stage, stage)] = stage
+                    else:
+                        print(f"[{name}] à jour, étape sautée.")
+                        done.add(name)
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                returncode, log_file = future.result()
+                if returncode == 0 and all(os.path.exists(stage_path(stage, p)) for p in stage['outputs']):
+                    # Hachage après exécution : les étapes qui modifient leur entrée sur place restent à jour
+                    state[stage['name']] = fingerprint(stage)
+                    save_state(state)
+                    done.add(stage['name'])
+                    rerun.add(stage['name'])
+                    print(f"[{stage['name']}] terminée (journal : {os.path.relpath(log_file, DATA_DIR)}).")
+                else:
+                    failed.add(stage['name'])
+                    print(f"[{stage['name']}] ÉCHEC (code {returncode}), voir {os.path.relpath(log_file, DATA_DIR)}.")
+
+    print(f"\n-> {len(rerun)} étapes exécutées, {len(done) - len(rerun)} à jour, {len(failed)} en échec.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    with instrument("run_pipeline"):
+        main()
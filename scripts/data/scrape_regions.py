@@ -0,0 +1,56 @@
+"""
+Scrape plusieurs régions en parallèle, chacune dans son propre processus.
+
+Les régions sont déclarées dans common/regions.py. Chaque région écrit son
+CSV dans son dossier, exactement comme son script `scraper*.py`. Les cœurs
+sont partagés entre les régions lancées en même temps pour l'analyse des
+pages de détail.
+
+Usage :
+    python scrape_regions.py                         # toutes les régions
+    python scrape_regions.py mediterranee atlantique
+    python scrape_regions.py --backend api --processes 2
+    python scrape_regions.py --backend dump          # pages extraites par extract_wiki_dump.py
+"""
+import argparse
+import sys
+import time
+
+from common.metrics import instrument
+from common.regions import REGIONS
+from common.scraping import DETAILS_BACKEND, DETAILS_BACKENDS, run_regions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('regions', nargs='*', metavar='RÉGION',
+                        help=f"régions à scraper parmi {', '.join(REGIONS)} (toutes par défaut)")
+    parser.add_argument('--processes', type=int, help="processus simultanés (une région par processus par défaut)")
+    parser.add_argument('--backend', choices=DETAILS_BACKENDS, default=DETAILS_BACKEND, help="source des détails")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.regions if name not in REGIONS]
+    if unknown:
+        parser.error(f"région(s) inconnue(s) : {', '.join(unknown)}")
+
+    names = args.regions or list(REGIONS)
+    print(f"Scraping de {len(names)} région(s) en parallèle : {', '.join(names)}")
+    start = time.perf_counter()
+    results = run_regions(names, args.processes, args.backend)
+
+    print(f"\n-> Terminé en {time.perf_counter() - start:.1f} s.")
+    for name in names:
+        result = results[name]
+        if isinstance(result, Exception):
+            print(f"   {name} : ÉCHEC ({result})")
+        elif not result:
+            print(f"   {name} : ÉCHEC (aucun poisson écrit)")
+        else:
+            print(f"   {name} : {result} poissons")
+    if any(isinstance(result, Exception) or not result for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    with instrument("scrape_regions"):
+        main()
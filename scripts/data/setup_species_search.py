@@ -0,0 +1,85 @@
+"""
+Met en place la recherche d'espèces insensible aux accents sur
+`public.species_registry` : extensions unaccent / pg_trgm, index GIN
+trigrammes sur name, name_en, scientific_name et common_names, et fonction
+`search_species(query, max_results)` appelée par `SpeciesService.searchSpecies`.
+
+Les instructions (voir common/species_search.py) sont idempotentes et
+exécutées dans une seule transaction. Leur version figée,
+scripts/sql/search_species.sql, s'applique sans Python (éditeur SQL de
+Supabase, psql) ; elle est régénérée avec --dry-run à chaque modification.
+
+Nécessite psycopg 3 (pip install "psycopg[binary]").
+
+Usage :
+    python setup_species_search.py --dsn postgresql://postgres@localhost/fishable_test
+    python setup_species_search.py --dry-run      # affiche le SQL sans l'exécuter
+    python setup_species_search.py --dry-run --output ../sql/search_species.sql
+(la connexion peut aussi venir de DATABASE_URL)
+"""
+import argparse
+import os
+import sys
+import time
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DATA_DIR)
+
+from common.csv_stream import AtomicWriter
+from common.metrics import instrument
+from common.species_search import DEFAULT_EXTENSION_SCHEMA, extension_schema_of, search_setup_sql
+from common.sql import REGISTRY_TABLE
+
+
+def apply(dsn, table, extension_schema=None):
+    """Exécute les instructions ; renvoie (nombre d'instructions, durée)."""
+    import psycopg
+
+    start = time.perf_counter()
+    with psycopg.connect(dsn) as conn, conn.cursor() as cursor:
+        # Extensions déjà installées ailleurs (ex. public) : on réutilise leur schéma
+        statements = search_setup_sql(table, extension_schema or extension_schema_of(cursor))
+        for statement in statements:
+            cursor.execute(statement)
+    return len(statements), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'), help="chaîne de connexion Postgres")
+    parser.add_argument('--table', default=REGISTRY_TABLE)
+    parser.add_argument('--extension-schema',
+                        help=f"schéma des extensions (par défaut : celui où elles sont déjà installées, "
+                             f"sinon {DEFAULT_EXTENSION_SCHEMA})")
+    parser.add_argument('--dry-run', action='store_true', help="affiche le SQL sans l'exécuter")
+    parser.add_argument('--output', help="avec --dry-run, fichier où écrire le SQL (ex. ../sql/search_species.sql)")
+    args = parser.parse_args()
+
+    if args.dry_run:
+        statements = search_setup_sql(args.table, args.extension_schema or DEFAULT_EXTENSION_SCHEMA)
+        script = ("-- Recherche d'espèces : généré par scripts/data/setup_species_search.py --dry-run, ne pas modifier\n\n"
+                  + ";\n\n".join(statements) + ";\n")
+        if args.output:
+            with AtomicWriter(args.output) as out:
+                out.write(script)
+            print(f"-> {len(statements)} instructions écrites dans {args.output}.")
+        else:
+            print(script, end='')
+        return
+
+    if not args.dsn:
+        parser.error("indiquez --dsn ou la variable DATABASE_URL")
+    try:
+        import psycopg  # noqa: F401
+    except ImportError:
+        print("Erreur : psycopg n'est pas installé (pip install \"psycopg[binary]\").")
+        sys.exit(1)
+
+    print(f"Mise en place de la recherche sur {args.table}...")
+    count, elapsed = apply(args.dsn, args.table, args.extension_schema)
+    print(f"-> {count} instructions exécutées en {elapsed:.2f} s.")
+
+
+if __name__ == "__main__":
+    with instrument("setup_species_search"):
+        main()
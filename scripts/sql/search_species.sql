@@ -0,0 +1,87 @@
+-- Recherche d'espèces : généré par scripts/data/setup_species_search.py --dry-run, ne pas modifier
+
+CREATE SCHEMA IF NOT EXISTS extensions;
+
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA extensions;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+CREATE OR REPLACE FUNCTION public.species_search_text(value text) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT lower(extensions.unaccent('extensions.unaccent'::regdictionary, value)) $$;
+
+CREATE OR REPLACE FUNCTION public.species_names_text(names jsonb, known text[] DEFAULT '{}')
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT string_agg(DISTINCT name, ' ')
+    FROM jsonb_path_query(names, 'strict $.** ? (@.type() == "string")') AS value,
+         LATERAL public.species_search_text(value #>> '{}') AS name
+    WHERE name <> ALL (known)
+$$;
+
+CREATE OR REPLACE FUNCTION public.species_search_document(
+    name text, name_en text, scientific_name text, common_names jsonb
+) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT concat_ws(' | ', n, e, sn, public.species_names_text(common_names, array_remove(ARRAY[n, e], NULL)))
+    FROM (SELECT public.species_search_text(name) AS n,
+                 public.species_search_text(name_en) AS e,
+                 public.species_search_text(scientific_name) AS sn) AS normalized
+$$;
+
+ALTER TABLE public.species_registry ADD COLUMN IF NOT EXISTS search_text text GENERATED ALWAYS AS (
+    public.species_search_document(name, name_en, scientific_name, common_names)
+) STORED;
+
+CREATE INDEX IF NOT EXISTS species_registry_search_text_trgm_idx ON public.species_registry USING gin (search_text extensions.gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION public.search_species(query text, max_results integer DEFAULT 10)
+RETURNS SETOF public.species_registry
+LANGUAGE plpgsql STABLE
+SET search_path = public, extensions
+SET pg_trgm.word_similarity_threshold = 0.5
+AS $function$
+DECLARE
+    term text := public.species_search_text(btrim(query));
+    escaped text;
+    found integer;
+BEGIN
+    IF term IS NULL OR term = '' OR max_results <= 0 THEN
+        RETURN;
+    END IF;
+    escaped := replace(replace(replace(term, '\', '\\'), '%', '\%'), '_', '\_');
+
+    RETURN QUERY EXECUTE format($query$
+        SELECT s.*
+        FROM public.species_registry AS s
+        WHERE s.search_text LIKE %1$L
+        ORDER BY (s.search_text LIKE %2$L)::int + (s.search_text LIKE %3$L)::int DESC, length(s.name), s.name
+        LIMIT %4$s
+    $query$, '%' || escaped || '%', escaped || '%', '% ' || escaped || '%', max_results);
+    GET DIAGNOSTICS found = ROW_COUNT;
+
+    -- En dessous de 4 caractères, presque tous les mots « ressemblent » à la requête
+    IF found >= max_results OR length(term) < 4 THEN
+        RETURN;
+    END IF;
+    -- CTE matérialisée : planifiée pour tous les candidats (parcours de l'index), lue seulement
+    -- jusqu'au plafond ; sous un simple LIMIT, le planificateur choisit un parcours séquentiel
+    -- en supposant les candidats répartis uniformément dans la table
+    RETURN QUERY EXECUTE format($query$
+        WITH candidates AS MATERIALIZED (
+            SELECT s FROM public.species_registry AS s WHERE %1$L <%% s.search_text
+        )
+        SELECT (c.s).*
+        FROM (
+            SELECT s, word_similarity(%1$L, (s).search_text) AS similarity
+            FROM (SELECT s FROM candidates WHERE (s).search_text NOT LIKE %2$L LIMIT %3$s) AS bounded
+        ) AS c
+        ORDER BY c.similarity DESC, length((c.s).name), (c.s).name
+        LIMIT %4$s
+    $query$, term, '%' || escaped || '%', 200, max_results - found);
+END
+$function$;
+
+ANALYZE public.species_registry;
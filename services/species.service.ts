@@ -13,13 +13,20 @@ export const SpeciesService = {
     },
 
     async searchSpecies(query: string) {
-        const { data, error } = await supabase
-            .from(TABLE)
-            .select('*')
-            .ilike('name', `%${query}%`)
-            .limit(10)
+        // Sans accents, sur tous les noms, tolérant aux fautes (voir scripts/sql/search_species.sql)
+        const { data, error } = await supabase.rpc('search_species', { query, max_results: 10 })
+        // Fonction absente de la base (script non appliqué) : recherche simple sur le nom
+        if (error && error.code === 'PGRST202') {
+            const fallback = await supabase
+                .from(TABLE)
+                .select('*')
+                .ilike('name', `%${query}%`)
+                .limit(10)
+            if (fallback.error) throw fallback.error
+            return fallback.data
+        }
         if (error) throw error
-        return data
+        return data as Species[]
     },
 
     async getSpeciesById(id: string) {